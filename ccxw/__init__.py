@@ -18,6 +18,7 @@ from ccxw.bybit import BybitCcxwAuxClass
 from ccxw.kucoin import KucoinCcxwAuxClass
 from ccxw.okx import OkxCcxwAuxClass
 from ccxw.binanceus import BinanceusCcxwAuxClass
+from ccxw.consolidated import CcxwConsolidated
 
 ccxw_metadata = importlib.metadata.metadata('ccxw')
 
@@ -12,9 +12,14 @@ import time
 import datetime
 import queue
 import math
+import threading
+import collections
 import pprint # pylint: disable=unused-import
 import ccxw.ccxw_common_functions as ccf
 from ccxw.safe_thread_vars import DictSafeThread
+from ccxw.kline_buffer import KlineBuffer
+from ccxw.order_book import OrderBook, OrderBookDeltaLog, OrderBookHistory,\
+    OrderBookIntegrity, OrderBookRecorder
 import ccxw
 
 class BinanceusCcxwAuxClass():
@@ -35,11 +40,11 @@ class BinanceusCcxwAuxClass():
         BinanceusCcxwAuxClass constructor
         =================================
             :param self: BinanceusCcxwAuxClass instance.
-            :param streams: list[dict]
+            :param streams: list[dict] | None (None only for exchange metadata queries)
                                     dicts must have this struct.
                                         {
                                             'endpoint': str only allowed 'order_book' | 'kline' |\
-                                                'trades' | 'ticker',
+                                                'trades' | 'ticker' | 'bbo',
                                             'symbol': str unified symbol.,
                                             'interval': str '1m' | '3m' | '5m' | '15m' | '30m' |\
                                                 '1h' | '2h' | '4h' | '6h' | '8h' | '12h' | '1d' |\
@@ -89,14 +94,105 @@ class BinanceusCcxwAuxClass():
         self.__ws_endpoint_on_close_vars = None
 
         self.__ws_temp_data = DictSafeThread()
+        self.__order_book_counters = DictSafeThread()
+        self.__order_book_max_depth = {}
+        self.__order_book_snapshot_limit = {}
+        self.__order_book_aggregation = {}
+        self.__order_book_depth_bands = {}
+        self.__order_book_delta_logs = {}
+        self.__order_book_histories = {}
+        self.__order_book_recorders = {}
+        self.__order_book_integrity = {}
+        self.__order_book_integrity_resync = {}
+        self.__order_book_notify_depth = {}
+        self.__order_book_notified = {}
+        self.__order_book_conflation = {}
+        self.__order_book_last_output = {}
+        self.__order_book_pending = {}
+        self.__order_book_output_lock = threading.Lock()
+
+        self.__stream_index_cache = {}
+        self.__unified_symbol_cache = {}
+        self.__tick_size_cache = {}
+
+        self.__order_book_buffer_max_len = 2500
+        self.__order_book_buffers = {}
+        self.__snapshot_pending = set()
+        self.__snapshot_requests = queue.Queue()
+        self.__snapshot_results = queue.Queue()
+        self.__snapshot_thread = None
+        self.__stop_flag = False
+        self.__stop_flag_lock = threading.Lock()
+
+        if streams is not None:
+            if not self.__check_streams_struct(streams):
+                raise ValueError('The streams struct is not valid' + str(streams))
+
+            if len(streams) > __exchange_limit_streams:
+                raise ValueError('The exchange ' + str(self.__exchange)\
+                                 + ' not alowed more than ' + str(__exchange_limit_streams)\
+                                 + ' of streams.')
+
+    def get_stream_buffer(self, endpoint, symbol, interval: str='none'):
+        """
+        get_stream_buffer
+        =================
+            This function return the kline or trades buffer of a stream, to be restored
+            in a new instance with set_stream_buffer().
+                :param endpoint: str 'kline' | 'trades'.
+                :param symbol: str unified symbol.
+                :param interval: str.
+                :return list | None: Return list of messages, None for other endpoints or
+                    if the stream has no data.
+        """
+        result = None
+
+        __buffer = self.__ws_temp_data[self.get_stream_index(endpoint, symbol, interval)]
+
+        if endpoint == 'kline' and isinstance(__buffer, KlineBuffer):
+            result = __buffer.get_last()
+        elif endpoint == 'trades' and isinstance(__buffer, queue.Queue):
+            result = list(__buffer.queue)
+
+        return result
+
+    def set_stream_buffer(self, endpoint, symbol, interval, messages):
+        """
+        set_stream_buffer
+        =================
+            This function restore the kline or trades buffer of a stream saved with
+            get_stream_buffer(), only while the stream has no data. New candles replace
+            the restored ones with the same open time.
+                :param endpoint: str 'kline' | 'trades'.
+                :param symbol: str unified symbol.
+                :param interval: str.
+                :param messages: list of messages.
+                :return bool: Return True if the buffer was restored.
+        """
+        result = False
 
-        if not self.__check_streams_struct(streams):
-            raise ValueError('The streams struct is not valid' + str(streams))
+        __stream_index = self.get_stream_index(endpoint, symbol, interval)
 
-        if len(streams) > __exchange_limit_streams:
-            raise ValueError('The exchange ' + str(self.__exchange)\
-                             + ' not alowed more than ' + str(__exchange_limit_streams)\
-                             + ' of streams.')
+        if self.__ws_temp_data[__stream_index] is None\
+            and isinstance(messages, list) and len(messages) > 0:
+            if endpoint == 'kline':
+                __buffer = KlineBuffer(self.__data_max_len, self.__result_max_len)
+
+                for __message in messages:
+                    __buffer.set(int(__message['open_time']), __message)
+
+                self.__ws_temp_data[__stream_index] = __buffer
+                result = True
+            elif endpoint == 'trades':
+                __buffer = queue.Queue(maxsize=self.__data_max_len)
+
+                for __message in messages[-self.__data_max_len:]:
+                    __buffer.put(__message)
+
+                self.__ws_temp_data[__stream_index] = __buffer
+                result = True
+
+        return result
 
     def reset_ws_temp_data(self):
         """
@@ -109,6 +205,67 @@ class BinanceusCcxwAuxClass():
     def __del__(self):
         pass
 
+    def start(self):
+        """
+        start
+        =====
+            This function start the order book snapshot worker.
+        """
+        with self.__stop_flag_lock:
+            self.__stop_flag = False
+
+            if self.__snapshot_thread is None or not self.__snapshot_thread.is_alive():
+                self.__snapshot_thread = threading.Thread(target=self.__thread_snapshots,\
+                                                          daemon=True,\
+                                                          name='ccxw_' + self.__exchange\
+                                                            + '_snapshot_thread')
+                self.__snapshot_thread.start()
+
+    def stop(self):
+        """
+        stop
+        ====
+            This function stop the order book snapshot worker and close the order book
+            recorders.
+        """
+        __snapshot_thread = None
+
+        with self.__stop_flag_lock:
+            self.__stop_flag = True
+            __snapshot_thread = self.__snapshot_thread
+
+        if __snapshot_thread is not None and __snapshot_thread.is_alive()\
+            and threading.current_thread() is not __snapshot_thread:
+            __snapshot_thread.join(15)
+
+        for __recorder in self.__order_book_recorders.values():
+            __recorder.close()
+
+    def __thread_snapshots(self):
+        """
+        __thread_snapshots
+        ==================
+            Order book snapshot worker, fetch the REST snapshots requested from the
+            websocket thread so the websocket is never blocked by an HTTP call.
+        """
+        __local_stop = False
+
+        while not __local_stop:
+            try:
+                __stream_index, __symbol = self.__snapshot_requests.get(timeout=1)
+                __tick_size = (
+                    self.get_symbol_tick_size(self.get_unified_symbol_from_symbol(__symbol))
+                )
+                __data = self.__get_order_book_snapshot(__symbol)
+                self.__snapshot_results.put((__stream_index, __symbol, __tick_size, __data))
+            except queue.Empty:
+                pass
+            except Exception as exc: # pylint: disable=broad-except
+                print('Order book snapshot error: ' + str(exc))
+
+            with self.__stop_flag_lock:
+                __local_stop = self.__stop_flag
+
     def __check_streams_struct(self, streams):
         """
         __check_streams_struct
@@ -119,7 +276,7 @@ class BinanceusCcxwAuxClass():
                                 dicts must have this struct.
                                     {
                                         'endpoint': str only allowed 'order_book' | 'kline' |\
-                                            'trades' | 'ticker',
+                                            'trades' | 'ticker' | 'bbo',
                                         'symbol': str unified symbol.,
                                         'interval': str '1m' | '3m' | '5m' | '15m' | '30m' |\
                                             '1h' | '2h' | '4h' | '6h' | '8h' | '12h' | '1d' |\
@@ -143,15 +300,27 @@ class BinanceusCcxwAuxClass():
                     and 'symbol' in stream\
                     and stream['symbol'] is not None\
                     and isinstance(stream['symbol'], str)\
-                    and self.if_symbol_supported(stream['symbol'])
+                    and self.if_symbol_supported(stream['symbol'])\
+                    and ccf.is_valid_stream_options(stream)
 
                 if result and stream['endpoint'] == 'kline':
                     result = 'interval' in stream\
                         and stream['interval'] is not None\
                         and isinstance(stream['interval'], str)\
-                        and stream['interval'] in\
-                            ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h',\
-                             '6h', '8h', '12h', '1d', '3d', '1w', '1mo']
+                        and stream['interval'] in self.get_supported_intervals()
+
+        return result
+
+    def get_supported_intervals(self):
+        """
+        get_supported_intervals
+        =======================
+            This function return the unified intervals supported for kline endpoint.
+
+                :return list: Return list of unified intervals.
+        """
+        result = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h',\
+                  '6h', '8h', '12h', '1d', '3d', '1w', '1mo']
 
         return result
 
@@ -173,6 +342,12 @@ class BinanceusCcxwAuxClass():
         if self.__testmode:
             result = self.__ws_url_test
 
+        # Partial depth events do not include the symbol, combined streams add the stream name
+        for stream in self.__ws_streams:
+            if stream['endpoint'] == 'order_book' and stream.get('depth') in (5, 20):
+                result = result[:-len('/ws')] + '/stream'
+                break
+
         return result
 
     def get_api_url(self):
@@ -259,6 +434,68 @@ class BinanceusCcxwAuxClass():
 
         return result
 
+    def get_exchange_symbols_index(self):
+        """
+        get_exchange_symbols_index
+        ==========================
+            This function get exchange symbols data indexed by unified symbol.
+                :return dict: Return dict unified symbol -> {'symbol': native symbol,
+                    'intervals': list of supported unified intervals,
+                    'tick_size': str price tick size or None}.
+        """
+
+        result = None
+        __main_data = self.get_exchange_info()
+
+        if __main_data is not None and isinstance(__main_data,dict)\
+            and 'symbols' in __main_data and isinstance(__main_data['symbols'],list):
+            result = {}
+            __intervals = self.get_supported_intervals()
+            for symbol_data in __main_data['symbols']:
+                if symbol_data is not None and isinstance(symbol_data,dict)\
+                    and 'symbol' in symbol_data and 'baseAsset' in symbol_data\
+                    and 'quoteAsset' in symbol_data\
+                    and isinstance(symbol_data['baseAsset'],str)\
+                    and isinstance(symbol_data['quoteAsset'],str):
+                    __unified_symbol = symbol_data['baseAsset'].upper() + '/'\
+                        + symbol_data['quoteAsset'].upper()
+                    __tick_size = None
+                    if 'filters' in symbol_data and isinstance(symbol_data['filters'],list):
+                        for __filter in symbol_data['filters']:
+                            if isinstance(__filter,dict)\
+                                and __filter.get('filterType') == 'PRICE_FILTER'\
+                                and 'tickSize' in __filter:
+                                __tick_size = str(__filter['tickSize'])
+                                break
+                    result[__unified_symbol] = {
+                        'symbol': symbol_data['symbol'],
+                        'intervals': __intervals,
+                        'tick_size': __tick_size
+                    }
+
+        return result
+
+    def get_symbol_tick_size(self, symbol):
+        """
+        get_symbol_tick_size
+        ====================
+            This function get the price tick size of a symbol from exchange info.
+                :param symbol: str unified symbol.
+                :return str | None: Return tick size, None if it is unknown.
+        """
+        result = self.__tick_size_cache.get(symbol)
+
+        if result is None:
+            __index = self.get_exchange_symbols_index()
+
+            if __index is not None and symbol in __index:
+                result = __index[symbol]['tick_size']
+
+                if result is not None:
+                    self.__tick_size_cache[symbol] = result
+
+        return result
+
     def get_unified_symbol_from_symbol(self, symbol):
         """
         get_unified_symbol_from_symbol
@@ -268,14 +505,19 @@ class BinanceusCcxwAuxClass():
                 :param symbol: str.
                 :return str: Return unified symbol.
         """
-        result = symbol
+        result = self.__unified_symbol_cache.get(symbol)
 
-        full_list_symbols = self.get_exchange_full_list_symbols(False)
+        if result is None:
+            result = symbol
 
-        for symbol_rpl in full_list_symbols:
-            if symbol.replace('/', '').lower() == symbol_rpl.replace('/', '').lower():
-                result = symbol_rpl
-                break
+            full_list_symbols = self.get_exchange_full_list_symbols(False)
+
+            for symbol_rpl in full_list_symbols:
+                if symbol.replace('/', '').lower() == symbol_rpl.replace('/', '').lower():
+                    result = symbol_rpl
+                    break
+
+            self.__unified_symbol_cache[symbol] = result
 
         return result
 
@@ -324,16 +566,22 @@ class BinanceusCcxwAuxClass():
                 :param interval: str.
                 :return str: Return stream index
         """
-        result = 'stream'
+        __key = (endpoint, symbol, interval)
+        result = self.__stream_index_cache.get(__key)
 
-        if interval is None:
-            interval = 'none'
+        if result is None:
+            result = 'stream'
 
-        result = result + '_' + endpoint + '_'\
-            + self.get_unified_symbol_from_symbol(symbol) + '_'\
-            + self.get_unified_interval_from_interval(interval)
+            if interval is None:
+                interval = 'none'
 
-        result = result.replace('/','').lower()
+            result = result + '_' + endpoint + '_'\
+                + self.get_unified_symbol_from_symbol(symbol) + '_'\
+                + self.get_unified_interval_from_interval(interval)
+
+            result = result.replace('/','').lower()
+
+            self.__stream_index_cache[__key] = result
 
         return result
 
@@ -357,13 +605,12 @@ class BinanceusCcxwAuxClass():
 
         for stream in self.__ws_streams:
             interval = 'none'
-            update_speed = '100ms'
 
             if stream['endpoint'] == 'order_book':
                 result = True
 
                 __send_data_vars['params'].append(stream['symbol'].replace("/","").lower() +\
-                                                '@depth' + '@' + update_speed)
+                                                self.__get_order_book_channel(stream))
 
             elif stream['endpoint'] == 'kline':
                 result = True
@@ -394,10 +641,62 @@ class BinanceusCcxwAuxClass():
                 __send_data_vars['params'].append(stream['symbol'].replace("/","").lower() +\
                                                   '@ticker')
 
+            elif stream['endpoint'] == 'bbo':
+                result = True
+                __send_data_vars['params'].append(stream['symbol'].replace("/","").lower() +\
+                                                  '@bookTicker')
+
             __stream_index = self.get_stream_index(stream['endpoint'],\
                                                      stream['symbol'],\
                                                      interval=interval)
             self.__ws_temp_data[__stream_index] = None
+            __native_symbol = stream['symbol'].replace('/', '').upper()
+            self.__unified_symbol_cache[__native_symbol] = stream['symbol']
+            self.__stream_index_cache[(stream['endpoint'],\
+                                       __native_symbol,\
+                                       interval)] = __stream_index
+
+            if stream['endpoint'] == 'order_book':
+                self.__order_book_max_depth[__stream_index] = stream.get('max_depth')
+
+                if stream.get('depth') == 50 and stream.get('max_depth') is None:
+                    self.__order_book_max_depth[__stream_index] = 50
+
+                if self.__order_book_max_depth[__stream_index] is not None\
+                    and self.__order_book_max_depth[__stream_index] <= 60:
+                    self.__order_book_snapshot_limit[__stream_index] = 100
+                self.__order_book_aggregation[__stream_index] = stream.get('aggregation')
+                self.__order_book_depth_bands[__stream_index] = stream.get('depth_bands_bps')
+
+                if stream.get('output_mode') == 'delta':
+                    self.__order_book_delta_logs[__stream_index] = OrderBookDeltaLog(\
+                        snapshot_interval=stream.get('snapshot_interval', 100))
+
+                if stream.get('notify_on') == 'bbo':
+                    self.__order_book_notify_depth[__stream_index] = 1
+                elif stream.get('notify_on') == 'top_n':
+                    self.__order_book_notify_depth[__stream_index] = self.__result_max_len
+
+                if stream.get('conflation_ms') is not None:
+                    self.__order_book_conflation[__stream_index] = stream['conflation_ms'] / 1000
+
+                if stream.get('history') is not None:
+                    self.__order_book_histories[__stream_index] = OrderBookHistory(\
+                        **stream['history'])
+
+                if stream.get('record') is not None:
+                    self.__order_book_recorders[__stream_index] = OrderBookRecorder(\
+                        **stream['record'])
+
+                self.__order_book_integrity[__stream_index] = OrderBookIntegrity(\
+                    stream.get('max_snapshot_age'))
+                self.__order_book_integrity_resync[__stream_index] = (
+                    stream.get('integrity_resync', False)
+                )
+                self.__order_book_counters[__stream_index] = {
+                    'gaps': 0,
+                    'resyncs': 0
+                }
 
         self.__ws_endpoint_on_open_vars = json.dumps(__send_data_vars)
 
@@ -415,47 +714,499 @@ class BinanceusCcxwAuxClass():
 
     # Desde aca tengo que cambiar el codigo de los otros exchanges
 
-    def __init_order_book_data(self,\
-                               endpoint,\
-                               symbol,\
-                               interval: str='none'):
+    def __get_order_book_channel(self, stream):
         """
-        __init_order_book_data
-        ======================
-            This function initialize order book data trought API Call.
+        __get_order_book_channel
+        ========================
+            This function return the native channel suffix for the depth and
+            update_speed of an order_book stream: partial book streams (depth5, depth20)
+            for small depths, diff depth stream plus REST snapshot otherwise.
+                :param stream: dict.
+                :return str: Return channel suffix.
+        """
+        result = '@depth'
+
+        if stream.get('depth') in (5, 20):
+            result = result + str(stream['depth'])
+
+        if stream.get('update_speed', '100ms') == '100ms':
+            result = result + '@100ms'
+
+        return result
+
+    def __new_order_book(self, stream_index, tick_size):
+        """
+        __new_order_book
+        ================
+            This function create the local book of a stream with its options.
+                :param stream_index: str.
+                :param tick_size: str | None.
+                :return OrderBook: Return empty book.
+        """
+        return OrderBook(tick_size, self.__order_book_max_depth.get(stream_index),\
+                         aggregation=self.__order_book_aggregation.get(stream_index),\
+                         depth_bands_bps=self.__order_book_depth_bands.get(stream_index),\
+                         delta_log=self.__order_book_delta_logs.get(stream_index),\
+                         notify_depth=self.__order_book_notify_depth.get(stream_index),\
+                         history=self.__order_book_histories.get(stream_index),\
+                         integrity=self.__order_book_integrity.get(stream_index),\
+                         recorder=self.__order_book_recorders.get(stream_index))
+
+    def __get_order_book_snapshot(self, symbol):
+        """
+        __get_order_book_snapshot
+        =========================
+            This function get order book snapshot trought API Call.
                 :param self: This class instance.
-                :param endpoint: str
                 :param symbol: str
-                :param interval: str
-                :return bool: Return True if order book is initialized
+                :return dict | None: Return snapshot data, None on error.
         """
 
-        result = False
-
-        __stream_index = self.get_stream_index(endpoint, symbol, interval=interval)
+        result = None
 
+        __limit = self.__order_book_snapshot_limit.get(self.get_stream_index('order_book', symbol),\
+                                                       1000)
         __url_dest = self.__url_api + '/depth?symbol=' +\
-            str(symbol).replace("/","").upper() + '&limit=1000'
+            str(symbol).replace("/","").upper() + '&limit=' + str(__limit)
 
         __data = ccf.file_get_contents_url(__url_dest)
 
         if __data is not None and ccf.is_json(__data):
             __data = json.loads(__data)
 
-            self.__ws_temp_data[__stream_index] = {}
-            self.__ws_temp_data[__stream_index]['endpoint'] = endpoint
-            self.__ws_temp_data[__stream_index]['exchange'] = self.__exchange
-            self.__ws_temp_data[__stream_index]['symbol'] = symbol
-            self.__ws_temp_data[__stream_index]['interval'] = None
-            self.__ws_temp_data[__stream_index]['last_update_id'] = __data['lastUpdateId']
-            self.__ws_temp_data[__stream_index]['diff_update_id'] = 0
-            self.__ws_temp_data[__stream_index]['bids'] = __data['bids']
-            self.__ws_temp_data[__stream_index]['asks'] = __data['asks']
-            self.__ws_temp_data[__stream_index]['type'] = 'snapshot'
+            if isinstance(__data, dict) and 'lastUpdateId' in __data\
+                and 'bids' in __data and 'asks' in __data:
+                result = __data
 
-            result = True
-        else:
-            result = False
+        return result
+
+    def __request_order_book_snapshot(self, stream_index, symbol):
+        """
+        __request_order_book_snapshot
+        =============================
+            This function queue a snapshot request for the worker, once per symbol.
+                :param stream_index: str.
+                :param symbol: str.
+        """
+        if stream_index not in self.__snapshot_pending:
+            self.__snapshot_pending.add(stream_index)
+            self.__snapshot_requests.put((stream_index, symbol))
+
+            __start_worker = False
+            with self.__stop_flag_lock:
+                __start_worker = not self.__stop_flag\
+                    and (self.__snapshot_thread is None or not self.__snapshot_thread.is_alive())
+
+            if __start_worker:
+                self.start()
+
+    def __buffer_order_book_diff(self, stream_index, diff_data):
+        """
+        __buffer_order_book_diff
+        ========================
+            This function keep a diff of a symbol without book until its snapshot arrive.
+                :param stream_index: str.
+                :param diff_data: dict depthUpdate event.
+        """
+        if stream_index not in self.__order_book_buffers:
+            self.__order_book_buffers[stream_index] = (
+                collections.deque(maxlen=self.__order_book_buffer_max_len)
+            )
+
+        self.__order_book_buffers[stream_index].append(diff_data)
+        self.__request_order_book_snapshot(stream_index, str(diff_data['s']))
+
+    def __install_order_book_snapshots(self):
+        """
+        __install_order_book_snapshots
+        ==============================
+            This function install the snapshots fetched by the worker and replay the
+            buffered diffs of each symbol following the sequencing rules.
+        """
+        __local_empty = False
+
+        while not __local_empty:
+            try:
+                __stream_index, __symbol, __tick_size, __data =\
+                    self.__snapshot_results.get_nowait()
+            except queue.Empty:
+                __local_empty = True
+                continue
+
+            self.__snapshot_pending.discard(__stream_index)
+
+            if __data is not None:
+                __book_data = {}
+                __book_data['endpoint'] = 'order_book'
+                __book_data['exchange'] = self.__exchange
+                __book_data['symbol'] = __symbol
+                __book_data['interval'] = None
+                __book_data['last_update_id'] = __data['lastUpdateId']
+                __book_data['diff_update_id'] = 0
+                __book_data['book'] = self.__new_order_book(__stream_index, __tick_size)
+                __book_data['book'].set_snapshot(__data['bids'], __data['asks'])
+                __book_data['type'] = 'snapshot'
+                self.__ws_temp_data[__stream_index] = __book_data
+
+                __buffer = self.__order_book_buffers.pop(__stream_index, [])
+
+                for __diff_data in __buffer:
+                    if self.__ws_temp_data[__stream_index] is None:
+                        self.__buffer_order_book_diff(__stream_index, __diff_data)
+                    else:
+                        self.__apply_order_book_diff(__stream_index, __diff_data, False)
+
+    def __add_order_book_counter(self, stream_index, counter):
+        """
+        __add_order_book_counter
+        ========================
+            This function increment one order book counter of a stream.
+                :param stream_index: str.
+                :param counter: str.
+        """
+        __counters = self.__order_book_counters[stream_index]
+
+        if __counters is not None and counter in __counters:
+            __counters = dict(__counters)
+            __counters[counter] += 1
+            self.__order_book_counters[stream_index] = __counters
+
+    def get_order_book_counters(self, symbol):
+        """
+        get_order_book_counters
+        =======================
+            This function return the local order book health counters of a symbol.
+                :param symbol: str unified symbol.
+                :return dict | None: Return dict with gaps and resyncs.
+        """
+        result = None
+
+        __counters = self.__order_book_counters[self.get_stream_index('order_book', symbol)]
+
+        if __counters is not None:
+            result = dict(__counters)
+
+        return result
+
+    def get_book_stats(self, symbol):
+        """
+        get_book_stats
+        ==============
+            This function return the statistics of the local order book of a symbol,
+            they are computed by the book engine on each change.
+                :param symbol: str unified symbol.
+                :return dict | None: Return dict with book statistics, None if no book.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            result = __book_data['book'].get_stats()
+
+        return result
+
+    def get_order_book_arrays(self, symbol, depth=None):
+        """
+        get_order_book_arrays
+        =====================
+            This function return the local order book of a symbol as numpy float64
+            arrays, read-only and shared until the book changes.
+                :param symbol: str unified symbol.
+                :param depth: int | None levels on each side (None for all).
+                :return dict | None: Return {'bids': (prices, sizes), 'asks': (prices, sizes)},
+                    None if the book is not available or numpy is not installed.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            result = __book_data['book'].get_arrays(depth)
+
+        return result
+
+    def get_klines_arrays(self, symbol, interval, count=None):
+        """
+        get_klines_arrays
+        =================
+            This function return the last candles of a kline stream as numpy arrays,
+            read-only zero-copy views of the columnar buffer.
+                :param symbol: str unified symbol.
+                :param interval: str unified interval.
+                :param count: int | None candles (None for all).
+                :return dict | None: Return dict column -> array, None if the stream has
+                    no data or numpy is not installed.
+        """
+        result = None
+
+        __buffer = self.__ws_temp_data[self.get_stream_index('kline', symbol, interval)]
+
+        if isinstance(__buffer, KlineBuffer):
+            result = __buffer.get_arrays(count)
+
+        return result
+
+    def get_aggregated_order_book(self, symbol, depth=None):
+        """
+        get_aggregated_order_book
+        =========================
+            This function return the price buckets of the local order book of a symbol,
+            they are updated by the book engine on each level change.
+                :param symbol: str unified symbol.
+                :param depth: int | None buckets on each side (None for all).
+                :return dict | None: Return dict with step, bids and asks ([price, size]),
+                    None if the stream has no aggregation or the book is not available.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None\
+            and __book_data['book'].get_aggregation_step() is not None:
+            result = {}
+            result['step'] = __book_data['book'].get_aggregation_step()
+            result['bids'] = __book_data['book'].get_aggregated_bids(depth)
+            result['asks'] = __book_data['book'].get_aggregated_asks(depth)
+
+        return result
+
+    def __is_order_book_notify_due(self, stream_index):
+        """
+        __is_order_book_notify_due
+        ==========================
+            This function check if an order_book message must be built for a stream with
+            notify_on, only when the watched best levels changed since the last message.
+                :param stream_index: str.
+                :return bool: Return True if the message must be built.
+        """
+        result = True
+
+        __book_data = self.__ws_temp_data[stream_index]
+
+        if self.__order_book_notify_depth.get(stream_index) is not None\
+            and isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            __notified = (__book_data['book'], __book_data['book'].get_top_version())
+            __last_notified = self.__order_book_notified.get(stream_index)
+
+            result = __last_notified is None or __last_notified[0] is not __notified[0]\
+                or __last_notified[1] != __notified[1]
+
+            if result:
+                self.__order_book_notified[stream_index] = __notified
+
+        return result
+
+    def __get_order_book_output(self, stream_index, message_out):
+        """
+        __get_order_book_output
+        =======================
+            This function complete an order_book message with the book levels, or keep
+            it pending when the stream has conflation_ms and the last message is recent,
+            the pending message is completed by the next due message or on read.
+                :param stream_index: str.
+                :param message_out: dict message without levels.
+                :return dict | None: Return the complete message, None if it is pending.
+        """
+        result = None
+
+        __conflation = self.__order_book_conflation.get(stream_index)
+
+        with self.__order_book_output_lock:
+            if __conflation is not None\
+                and time.time() - self.__order_book_last_output.get(stream_index, 0) < __conflation:
+                self.__order_book_pending[stream_index] = message_out
+            else:
+                result = self.__materialize_order_book_message(stream_index, message_out)
+
+        return result
+
+    def __materialize_order_book_message(self, stream_index, message_out):
+        """
+        __materialize_order_book_message
+        ================================
+            This function add the book levels and the timestamps to an order_book
+            message, called with the output lock held.
+                :param stream_index: str.
+                :param message_out: dict message without levels.
+                :return dict: Return the complete message.
+        """
+        result = message_out
+
+        self.__order_book_pending.pop(stream_index, None)
+        self.__order_book_last_output[stream_index] = time.time()
+
+        result['bids'] = self.__ws_temp_data[stream_index]['book'].get_bids(self.__result_max_len)
+        result['asks'] = self.__ws_temp_data[stream_index]['book'].get_asks(self.__result_max_len)
+        self.__set_order_book_delta_output(stream_index, result)
+        __current_datetime = datetime.datetime.now(datetime.timezone.utc)
+        __current_timestamp = __current_datetime.strftime("%s.%f")
+        __current_datetime = __current_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")
+        result['timestamp'] = __current_timestamp
+        result['datetime'] = __current_datetime
+
+        return result
+
+    def get_pending_order_book(self, symbol):
+        """
+        get_pending_order_book
+        ======================
+            This function complete the pending (conflated) order_book message of a
+            symbol with the current book.
+                :param symbol: str unified symbol.
+                :return dict | None: Return the message, None if nothing is pending.
+        """
+        result = None
+
+        __stream_index = self.get_stream_index('order_book', symbol)
+
+        with self.__order_book_output_lock:
+            __message_out = self.__order_book_pending.get(__stream_index)
+
+            if __message_out is not None\
+                and isinstance(self.__ws_temp_data[__stream_index], dict)\
+                and self.__ws_temp_data[__stream_index].get('book') is not None:
+                result = self.__materialize_order_book_message(__stream_index, __message_out)
+
+        return result
+
+    def __set_order_book_delta_output(self, stream_index, message_out):
+        """
+        __set_order_book_delta_output
+        =============================
+            This function replace the levels of an order_book message with the last
+            entry of the stream delta log when the stream output_mode is 'delta'.
+                :param stream_index: str.
+                :param message_out: dict normalized message.
+        """
+        __delta_log = self.__order_book_delta_logs.get(stream_index)
+
+        if __delta_log is not None:
+            __entry = __delta_log.get_last_entry()
+
+            if __entry is not None:
+                message_out['bids'] = __entry['bids']
+                message_out['asks'] = __entry['asks']
+                message_out['type'] = __entry['type']
+                message_out['sequence'] = __entry['sequence']
+
+    def get_order_book_deltas(self, symbol, from_sequence=0):
+        """
+        get_order_book_deltas
+        =====================
+            This function return the snapshots and level changes of a symbol recorded
+            after from_sequence, only for streams with output_mode 'delta'.
+                :param symbol: str unified symbol.
+                :param from_sequence: int last sequence already applied.
+                :return list | None: Return list of dict {sequence, type, bids, asks}.
+        """
+        result = None
+
+        __delta_log = self.__order_book_delta_logs.get(self.get_stream_index('order_book', symbol))
+
+        if __delta_log is not None:
+            result = __delta_log.get_entries(from_sequence)
+
+        return result
+
+    def get_order_book_history(self, symbol, start_time=None, end_time=None):
+        """
+        get_order_book_history
+        ======================
+            This function return the sampled best levels of a symbol between two times,
+            only for streams with history.
+                :param symbol: str unified symbol.
+                :param start_time: float | None unix time.
+                :param end_time: float | None unix time.
+                :return list | None: Return list of dict {timestamp, bids, asks}.
+        """
+        result = None
+
+        __history = self.__order_book_histories.get(self.get_stream_index('order_book', symbol))
+
+        if __history is not None:
+            result = __history.get_samples(start_time, end_time)
+
+        return result
+
+    def __is_order_book_resync_due(self, stream_index):
+        """
+        __is_order_book_resync_due
+        ==========================
+            This function check if the local book of a stream must be resynced: a
+            trimmed side ran out of levels or, with integrity_resync, the last invariant
+            check failed or the snapshot is older than max_snapshot_age.
+                :param stream_index: str.
+                :return bool: Return True if the book must be resynced.
+        """
+        __book = self.__ws_temp_data[stream_index]['book']
+
+        result = __book.is_depth_exhausted()
+
+        if not result and self.__order_book_integrity_resync.get(stream_index, False):
+            result = not __book.is_consistent()\
+                or self.__order_book_integrity[stream_index].is_snapshot_stale()
+
+        return result
+
+    def get_order_book_integrity(self, symbol):
+        """
+        get_order_book_integrity
+        ========================
+            This function return the invariant check counters of the local order book
+            of a symbol, kept across resyncs.
+                :param symbol: str unified symbol.
+                :return dict | None: Return dict with counters, None without order book.
+        """
+        result = None
+
+        __integrity = self.__order_book_integrity.get(self.get_stream_index('order_book', symbol))
+
+        if __integrity is not None:
+            result = __integrity.get_counters()
+
+        return result
+
+    def __apply_order_book_diff(self, stream_index, diff_data, count_gap=True):
+        """
+        __apply_order_book_diff
+        =======================
+            This function apply a depth diff following the Binance sequencing rules:
+            events with u <= lastUpdateId are dropped, the first event after a snapshot
+            must have U <= lastUpdateId + 1 and each next event U == previous u + 1.
+            On a gap the book of this symbol is dropped, its diffs are buffered and a new
+            snapshot is requested to the worker.
+                :param stream_index: str.
+                :param diff_data: dict depthUpdate event.
+                :param count_gap: bool count the gap as a resync (False while replaying).
+                :return bool: Return True if the diff was applied.
+        """
+        result = False
+
+        __book_data = self.__ws_temp_data[stream_index]
+
+        if __book_data is not None and isinstance(__book_data, dict):
+            __last_update_id = __book_data['last_update_id']
+
+            if diff_data['u'] <= __last_update_id:
+                result = False # Already included in the book
+            elif diff_data['U'] == __last_update_id + 1\
+                or (__book_data['type'] == 'snapshot' and diff_data['U'] <= __last_update_id + 1):
+                result = self.__manage_websocket_diff_data(diff_data)
+
+                if result and self.__is_order_book_resync_due(stream_index):
+                    result = False
+                    self.__ws_temp_data[stream_index] = None
+                    self.__add_order_book_counter(stream_index, 'resyncs')
+                    self.__buffer_order_book_diff(stream_index, diff_data)
+            else:
+                self.__ws_temp_data[stream_index] = None
+
+                if count_gap:
+                    self.__add_order_book_counter(stream_index, 'gaps')
+                    self.__add_order_book_counter(stream_index, 'resyncs')
+
+                self.__buffer_order_book_diff(stream_index, diff_data)
 
         return result
 
@@ -481,23 +1232,15 @@ class BinanceusCcxwAuxClass():
                 and 'b' in __temp_data and 'a' in __temp_data:
                 __stream_index = self.get_stream_index('order_book', __temp_data['s'])
 
-                __diff_data = 0
+                self.__install_order_book_snapshots()
 
-                if self.__ws_temp_data[__stream_index] is not None\
-                    and isinstance(self.__ws_temp_data[__stream_index], dict)\
-                    and 'last_update_id' in self.__ws_temp_data[__stream_index]:
-                    __diff_data = __temp_data['U']\
-                        - self.__ws_temp_data[__stream_index]['last_update_id']
+                if self.__ws_temp_data[__stream_index] is None:
+                    self.__buffer_order_book_diff(__stream_index, __temp_data)
+                else:
+                    __proc_data = self.__apply_order_book_diff(__stream_index, __temp_data)
 
-                if self.__ws_temp_data[__stream_index] is None or __diff_data > 1:
-                    if self.__init_order_book_data('order_book', str(__temp_data['s']))\
-                        and self.__manage_websocket_diff_data(__temp_data):
-                        __proc_data = True
-                elif self.__manage_websocket_diff_data(__temp_data):
-                    __proc_data = True
 
-
-        if __proc_data:
+        if __proc_data and self.__is_order_book_notify_due(__stream_index):
 
             __message_out = None
             __message_out = {}
@@ -511,19 +1254,63 @@ class BinanceusCcxwAuxClass():
             __message_out['diff_update_id'] = (
                 self.__ws_temp_data[__stream_index]['diff_update_id']
             )
-            __message_out['bids'] = (
-                self.__ws_temp_data[__stream_index]['bids'][:self.__result_max_len]
-            )
-            __message_out['asks'] = (
-                self.__ws_temp_data[__stream_index]['asks'][:self.__result_max_len]
-            )
             __message_out['type'] = self.__ws_temp_data[__stream_index]['type']
-            __current_datetime = datetime.datetime.now(datetime.timezone.utc)
-            __current_timestamp = __current_datetime.strftime("%s.%f")
-            __current_datetime = __current_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")
-            __message_out['timestamp'] = __current_timestamp
-            __message_out['datetime'] = __current_datetime
-            result = __message_out
+
+            result = self.__get_order_book_output(__stream_index, __message_out)
+
+        return result
+
+    def manage_websocket_message_order_book_partial(self, data, symbol):
+        """
+        manage_websocket_message_order_book_partial
+        ===========================================
+            This function manage partial book depth messages (depth5, depth20) and
+            normalize result data for order_book endpoint. Each message is the top of the
+            book, applied to the local book as the differences with the current levels.
+
+                :param data: dict.
+                :param symbol: str native symbol from stream name.
+                :return dict: Return dict with normalized data.
+        """
+        result = None
+
+        if data is not None and isinstance(data, dict) and 'lastUpdateId' in data\
+            and 'bids' in data and 'asks' in data:
+            __stream_index = self.get_stream_index('order_book', symbol)
+            __book_data = self.__ws_temp_data[__stream_index]
+
+            if __book_data is None or not isinstance(__book_data, dict):
+                __book_data = {}
+                __book_data['endpoint'] = 'order_book'
+                __book_data['exchange'] = self.__exchange
+                __book_data['symbol'] = symbol
+                __book_data['interval'] = None
+                __book_data['last_update_id'] = data['lastUpdateId']
+                __book_data['diff_update_id'] = 0
+                __book_data['book'] = self.__new_order_book(__stream_index,\
+                    self.get_symbol_tick_size(self.get_unified_symbol_from_symbol(symbol)))
+                __book_data['book'].set_snapshot(data['bids'], data['asks'])
+            else:
+                __book_data = dict(__book_data)
+                __book_data['diff_update_id'] = data['lastUpdateId'] - __book_data['last_update_id']
+                __book_data['last_update_id'] = data['lastUpdateId']
+                __book_data['book'].replace(data['bids'], data['asks'])
+
+            __book_data['type'] = 'snapshot'
+            self.__ws_temp_data[__stream_index] = __book_data
+
+            if self.__is_order_book_notify_due(__stream_index):
+                __message_out = None
+                __message_out = {}
+                __message_out['endpoint'] = 'order_book'
+                __message_out['exchange'] = self.__exchange
+                __message_out['symbol'] = symbol
+                __message_out['interval'] = None
+                __message_out['last_update_id'] = __book_data['last_update_id']
+                __message_out['diff_update_id'] = __book_data['diff_update_id']
+                __message_out['type'] = 'snapshot'
+
+                result = self.__get_order_book_output(__stream_index, __message_out)
 
         return result
 
@@ -553,8 +1340,9 @@ class BinanceusCcxwAuxClass():
                                                    __temp_data['k']['s'],\
                                                    __temp_data['k']['i'])
             if self.__ws_temp_data[__stream_index] is None\
-                or not isinstance(self.__ws_temp_data[__stream_index],dict):
-                self.__ws_temp_data[__stream_index] = {}
+                or not isinstance(self.__ws_temp_data[__stream_index], KlineBuffer):
+                self.__ws_temp_data[__stream_index] = KlineBuffer(self.__data_max_len,\
+                                                                  self.__result_max_len)
 
             __message_add = None
             __message_add = {}
@@ -582,14 +1370,13 @@ class BinanceusCcxwAuxClass():
             __message_add['is_closed'] = __temp_data['k']['x']
 
 
-            self.__ws_temp_data[__stream_index][int(__message_add['open_time'])] = __message_add
-
-            while len(self.__ws_temp_data[__stream_index]) > self.__data_max_len:
-                __first_key = min(list(self.__ws_temp_data[__stream_index].keys()))
-                __nc = self.__ws_temp_data[__stream_index].pop(__first_key,None)
+            self.__ws_temp_data[__stream_index].set(int(__message_add['open_time']),\
+                                                    __message_add)
 
-            __message_out = list(self.__ws_temp_data[__stream_index].values())
-            result = __message_out[:self.__result_max_len]
+            __message_out = (
+                self.__ws_temp_data[__stream_index].get_last(self.__result_max_len)
+            )
+            result = __message_out
 
         return result
 
@@ -738,6 +1525,51 @@ class BinanceusCcxwAuxClass():
 
         return result
 
+    def manage_websocket_message_bbo(self, data):
+        """
+        manage_websocket_message_bbo
+        ============================
+            This function manage websocket message and normalize result
+            data for bbo endpoint (bookTicker stream, pushed on every change of the
+            best bid or ask). bookTicker has no event time, the local time is used.
+
+                :param data: dict.
+                :return dict: Return dict with normalized data.
+        """
+        result = None
+
+        __temp_data = data
+
+        if __temp_data is not None and isinstance(__temp_data,dict)\
+            and 'u' in __temp_data and 's' in __temp_data\
+            and 'b' in __temp_data and 'a' in __temp_data:
+            __stream_index = self.get_stream_index('bbo', __temp_data['s'])
+
+            self.__ws_temp_data[__stream_index] = __temp_data
+
+            __message_add = None
+            __message_add = {}
+            __message_add['endpoint'] = 'bbo'
+            __message_add['exchange'] = self.__exchange
+            __message_add['symbol'] = __temp_data['s']
+            __message_add['interval'] = None
+            __message_add['update_id'] = int(__temp_data['u'])
+            __message_add['event_time'] = int(__temp_data.get('E', round(time.time() * 1000)))
+            __gmtime = time.gmtime(int(round(__message_add['event_time']/1000)))
+            __message_add['event_time_date'] = (
+                time.strftime("%Y-%m-%d %H:%M:%S",__gmtime) + '.' +\
+                str(round(math.modf(round(__message_add['event_time']\
+                                            /1000,3))[0]*1000)).rjust(3,'0')
+            )
+            __message_add['best_bid_price'] = __temp_data['b']
+            __message_add['best_bid_quantity'] = __temp_data['B']
+            __message_add['best_ask_price'] = __temp_data['a']
+            __message_add['best_ask_quantity'] = __temp_data['A']
+
+            result = __message_add
+
+        return result
+
     def manage_websocket_message(self, ws, message_in): # pylint: disable=unused-argument
         """
         manage_websocket_message
@@ -752,12 +1584,23 @@ class BinanceusCcxwAuxClass():
         result = None
 
         try:
+
             if ccf.is_json(message_in):
                 __temp_data = json.loads(message_in)
+                __stream_name = None
+
+                # Combined streams wrap the event with the stream name
+                if isinstance(__temp_data, dict) and 'stream' in __temp_data\
+                    and 'data' in __temp_data:
+                    __stream_name = __temp_data['stream']
+                    __temp_data = __temp_data['data']
 
                 __endpoint = 'NONE'
                 if isinstance(__temp_data, dict):
-                    if 'e' in __temp_data:
+                    if __stream_name is not None and 'lastUpdateId' in __temp_data\
+                        and '@depth' in __stream_name:
+                        __endpoint = 'order_book_partial'
+                    elif 'e' in __temp_data:
                         if __temp_data['e'] == 'depthUpdate':
                             __endpoint = 'order_book'
                         elif __temp_data['e'] == 'kline':
@@ -766,6 +1609,8 @@ class BinanceusCcxwAuxClass():
                             __endpoint = 'trades'
                         elif __temp_data['e'] == '24hrTicker':
                             __endpoint = 'ticker'
+                    elif 'u' in __temp_data and 'b' in __temp_data and 'A' in __temp_data:
+                        __endpoint = 'bbo'
 
                 if __endpoint == 'order_book':
                     __message_out = self.manage_websocket_message_order_book(__temp_data)
@@ -776,6 +1621,16 @@ class BinanceusCcxwAuxClass():
                         result['min_proc_time_ms'] = 0
                         result['max_proc_time_ms'] = 0
 
+                elif __endpoint == 'order_book_partial':
+                    __message_out = self.manage_websocket_message_order_book_partial(\
+                        __temp_data, __stream_name.split('@')[0].upper())
+
+                    if __message_out is not None:
+                        result = {}
+                        result['data'] = __message_out
+                        result['min_proc_time_ms'] = 0
+                        result['max_proc_time_ms'] = 0
+
                 elif __endpoint == 'kline':
                     __message_out = self.manage_websocket_message_kline(__temp_data)
 
@@ -803,6 +1658,15 @@ class BinanceusCcxwAuxClass():
                         result['min_proc_time_ms'] = 0
                         result['max_proc_time_ms'] = 0
 
+                elif __endpoint == 'bbo':
+                    __message_out = self.manage_websocket_message_bbo(__temp_data)
+
+                    if __message_out is not None:
+                        result = {}
+                        result['data'] = __message_out
+                        result['min_proc_time_ms'] = 0
+                        result['max_proc_time_ms'] = 0
+
         except Exception as exc: # pylint: disable=broad-except
             print(str(exc))
 
@@ -831,47 +1695,7 @@ class BinanceusCcxwAuxClass():
                 and self.__ws_temp_data[__stream_index] is not None\
                 and isinstance(self.__ws_temp_data[__stream_index], dict):
                 current_data = self.__ws_temp_data[__stream_index]
-                __temp_bids_d = {}
-                __temp_asks_d = {}
-                __temp_bids_l = []
-                __temp_asks_l = []
-
-                __key_c = 'bids'
-                __key_d = 'b'
-                for i in range(0,len(current_data[__key_c])):
-                    __temp_bids_d[current_data[__key_c][i][0]] = current_data[__key_c][i][1]
-
-                for i in range(0,len(diff_data[__key_d])):
-                    if float(diff_data[__key_d][i][1]) == 0:
-                        n_t = __temp_bids_d.pop(diff_data[__key_d][i][0],None) # pylint: disable=unused-variable
-                    else:
-                        __temp_bids_d[diff_data[__key_d][i][0]] = diff_data[__key_d][i][1]
-
-                for i,j in __temp_bids_d.items():
-                    __temp_bids_l.append([i,j])
-
-                __temp_bids = sorted(__temp_bids_l, key=lambda value: float(value[0]), reverse=True)
-
-                __key_c = 'asks'
-                __key_d = 'a'
-                for i in range(0,len(current_data[__key_c])):
-                    __temp_asks_d[current_data[__key_c][i][0]] = current_data[__key_c][i][1]
-
-                for i in range(0,len(diff_data[__key_d])):
-                    if float(diff_data[__key_d][i][1]) == 0:
-                        n_t = __temp_asks_d.pop(diff_data[__key_d][i][0],None)
-                    else:
-                        __temp_asks_d[diff_data[__key_d][i][0]] = diff_data[__key_d][i][1]
-
-                for i,j in __temp_asks_d.items():
-                    __temp_asks_l.append([i,j])
-
-                __temp_asks = (
-                    sorted(__temp_asks_l, key=lambda value: float(value[0]), reverse=False)
-                )
-
-                current_data['bids'] = __temp_bids
-                current_data['asks'] = __temp_asks
+                current_data['book'].update(diff_data['b'], diff_data['a'])
                 current_data['diff_update_id'] = diff_data['U'] - current_data['last_update_id']
                 current_data['last_update_id'] = diff_data['u']
                 current_data['type'] = 'update'
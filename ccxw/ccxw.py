@@ -7,6 +7,7 @@ Date: 2023-10-31
 """
 
 import threading
+import concurrent.futures
 import os
 import os.path
 import time
@@ -25,6 +26,7 @@ from ccxw.bingx import BingxCcxwAuxClass
 from ccxw.kucoin import KucoinCcxwAuxClass
 from ccxw.okx import OkxCcxwAuxClass
 from ccxw.binanceus import BinanceusCcxwAuxClass
+from ccxw.indicators import KlineIndicators
 
 class CcxwExchangeConfig:
     """
@@ -84,6 +86,10 @@ class Ccxw():
                     {\
                         'endpoint': 'ticker',\
                         'symbol': symbol
+                    },\
+                    {\
+                        'endpoint': 'bbo',\
+                        'symbol': symbol
                     }\
             ]
     
@@ -111,9 +117,13 @@ class Ccxw():
     ```
     """
 
+    __symbols_universe_cache = {}
+    __symbols_universe_lock = threading.Lock()
+
     def __init__(self, exchange, streams=list[dict], trading_type: str='SPOT',\
         testmode: bool=False, result_max_len: int=5,\
-        data_max_len: int=2500, debug: bool=False):
+        data_max_len: int=2500, debug: bool=False, on_update=None,\
+        state_file: str=None, state_interval: int=60, state_max_age: int=3600):
         """
         Ccxw constructor
         ================
@@ -123,18 +133,86 @@ class Ccxw():
                                     dicts must have this struct.
                                         {
                                             'endpoint': str only allowed 'order_book' | 'kline' |\
-                                                'trades' | 'ticker',
+                                                'trades' | 'ticker' | 'bbo',
                                             'symbol': str unified symbol.,
                                             'interval': str '1m' | '3m' | '5m' | '15m' | '30m' |\
                                                 '1h' | '2h' | '4h' | '6h' | '8h' | '12h' | '1d' |\
                                                 '3d' | '1w' | '1mo' for 'kline' endpoint is\
                                                     mandatory.
+                                            'max_depth': int optional, only for 'order_book'\
+                                                endpoint, levels kept on each side of the local\
+                                                book (plus a margin), default full book.
+                                            'aggregation': dict optional, only for 'order_book'\
+                                                endpoint, {'step': float price step} or\
+                                                {'bps': float bps of mid}, price buckets kept\
+                                                by the local book.
+                                            'output_mode': str optional, only for 'order_book'\
+                                                endpoint, 'snapshot' (default) | 'delta', with\
+                                                'delta' messages carry only the changed levels\
+                                                (size '0' removes the level) and a 'sequence'.
+                                            'snapshot_interval': int optional, deltas between\
+                                                full snapshots in 'delta' output_mode, default 100.
+                                            'notify_on': str optional, only for 'order_book'\
+                                                endpoint, 'bbo' | 'top_n', data is only updated\
+                                                when the best level or the best result_max_len\
+                                                levels change, default every update.
+                                            'conflation_ms': int | float optional, only for\
+                                                'order_book' endpoint, the data is built at most\
+                                                every conflation_ms (or on read if it is stale),\
+                                                diffs are always applied to the local book.
+                                            'history': dict optional, only for 'order_book'\
+                                                endpoint, {'interval_ms': 100, 'depth': 10,\
+                                                'max_len': 3000} sampled best levels ring.
+                                            'depth': int | str optional, only for\
+                                                'order_book' endpoint, 5 | 20 | 50 | 'full'\
+                                                subscribes the nearest native depth channel.
+                                            'update_speed': str optional, only for\
+                                                'order_book' endpoint, '100ms' (default) |\
+                                                '1000ms', only Binance supports it.
+                                            'integrity_resync': bool optional, only for\
+                                                'order_book' endpoint, resync the book when\
+                                                an invariant check fails, default False.
+                                            'max_snapshot_age': int | float optional, only\
+                                                for 'order_book' endpoint, seconds before a\
+                                                snapshot is counted stale (and resynced with\
+                                                integrity_resync).
+                                            'depth_bands_bps': list optional, only for\
+                                                'order_book' endpoint, bands in bps of mid of\
+                                                the get_book_stats() depth, default\
+                                                [10, 25, 50, 100], [] for none.
+                                            'record': dict optional, only for 'order_book'\
+                                                endpoint, {'path': str, 'checkpoint_interval':\
+                                                60} file of the received diffs with full book\
+                                                checkpoints, read with\
+                                                OrderBookRecorder.get_book_at().
+                                            'indicators': dict optional, only for 'kline'\
+                                                endpoint, name -> {'type': 'sma' | 'ema' |\
+                                                'rsi' | 'atr' | 'bollinger', 'period': int,\
+                                                'num_std': float (bollinger)} indicators\
+                                                updated once per message, their values are\
+                                                in the 'indicators' key of the data.
                                         }
             :param trading_type: str only allowed 'SPOT'.
             :param testmode: bool.
             :param result_max_len: int Max return values > 1 and <= data_max_len.
             :param data_max_len: int. > 1 and <= 2500 max len of data getting from exchange.
             :param debug: bool Output verbosity.
+            :param on_update: callable | None, called after each data update as
+                on_update(exchange, endpoint, symbol, data) with the unified symbol and the
+                new data (the 'data' key of get_current_data()). It runs in its own thread
+                ('ccxw_on_update_thread'), never in the websocket thread, so a slow
+                callback does not delay the data: while it runs only the latest update of
+                each stream is kept for the next call. Exceptions are printed and ignored.
+            :param state_file: str | None, gzip JSON file where the stream data and the kline
+                and trades buffers are saved by stop() and every state_interval seconds,
+                and restored by start(). Restored data has 'stale': True until the stream
+                receives new data, restored trades keep 'stale': True. The buffers are also
+                kept across reconnections.
+            :param state_interval: int seconds between state saves while running.
+            :param state_max_age: int | None, max age in seconds of a state to be restored,
+                older states are ignored (None for no limit). A kline buffer is only
+                restored when the live stream continues it without missing candles. Both
+                checks also apply to the buffers kept across a reconnection.
 
             :return: Return a new instance of the Class Ccxw.
         """
@@ -153,6 +231,9 @@ class Ccxw():
         if exchange not in Ccxw.get_supported_exchanges():
             raise ValueError('The exchange ' + str(exchange) + ' is not supported.')
 
+        if streams is None:
+            raise ValueError('The streams struct is not valid' + str(streams))
+
         self.__key_sel = {}
 
         self.__exchange = None
@@ -186,6 +267,17 @@ class Ccxw():
         self.__limit_ping_message = 32
 
         self.__ws_streams = streams
+        self.__on_update = on_update
+        self.__on_update_pending = {}
+        self.__on_update_condition = threading.Condition()
+        self.__on_update_thread = None
+        self.__state_file = state_file
+        self.__state_interval = max(int(state_interval), 1)
+        self.__state_max_age = state_max_age
+        self.__state_thread = None
+        self.__restored_data = {}
+        self.__reconnect_buffers = None
+        self.__kline_indicators = {}
 
         if exchange in self.get_supported_exchanges():
             self.__exchange = exchange
@@ -201,6 +293,13 @@ class Ccxw():
 
             self.__init_key_selector()
 
+            for __stream in self.__ws_streams:
+                if __stream['endpoint'] == 'kline' and __stream.get('indicators') is not None:
+                    __index = self.__auxiliary_class.get_stream_index('kline',\
+                                                                      __stream['symbol'],\
+                                                                      __stream['interval'])
+                    self.__kline_indicators[__index] = KlineIndicators(__stream['indicators'])
+
             self.__database_name = '/tmp/temp_database_'\
                 + str(datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f"))\
                 + '_' + str(random.randint(90000,99999)) + '_'\
@@ -344,6 +443,9 @@ class Ccxw():
         result = False
         self.__start_time = int(time.time())
 
+        if self.__state_file is not None:
+            self.__load_state()
+
         if self.__auxiliary_class is not None and hasattr(self.__auxiliary_class, 'start'):
             self.__auxiliary_class.start()
             time.sleep(2)
@@ -359,6 +461,18 @@ class Ccxw():
         except Exception: # pylint: disable=broad-except
             result = False
 
+        if result and self.__on_update is not None:
+            self.__on_update_thread = threading.Thread(target=self.__thread_on_update,
+                                                       daemon=True,
+                                                       name='ccxw_on_update_thread')
+            self.__on_update_thread.start()
+
+        if result and self.__state_file is not None:
+            self.__state_thread = threading.Thread(target=self.__thread_state,
+                                                   daemon=True,
+                                                   name='ccxw_state_thread')
+            self.__state_thread.start()
+
         time.sleep(5)
 
         return result
@@ -423,6 +537,20 @@ class Ccxw():
         if self.__thread is not None:
             self.__thread.join(time_to_wait)
 
+        if self.__state_thread is not None:
+            self.__state_thread.join(5)
+            self.__state_thread = None
+
+        if self.__on_update_thread is not None:
+            with self.__on_update_condition:
+                self.__on_update_condition.notify()
+
+            self.__on_update_thread.join(5)
+            self.__on_update_thread = None
+
+        if self.__state_file is not None and self.__start_time > 0:
+            self.__save_state()
+
         # print('ENTRE: 8888')
         # pprint.pprint(str(self.__auxiliary_class))
         self.__start_time = 0
@@ -460,8 +588,10 @@ class Ccxw():
 
                 for __key_data in self.__key_sel.values():
                     __sql_insert_data = f'INSERT INTO {self.__table_name} \
-                                            (key_data, value_data) VALUES (?, NULL);\n'
-                    self.__cursor_db.execute(__sql_insert_data, (str(__key_data),))
+                                            (key_data, value_data) VALUES (?, ?);\n'
+                    self.__cursor_db.execute(__sql_insert_data,\
+                                             (str(__key_data),\
+                                              self.__restored_data.get(__key_data)))
 
                 self.__conn_db.commit()
                 result = True
@@ -512,6 +642,8 @@ class Ccxw():
         """
         result = False
 
+        self.__restore_reconnect_buffers()
+
         if self.__ws_endpoint_on_auth_vars is not None\
             and isinstance(self.__ws_endpoint_on_auth_vars, str):
             try:
@@ -575,13 +707,13 @@ class Ccxw():
                     ws.sock.close()
                     print(f'Cerrando socket {self.__exchange}')
             except Exception: # pylint: disable=broad-except
-                self.__auxiliary_class.reset_ws_temp_data()
+                self.__reset_ws_temp_data()
                 print(f'ERROR: Cerrando socket {self.__exchange}')
 
         if close_status_code is None and close_msg is None:
             self.__ws_ended = True
         else:
-            self.__auxiliary_class.reset_ws_temp_data()
+            self.__reset_ws_temp_data()
 
         timer = threading.Timer(40, force_close)
         timer.start()
@@ -656,26 +788,7 @@ class Ccxw():
                 #print('I: ' + str(__endpoint) + ', ' + str(__symbol) + ', ' + str(__symbol))
 
                 if len(__endpoint) > 0 and len(__symbol) > 0:
-                    __index_key_sel = self.__auxiliary_class.get_stream_index(__endpoint,\
-                                                                            __symbol,\
-                                                                            __interval)
-
-                    __ws_temp_data = __managed_data
-                    __ws_temp_data['min_proc_time_ms'] = self.min_proc_time_ms
-                    __ws_temp_data['max_proc_time_ms'] = self.max_proc_time_ms
-                    __message_out = json.dumps(__ws_temp_data)
-                    __message_out = gzip.compress(bytes(__message_out,'utf-8'), compresslevel=9)
-                    __message_base64 = base64.b64encode(__message_out).decode("ascii")
-                    __sql_update = (
-                        f'UPDATE {self.__table_name} SET value_data = ? WHERE key_data = ?;'
-                    )
-
-                    with self.__conn_db_lock:
-                        self.__cursor_db = self.__conn_db.cursor()
-                        self.__cursor_db.execute(__sql_update,\
-                                                (str(__message_base64),\
-                                                str(self.__key_sel[__index_key_sel])))
-                        self.__conn_db.commit()
+                    self.__store_managed_data(__managed_data, __endpoint, __symbol, __interval)
 
         except Exception as exc: # pylint: disable=broad-except
             print(str(exc))
@@ -692,6 +805,349 @@ class Ccxw():
         # if self.__stop_launcher and not self.__ws_ended:
         #     ws.close()
 
+    def __store_managed_data(self, managed_data, endpoint, symbol, interval):
+        """
+        Ccxw __store_managed_data function.
+        ===================================
+            This function convert the managed data in json string, compress, encode in
+            base64 and then update the temporal database.
+                :param self: Ccxw instance.
+                :param managed_data: dict with data, min_proc_time_ms and max_proc_time_ms.
+                :param endpoint: str.
+                :param symbol: str.
+                :param interval: str.
+
+                :return None:
+        """
+        __index_key_sel = self.__auxiliary_class.get_stream_index(endpoint, symbol, interval)
+
+        __ws_temp_data = managed_data
+
+        if __index_key_sel in self.__kline_indicators\
+            and isinstance(managed_data['data'], list):
+            # Each message only changes the live candle, the one before it gets its
+            # last revision when a new candle starts
+            self.__kline_indicators[__index_key_sel].update(managed_data['data'][-2:])
+            __ws_temp_data['indicators'] = self.__kline_indicators[__index_key_sel].get_values()
+
+        __ws_temp_data['min_proc_time_ms'] = self.min_proc_time_ms
+        __ws_temp_data['max_proc_time_ms'] = self.max_proc_time_ms
+        __message_base64 = self.__encode_data(__ws_temp_data)
+        __sql_update = (
+            f'UPDATE {self.__table_name} SET value_data = ? WHERE key_data = ?;'
+        )
+
+        with self.__conn_db_lock:
+            self.__cursor_db = self.__conn_db.cursor()
+            self.__cursor_db.execute(__sql_update,\
+                                    (str(__message_base64),\
+                                    str(self.__key_sel[__index_key_sel])))
+            self.__conn_db.commit()
+
+        if self.__on_update is not None:
+            with self.__on_update_condition:
+                self.__on_update_pending[(endpoint, symbol)] = managed_data['data']
+                self.__on_update_condition.notify()
+
+    def __encode_data(self, data):
+        """
+        Ccxw __encode_data function.
+        ============================
+            This function convert data in json string, compress and encode in base64
+            for the temporal database.
+                :param self: Ccxw instance.
+                :param data: dict.
+
+                :return str: base64 string.
+        """
+        result = json.dumps(data)
+        result = gzip.compress(bytes(result,'utf-8'), compresslevel=9)
+        result = base64.b64encode(result).decode("ascii")
+
+        return result
+
+    def __decode_data(self, value):
+        """
+        Ccxw __decode_data function.
+        ============================
+            This function decode a value of the temporal database.
+                :param self: Ccxw instance.
+                :param value: str base64 string.
+
+                :return dict: decoded data.
+        """
+        result = json.loads(gzip.decompress(base64.b64decode(value)).decode('utf-8'))
+
+        return result
+
+    def __get_stream_keys(self):
+        """
+        Ccxw __get_stream_keys function.
+        ================================
+            This function return the streams with their index.
+                :param self: Ccxw instance.
+
+                :return list: list of tuple (index, endpoint, symbol, interval).
+        """
+        result = []
+
+        for __stream in self.__ws_streams:
+            __interval = __stream.get('interval', 'none')
+            __index = self.__auxiliary_class.get_stream_index(__stream['endpoint'],\
+                                                              __stream['symbol'],\
+                                                              __interval)
+            result.append((__index, __stream['endpoint'], __stream['symbol'], __interval))
+
+        return result
+
+    def __load_state(self):
+        """
+        Ccxw __load_state function.
+        ===========================
+            This function restore the state saved in state_file: the kline and trades
+            buffers of the auxiliary class and the stream data, marked 'stale': True, to
+            be inserted in the temporal database when it is created. A state older than
+            state_max_age is ignored, a kline buffer is skipped if candles are missing
+            between its last candle and the current one.
+                :param self: Ccxw instance.
+
+                :return bool: Return True if the state was restored.
+        """
+        result = False
+
+        self.__restored_data = {}
+
+        try:
+            if os.path.exists(self.__state_file):
+                with gzip.open(self.__state_file, 'rt', encoding='utf-8') as __file:
+                    __state = json.load(__file)
+
+                if isinstance(__state, dict) and __state.get('exchange') == self.__exchange\
+                    and (self.__state_max_age is None\
+                         or time.time() - float(__state.get('timestamp', 0))\
+                            <= self.__state_max_age):
+                    for __index, __endpoint, __symbol, __interval in self.__get_stream_keys():
+                        __stream_state = __state['streams'].get(__index)
+
+                        if __stream_state is None:
+                            continue
+
+                        self.__set_stream_buffer(__index, __endpoint, __symbol, __interval,\
+                                                 __stream_state.get('buffer'))
+
+                        if __stream_state.get('data') is not None:
+                            __stream_state['data']['stale'] = True
+                            self.__restored_data[__index] = (
+                                self.__encode_data(__stream_state['data'])
+                            )
+
+                    result = True
+
+        except Exception as exc: # pylint: disable=broad-except
+            print('State load error: ' + str(exc))
+
+        return result
+
+    def __set_stream_buffer(self, index, endpoint, symbol, interval, messages):
+        """
+        Ccxw __set_stream_buffer function.
+        ==================================
+            This function restore a saved kline or trades buffer in the auxiliary class.
+            A kline buffer is skipped if candles are missing before the current one, the
+            trades missed meanwhile can not be recovered so restored trades are marked
+            'stale': True.
+                :param self: Ccxw instance.
+                :param index: str stream index.
+                :param endpoint: str.
+                :param symbol: str.
+                :param interval: str.
+                :param messages: list | None messages oldest first.
+
+                :return bool: Return True if the buffer was restored.
+        """
+        result = False
+
+        if endpoint == 'kline' and not self.__is_kline_buffer_current(messages, interval):
+            messages = None
+        elif endpoint == 'trades' and isinstance(messages, list):
+            messages = [dict(__message, stale=True) for __message in messages]
+
+        if messages is not None and hasattr(self.__auxiliary_class, 'set_stream_buffer'):
+            result = self.__auxiliary_class.set_stream_buffer(endpoint, symbol, interval,\
+                                                              messages)
+
+            if result and index in self.__kline_indicators:
+                self.__kline_indicators[index].update(messages)
+
+        return result
+
+    def __reset_ws_temp_data(self):
+        """
+        Ccxw __reset_ws_temp_data function.
+        ===================================
+            This function reset the auxiliary class data when the websocket is closed.
+            With state_file the kline and trades buffers are kept, to be restored when
+            the websocket is opened again with the checks of a saved state.
+                :param self: Ccxw instance.
+
+                :return None:
+        """
+        if self.__state_file is not None\
+            and hasattr(self.__auxiliary_class, 'get_stream_buffer'):
+            __buffers = {}
+
+            for __index, __endpoint, __symbol, __interval in self.__get_stream_keys():
+                __buffers[__index] = (
+                    self.__auxiliary_class.get_stream_buffer(__endpoint, __symbol, __interval)
+                )
+
+            self.__reconnect_buffers = (time.time(), __buffers)
+
+        self.__auxiliary_class.reset_ws_temp_data()
+
+    def __restore_reconnect_buffers(self):
+        """
+        Ccxw __restore_reconnect_buffers function.
+        ==========================================
+            This function restore the buffers kept by __reset_ws_temp_data() when the
+            websocket is opened again, unless they are older than state_max_age.
+                :param self: Ccxw instance.
+
+                :return bool: Return True if the buffers were restored.
+        """
+        result = False
+
+        if self.__reconnect_buffers is not None:
+            __timestamp, __buffers = self.__reconnect_buffers
+            self.__reconnect_buffers = None
+
+            if self.__state_max_age is None\
+                or time.time() - __timestamp <= self.__state_max_age:
+                for __index, __endpoint, __symbol, __interval in self.__get_stream_keys():
+                    self.__set_stream_buffer(__index, __endpoint, __symbol, __interval,\
+                                             __buffers.get(__index))
+
+                result = True
+
+        return result
+
+    def __is_kline_buffer_current(self, messages, interval):
+        """
+        Ccxw __is_kline_buffer_current function.
+        ========================================
+            This function check that the live stream continues a saved kline buffer: the
+            current candle is its last candle or the next one.
+                :param self: Ccxw instance.
+                :param messages: list | None kline messages oldest first.
+                :param interval: str.
+
+                :return bool: Return True if no candle is missing.
+        """
+        result = False
+
+        if isinstance(messages, list) and len(messages) > 0:
+            __last_open_time = int(messages[-1]['open_time']) / 1000
+            result = time.time()\
+                < __last_open_time + 2 * self.get_delta_time_from_interval(interval)
+
+        return result
+
+    def __save_state(self):
+        """
+        Ccxw __save_state function.
+        ===========================
+            This function save the stream data of the temporal database and the kline
+            and trades buffers of the auxiliary class in state_file, replaced atomically.
+                :param self: Ccxw instance.
+
+                :return bool: Return True if the state was saved.
+        """
+        result = False
+
+        __sql_select = f'SELECT value_data FROM "{self.__table_name}" WHERE key_data = ?;'
+
+        __reconnect_buffers = self.__reconnect_buffers
+
+        try:
+            __state = {'exchange': self.__exchange, 'timestamp': time.time(), 'streams': {}}
+
+            for __index, __endpoint, __symbol, __interval in self.__get_stream_keys():
+                __stream_state = {'data': None, 'buffer': None}
+
+                with self.__conn_db_lock:
+                    __local_cursor_db = self.__conn_db.cursor()
+                    __local_cursor_db.execute(__sql_select, (str(self.__key_sel[__index]),))
+                    __current_data = __local_cursor_db.fetchone()
+
+                if __current_data is not None and __current_data[0] is not None:
+                    __stream_state['data'] = self.__decode_data(__current_data[0])
+
+                if hasattr(self.__auxiliary_class, 'get_stream_buffer'):
+                    __stream_state['buffer'] = (
+                        self.__auxiliary_class.get_stream_buffer(__endpoint, __symbol,\
+                                                                 __interval)
+                    )
+
+                # Closed websocket, its buffers are kept until it is opened again
+                if __stream_state['buffer'] is None and __reconnect_buffers is not None:
+                    __stream_state['buffer'] = __reconnect_buffers[1].get(__index)
+
+                __state['streams'][__index] = __stream_state
+
+            __temp_file = self.__state_file + '.tmp'
+
+            with gzip.open(__temp_file, 'wt', encoding='utf-8', compresslevel=6) as __file:
+                json.dump(__state, __file, separators=(',', ':'))
+
+            os.replace(__temp_file, self.__state_file)
+            result = True
+
+        except Exception as exc: # pylint: disable=broad-except
+            print('State save error: ' + str(exc))
+
+        return result
+
+    def __thread_state(self):
+        """
+        Ccxw __thread_state function.
+        =============================
+            State checkpointer, save the state every state_interval seconds while the
+            websocket is running.
+                :param self: Ccxw instance.
+        """
+        __last_save = time.time()
+
+        while not self.__stop_launcher:
+            time.sleep(1)
+
+            if not self.__stop_launcher\
+                and time.time() - __last_save >= self.__state_interval:
+                self.__save_state()
+                __last_save = time.time()
+
+    def __thread_on_update(self):
+        """
+        Ccxw __thread_on_update function.
+        =================================
+            on_update worker, call on_update with the latest update of each stream
+            stored since the last calls, while the websocket is running.
+                :param self: Ccxw instance.
+        """
+        while not self.__stop_launcher:
+            with self.__on_update_condition:
+                if len(self.__on_update_pending) == 0:
+                    self.__on_update_condition.wait(1)
+
+                __pending = self.__on_update_pending
+                self.__on_update_pending = {}
+
+            for (__endpoint, __symbol), __data in __pending.items():
+                try:
+                    self.__on_update(self.__exchange, __endpoint,\
+                        self.__auxiliary_class.get_unified_symbol_from_symbol(__symbol), __data)
+                except Exception as exc: # pylint: disable=broad-except
+                    print('on_update error: ' + str(exc))
+
     def get_current_data(self, endpoint, symbol, interval='none'):
         """
         Ccxw get_current_data function.
@@ -712,6 +1168,13 @@ class Ccxw():
         __sql_select = f'SELECT value_data FROM "{self.__table_name}" WHERE key_data = ?;'
 
         try:
+            if endpoint == 'order_book'\
+                and hasattr(self.__auxiliary_class, 'get_pending_order_book'):
+                __pending_data = self.__auxiliary_class.get_pending_order_book(symbol)
+
+                if __pending_data is not None:
+                    self.__store_managed_data({'data': __pending_data}, endpoint, symbol, interval)
+
             with self.__conn_db_lock:
                 __local_cursor_db = self.__conn_db.cursor()
                 __local_cursor_db.execute(__sql_select, (str(self.__key_sel[__index_key_sel]),))
@@ -721,9 +1184,7 @@ class Ccxw():
                 and isinstance(__current_data,(list, tuple))\
                 and len(__current_data) > 0 and __current_data[0] is not None\
                 and isinstance(__current_data[0],str):
-                result = (
-                    json.loads(gzip.decompress(base64.b64decode(__current_data[0])).decode('utf-8'))
-                )
+                result = self.__decode_data(__current_data[0])
 
                 if result is not None and isinstance(result, dict) and 'data' in result\
                     and result['data'] is not None:
@@ -755,6 +1216,235 @@ class Ccxw():
 
         return result
 
+    def get_order_book_counters(self, symbol):
+        """
+        Ccxw get_order_book_counters function.
+        ======================================
+            This method return the local order book health counters of a symbol
+            (checksum results, sequence gaps, resyncs), the counters depend on the exchange.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+
+                :return: dict with counters, None if the exchange does not keep counters.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_order_book_counters'):
+            result = self.__auxiliary_class.get_order_book_counters(symbol)
+
+        return result
+
+    def get_order_book_integrity(self, symbol):
+        """
+        Ccxw get_order_book_integrity function.
+        =======================================
+            This method return the invariant check counters of the local order book of a
+            symbol (checks, crossed, unordered, bad_size, stale_snapshot, consistent and
+            snapshot_age), kept across resyncs.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+
+                :return: dict with counters, None if the exchange does not keep them.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_order_book_integrity'):
+            result = self.__auxiliary_class.get_order_book_integrity(symbol)
+
+        return result
+
+    def get_book_stats(self, symbol):
+        """
+        Ccxw get_book_stats function.
+        =============================
+            This method return the statistics of the local order book of a symbol, they
+            are maintained by the book engine on each change so reading is free.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+
+                :return: dict with best_bid, best_bid_size, best_ask, best_ask_size, mid,
+                    spread, spread_bps, microprice, imbalance and depth_bps
+                    ({'10': {'bids': size, 'asks': size}, '25': ..., '50': ..., '100': ...}),
+                    None if the book is not available.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_book_stats'):
+            result = self.__auxiliary_class.get_book_stats(symbol)
+
+        return result
+
+    def get_aggregated_order_book(self, symbol, depth=None):
+        """
+        Ccxw get_aggregated_order_book function.
+        ========================================
+            This method return the price buckets of the local order book of a symbol,
+            configured with the 'aggregation' stream option. Buckets are updated on each
+            level change, bids are rounded down and asks up to the bucket price.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param depth: int | None buckets on each side (None for all).
+
+                :return: dict {'step': float, 'bids': [[price, size], ...],\
+                    'asks': [[price, size], ...]}, None if it is not available.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_aggregated_order_book'):
+            result = self.__auxiliary_class.get_aggregated_order_book(symbol, depth)
+
+        return result
+
+    def get_order_book_deltas(self, symbol, from_sequence=0):
+        """
+        Ccxw get_order_book_deltas function.
+        ====================================
+            This method return the order book snapshots and level changes of a symbol
+            recorded after from_sequence, for streams with output_mode 'delta'. The stored
+            message only keeps the last entry, consumers that maintain their own book read
+            the entries from here. If from_sequence is too old the entries start at the
+            last full snapshot.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param from_sequence: int last sequence already applied, 0 for all.
+
+                :return: list of dict {'sequence': int, 'type': 'snapshot' | 'delta',\
+                    'bids': [[price, size], ...], 'asks': [[price, size], ...]},\
+                    None if the stream is not in 'delta' output_mode.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_order_book_deltas'):
+            result = self.__auxiliary_class.get_order_book_deltas(symbol, from_sequence)
+
+        return result
+
+    def get_order_book_history(self, symbol, start_time=None, end_time=None):
+        """
+        Ccxw get_order_book_history function.
+        =====================================
+            This method return the best levels of a symbol sampled by the local book at
+            most every history interval_ms, for streams with the 'history' option. Samples
+            are only taken when the book changes, between two samples the book did not
+            change or changed in less than interval_ms.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param start_time: float | None unix time, None from the first sample.
+                :param end_time: float | None unix time, None up to the last sample.
+
+                :return: list of dict {'timestamp': float, 'bids': [[price, size], ...],\
+                    'asks': [[price, size], ...]} oldest first, None without history.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_order_book_history'):
+            result = self.__auxiliary_class.get_order_book_history(symbol, start_time, end_time)
+
+        return result
+
+    def get_order_book_arrays(self, symbol, depth=None):
+        """
+        Ccxw get_order_book_arrays function.
+        ====================================
+            This method return the local order book of a symbol as numpy float64 arrays
+            of prices and sizes, best first. The arrays are read-only views built once per
+            book change, copy them to modify. Needs the optional numpy dependency
+            (pip install ccxw[numpy]).
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param depth: int | None levels on each side (None for all).
+
+                :return: dict {'bids': (prices, sizes), 'asks': (prices, sizes)},\
+                    None if the book is not available or numpy is not installed.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_order_book_arrays'):
+            result = self.__auxiliary_class.get_order_book_arrays(symbol, depth)
+
+        return result
+
+    def get_klines_arrays(self, symbol, interval, count=None):
+        """
+        Ccxw get_klines_arrays function.
+        ================================
+            This method return the last candles of a kline stream as numpy arrays, oldest
+            first. Klines are kept in columns, the arrays are read-only zero-copy views of
+            them: the live candle changes in place and new candles overwrite the oldest,
+            copy them to keep the values. Needs the optional numpy dependency
+            (pip install ccxw[numpy]).
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param interval: str unified interval.
+                :param count: int | None candles (None for all, up to data_max_len).
+
+                :return: dict {'open_time': int64, 'close_time': int64, 'last_update_id':\
+                    int64, 'open': float64, 'high': float64, 'low': float64, 'close':\
+                    float64, 'volume': float64}, None if the stream has no data or numpy is\
+                    not installed.
+        """
+        result = None
+
+        if hasattr(self.__auxiliary_class, 'get_klines_arrays'):
+            result = self.__auxiliary_class.get_klines_arrays(symbol, interval, count)
+
+        return result
+
+    def get_kline_indicators(self, symbol, interval):
+        """
+        Ccxw get_kline_indicators function.
+        ===================================
+            This method return the current values of the indicators of a kline stream,
+            with the in-progress candle (the same values as the 'indicators' key of
+            get_current_data()).
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param interval: str unified interval.
+
+                :return: dict name -> value (None while warming up) and 'open_time' of the\
+                    in-progress candle, None if the stream has no indicators.
+        """
+        result = None
+
+        __index = self.__auxiliary_class.get_stream_index('kline', symbol, interval)
+
+        if __index in self.__kline_indicators:
+            result = self.__kline_indicators[__index].get_values()
+
+        return result
+
+    def add_kline_indicator(self, symbol, interval, name, indicator):
+        """
+        Ccxw add_kline_indicator function.
+        ==================================
+            This method register an indicator in a kline stream, warmed up with the
+            candles already received. Custom indicators subclass ccxw.indicators.Indicator.
+                :param self: Ccxw instance.
+                :param symbol: str unified symbol.
+                :param interval: str unified interval.
+                :param name: str key of the value.
+                :param indicator: Indicator instance, e.g. EmaIndicator(period=20).
+
+                :return bool: Return True if the stream exists.
+        """
+        result = False
+
+        __index = self.__auxiliary_class.get_stream_index('kline', symbol, interval)
+
+        if __index in self.__key_sel:
+            if __index not in self.__kline_indicators:
+                self.__kline_indicators[__index] = KlineIndicators()
+
+            __klines = None
+
+            if hasattr(self.__auxiliary_class, 'get_stream_buffer'):
+                __klines = self.__auxiliary_class.get_stream_buffer('kline', symbol, interval)
+
+            self.__kline_indicators[__index].add(name, indicator, __klines)
+            result = True
+
+        return result
+
     def get_sqlite_memory_used(self):
         """
         Ccxw get_sqlite_memory_used function.
@@ -824,6 +1514,9 @@ class Ccxw():
                     __data = self.get_current_data(__endpoint, __symbol, __interval)
                     __cmp = False
 
+                    if __data is not None and isinstance(__data, dict) and __data.get('stale'):
+                        __data = None # Restored data, the stream did not resume yet
+
                     if __endpoint == 'order_book':
                         if __data is not None and isinstance(__data, dict):
                             __last_get_time = float(__data['data']['timestamp'])
@@ -861,7 +1554,7 @@ class Ccxw():
                                 > (9 *__get_limit_times * __time_interval)
                             if __cmp:
                                 result = False
-                    elif __endpoint == 'ticker':
+                    elif __endpoint in ('ticker', 'bbo'):
                         if __data is not None and isinstance(__data, dict):
 
                             __last_get_time = float(__data['data']['event_time']) / 1000
@@ -922,6 +1615,119 @@ class Ccxw():
 
         return result
 
+    @classmethod
+    def get_symbols_universe(cls, exchanges=None, trading_type: str='SPOT',\
+                             testmode: bool=False, force_update: bool=False):
+        """
+        Ccxw get_symbols_universe function.
+        ===================================
+            This method fetch the metadata of all exchanges concurrently and build an inverted
+            index unified symbol -> exchange -> native symbol and supported intervals.
+            The index is cached by the class, the cache time is the same used for exchange info.
+                :param cls: Ccxw Class.
+                :param exchanges: list[str] | None exchanges to include, None for all entries
+                    in CcxwExchangeConfig.exchange_classes.
+                :param trading_type: str only allowed 'SPOT'.
+                :param testmode: bool.
+                :param force_update: bool ignore cached data.
+
+                :return: dict {
+                                'BTC/USDT': {
+                                    'binance': {'symbol': 'BTCUSDT', 'intervals': [...],
+                                                'tick_size': '0.01000000'},
+                                    ...
+                                },
+                                ...
+                            }
+        """
+        result = None
+
+        __max_last_get_time = 7200
+
+        if exchanges is None:
+            exchanges = list(CcxwExchangeConfig.exchange_classes.keys())
+
+        __exchanges = []
+        for __exchange in exchanges:
+            if __exchange in CcxwExchangeConfig.exchange_classes\
+                and __exchange not in __exchanges:
+                __exchanges.append(__exchange)
+
+        __cache_key = (tuple(sorted(__exchanges)), str(trading_type).upper(), bool(testmode))
+        __current_time = int(time.time())
+
+        with cls.__symbols_universe_lock:
+            __cache_data = cls.__symbols_universe_cache.get(__cache_key)
+            if not force_update and __cache_data is not None\
+                and (__current_time - __cache_data['last_get_time']) < __max_last_get_time:
+                result = __cache_data['data']
+
+        if result is None:
+
+            def get_exchange_symbols_index(exchange):
+                __index = None
+                try:
+                    __aux_class = CcxwExchangeConfig.exchange_classes[exchange](\
+                        streams=None, trading_type=trading_type, testmode=testmode)
+                    __index = __aux_class.get_exchange_symbols_index()
+                except Exception: # pylint: disable=broad-except
+                    __index = None
+                return __index
+
+            result = {}
+            __all_fetched = True
+
+            if len(__exchanges) > 0:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(__exchanges))\
+                    as __executor:
+                    __indexes = __executor.map(get_exchange_symbols_index, __exchanges)
+
+                    for __exchange, __index in zip(__exchanges, __indexes):
+                        if __index is not None and isinstance(__index, dict):
+                            for __symbol, __symbol_data in __index.items():
+                                if __symbol not in result:
+                                    result[__symbol] = {}
+                                result[__symbol][__exchange] = __symbol_data
+                        else:
+                            __all_fetched = False
+
+            if __all_fetched:
+                with cls.__symbols_universe_lock:
+                    cls.__symbols_universe_cache[__cache_key] = {
+                        'data': result,
+                        'last_get_time': __current_time
+                    }
+
+        return result
+
+    @classmethod
+    def get_symbol_exchanges(cls, symbol, exchanges=None, trading_type: str='SPOT',\
+                             testmode: bool=False):
+        """
+        Ccxw get_symbol_exchanges function.
+        ===================================
+            This method return the exchanges that can serve an unified symbol, using the
+            cached index of Ccxw.get_symbols_universe().
+                :param cls: Ccxw Class.
+                :param symbol: str unified symbol.
+                :param exchanges: list[str] | None.
+                :param trading_type: str only allowed 'SPOT'.
+                :param testmode: bool.
+
+                :return: dict exchange -> {'symbol': native symbol, 'intervals': list,
+                    'tick_size': str | None}.
+        """
+        result = {}
+
+        __universe = cls.get_symbols_universe(exchanges=exchanges,\
+                                              trading_type=trading_type,\
+                                              testmode=testmode)
+
+        if __universe is not None and symbol in __universe:
+            result = __universe[symbol]
+
+        return result
+
     @classmethod
     def get_supported_exchanges(cls):
         """
@@ -946,6 +1752,6 @@ class Ccxw():
 
                 :return: list of supported endpoints.
         """
-        __suported_endpoints = ['order_book', 'kline', 'trades','ticker']
+        __suported_endpoints = ['order_book', 'kline', 'trades','ticker', 'bbo']
 
         return __suported_endpoints
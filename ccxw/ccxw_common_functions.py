@@ -12,6 +12,7 @@ import json
 import socket
 import random
 import string
+from ccxw.indicators import KlineIndicators
 
 def is_json(myjson):
     """
@@ -138,6 +139,111 @@ def file_put_contents(filename, data, mode_in=""):
 
     return result
 
+ORDER_BOOK_OPTIONS = ('max_depth', 'aggregation', 'output_mode', 'snapshot_interval',\
+                      'notify_on', 'conflation_ms', 'depth', 'update_speed',\
+                      'integrity_resync', 'max_snapshot_age', 'history', 'depth_bands_bps',\
+                      'record')
+
+def is_valid_stream_options(stream):
+    """
+    is_valid_stream_options
+    =======================
+        This function check the optional keys of a stream dict, the order book
+        options are only valid for order_book streams and indicators for kline streams.
+            :param stream: dict.
+
+            :return bool: Return True if the optional keys are valid.
+    """
+    result = isinstance(stream, dict)
+
+    if result and stream.get('endpoint') != 'order_book':
+        result = all(stream.get(__key) is None for __key in ORDER_BOOK_OPTIONS)
+
+    if result and stream.get('endpoint') != 'kline':
+        result = stream.get('indicators') is None
+
+    if result and 'max_depth' in stream and stream['max_depth'] is not None:
+        result = isinstance(stream['max_depth'], int)\
+            and not isinstance(stream['max_depth'], bool)\
+            and stream['max_depth'] > 0
+
+    if result and 'aggregation' in stream and stream['aggregation'] is not None:
+        result = isinstance(stream['aggregation'], dict)\
+            and len(stream['aggregation']) == 1\
+            and ('step' in stream['aggregation'] or 'bps' in stream['aggregation'])
+
+        if result:
+            __value = list(stream['aggregation'].values())[0]
+            result = isinstance(__value, (int, float))\
+                and not isinstance(__value, bool)\
+                and __value > 0
+
+    if result and 'output_mode' in stream and stream['output_mode'] is not None:
+        result = stream['output_mode'] in ('snapshot', 'delta')
+
+    if result and 'snapshot_interval' in stream and stream['snapshot_interval'] is not None:
+        result = isinstance(stream['snapshot_interval'], int)\
+            and not isinstance(stream['snapshot_interval'], bool)\
+            and stream['snapshot_interval'] > 0
+
+    if result and 'notify_on' in stream and stream['notify_on'] is not None:
+        result = stream['notify_on'] in ('bbo', 'top_n')
+
+    if result and 'conflation_ms' in stream and stream['conflation_ms'] is not None:
+        result = isinstance(stream['conflation_ms'], (int, float))\
+            and not isinstance(stream['conflation_ms'], bool)\
+            and stream['conflation_ms'] > 0
+
+    if result and 'depth' in stream and stream['depth'] is not None:
+        result = not isinstance(stream['depth'], bool)\
+            and stream['depth'] in (5, 20, 50, 'full')
+
+    if result and 'update_speed' in stream and stream['update_speed'] is not None:
+        result = stream['update_speed'] in ('100ms', '1000ms')
+
+    if result and 'integrity_resync' in stream and stream['integrity_resync'] is not None:
+        result = isinstance(stream['integrity_resync'], bool)
+
+    if result and 'max_snapshot_age' in stream and stream['max_snapshot_age'] is not None:
+        result = isinstance(stream['max_snapshot_age'], (int, float))\
+            and not isinstance(stream['max_snapshot_age'], bool)\
+            and stream['max_snapshot_age'] > 0
+
+    if result and 'history' in stream and stream['history'] is not None:
+        result = isinstance(stream['history'], dict)\
+            and set(stream['history']).issubset({'interval_ms', 'depth', 'max_len'})
+
+        if result:
+            for __key, __value in stream['history'].items():
+                result = result and isinstance(__value, (int, float))\
+                    and not isinstance(__value, bool)\
+                    and __value > 0\
+                    and (__key == 'interval_ms' or isinstance(__value, int))
+
+    if result and 'depth_bands_bps' in stream and stream['depth_bands_bps'] is not None:
+        result = isinstance(stream['depth_bands_bps'], (list, tuple))\
+            and all(isinstance(__band, (int, float)) and not isinstance(__band, bool)\
+                    and __band > 0 for __band in stream['depth_bands_bps'])
+
+    if result and 'record' in stream and stream['record'] is not None:
+        result = isinstance(stream['record'], dict)\
+            and set(stream['record']).issubset({'path', 'checkpoint_interval'})\
+            and isinstance(stream['record'].get('path'), str)\
+            and len(stream['record']['path']) > 0
+
+        if result and 'checkpoint_interval' in stream['record']:
+            result = isinstance(stream['record']['checkpoint_interval'], (int, float))\
+                and not isinstance(stream['record']['checkpoint_interval'], bool)\
+                and stream['record']['checkpoint_interval'] > 0
+
+    if result and 'indicators' in stream and stream['indicators'] is not None:
+        result = isinstance(stream['indicators'], dict)
+
+        for __spec in stream['indicators'].values() if result else []:
+            result = result and KlineIndicators.is_valid_spec(__spec)
+
+    return result
+
 def is_port_free(port, host='localhost'):
     """
     is_port_free
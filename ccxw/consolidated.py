@@ -0,0 +1,447 @@
+"""
+Ccxw - CryptoCurrency eXchange Websocket Library
+Consolidated cross-exchange order book
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+"""
+
+import heapq
+from threading import Lock
+
+from ccxw.ccxw import Ccxw
+
+class ConsolidatedBook():
+    """
+    ConsolidatedBook - Cross-exchange top of book
+    =============================================
+        This class keeps the best levels of each exchange for one symbol and the
+        consolidated best bid and ask across exchanges with their source exchange.
+
+        Each side has a heap of (price key, exchange) entries with lazy deletion, an
+        entry is valid while its price is still the best price of its exchange. An
+        exchange update only pushes a new entry when its best price changes, so it costs
+        O(log exchanges) instead of a merge of all the books, and stale entries are
+        dropped when they reach the top. The merged ladder is built on read, only once
+        per change.
+
+        Example:
+
+            book = ConsolidatedBook(depth=10)
+            book.update('binance', [['100.1', '2']], [['100.2', '1']])
+            book.update('okx', [['100.15', '1']], [['100.3', '4']])
+            best = book.get_best_bid_ask()
+    """
+
+    def __init__(self, depth=10):
+        """
+        ConsolidatedBook constructor
+        ============================
+            Initializes an empty consolidated book.
+                :param depth: int levels of each exchange kept for the merged ladder.
+        """
+        self.__lock = Lock()
+        self.__depth = max(int(depth), 1)
+        self.__tops = {}
+        self.__heaps = {'bids': [], 'asks': []}
+        self.__heap_keys = {'bids': {}, 'asks': {}}
+        self.__version = 0
+        self.__ladder = None
+
+    def __get_levels(self, levels):
+        """
+        __get_levels
+        ============
+            This function parse the best levels of an exchange side.
+                :param levels: list of [price, size] (str or float), best first.
+                :return list: Return list of [price, size] floats without empty levels.
+        """
+        result = []
+
+        if levels is not None:
+            for __level in levels:
+                __size = float(__level[1])
+
+                if __size > 0:
+                    result.append([float(__level[0]), __size])
+
+                if len(result) >= self.__depth:
+                    break
+
+        return result
+
+    def __set_heap_entry(self, side, exchange, levels):
+        """
+        __set_heap_entry
+        ================
+            This function push the new best price of an exchange side, if it changed,
+            called with the lock held. The heap is rebuilt from the valid entries when
+            the stale ones outnumber them.
+                :param side: str 'bids' | 'asks'.
+                :param exchange: str.
+                :param levels: list of [price, size] floats, best first.
+        """
+        __heap = self.__heaps[side]
+        __heap_keys = self.__heap_keys[side]
+        __key = None
+
+        if len(levels) > 0:
+            __key = -levels[0][0] if side == 'bids' else levels[0][0]
+
+        if __heap_keys.get(exchange) != __key:
+            if __key is None:
+                __heap_keys.pop(exchange, None)
+            else:
+                __heap_keys[exchange] = __key
+                heapq.heappush(__heap, (__key, exchange))
+
+            if len(__heap) > 2 * len(__heap_keys) + 8:
+                __heap[:] = [(__value, __name) for __name, __value in __heap_keys.items()]
+                heapq.heapify(__heap)
+
+    def __get_best_exchange(self, side):
+        """
+        __get_best_exchange
+        ===================
+            This function drop the stale entries from the top of a side heap and return
+            the exchange with the best price, called with the lock held.
+                :param side: str 'bids' | 'asks'.
+                :return str | None: Return the exchange, None if the side is empty.
+        """
+        result = None
+
+        __heap = self.__heaps[side]
+        __heap_keys = self.__heap_keys[side]
+
+        while len(__heap) > 0 and __heap_keys.get(__heap[0][1]) != __heap[0][0]:
+            heapq.heappop(__heap)
+
+        if len(__heap) > 0:
+            result = __heap[0][1]
+
+        return result
+
+    def update(self, exchange, bids, asks):
+        """
+        update
+        ======
+            This function replace the best levels of an exchange.
+                :param exchange: str.
+                :param bids: list of [price, size], best first.
+                :param asks: list of [price, size], best first.
+                :return bool: Return True if the levels of the exchange changed.
+        """
+        result = False
+
+        __bids = self.__get_levels(bids)
+        __asks = self.__get_levels(asks)
+
+        with self.__lock:
+            if self.__tops.get(exchange) != (__bids, __asks):
+                self.__tops[exchange] = (__bids, __asks)
+                self.__set_heap_entry('bids', exchange, __bids)
+                self.__set_heap_entry('asks', exchange, __asks)
+                self.__version += 1
+                self.__ladder = None
+                result = True
+
+        return result
+
+    def remove(self, exchange):
+        """
+        remove
+        ======
+            This function remove the levels of an exchange, e.g. when its stream stops.
+                :param exchange: str.
+                :return bool: Return True if the exchange was in the book.
+        """
+        result = False
+
+        with self.__lock:
+            if exchange in self.__tops:
+                del self.__tops[exchange]
+                self.__set_heap_entry('bids', exchange, [])
+                self.__set_heap_entry('asks', exchange, [])
+                self.__version += 1
+                self.__ladder = None
+                result = True
+
+        return result
+
+    def get_best_bid_ask(self):
+        """
+        get_best_bid_ask
+        ================
+            This function return the consolidated best bid and ask.
+                :return dict | None: Return dict with best_bid, best_bid_size,
+                    best_bid_exchange, best_ask, best_ask_size, best_ask_exchange (None
+                    for an empty side), spread (negative if crossed across exchanges) and
+                    version, None if no exchange has levels.
+        """
+        result = None
+
+        with self.__lock:
+            __bid_exchange = self.__get_best_exchange('bids')
+            __ask_exchange = self.__get_best_exchange('asks')
+
+            if __bid_exchange is not None or __ask_exchange is not None:
+                result = {
+                    'best_bid': None,
+                    'best_bid_size': None,
+                    'best_bid_exchange': __bid_exchange,
+                    'best_ask': None,
+                    'best_ask_size': None,
+                    'best_ask_exchange': __ask_exchange,
+                    'spread': None,
+                    'version': self.__version
+                }
+
+                if __bid_exchange is not None:
+                    result['best_bid'], result['best_bid_size'] = (
+                        self.__tops[__bid_exchange][0][0]
+                    )
+
+                if __ask_exchange is not None:
+                    result['best_ask'], result['best_ask_size'] = (
+                        self.__tops[__ask_exchange][1][0]
+                    )
+
+                if __bid_exchange is not None and __ask_exchange is not None:
+                    result['spread'] = result['best_ask'] - result['best_bid']
+
+        return result
+
+    def get_ladder(self, depth=None):
+        """
+        get_ladder
+        ==========
+            This function return the merged best levels of all the exchanges, it is
+            merged once per change and shared by the next reads.
+                :param depth: int | None levels on each side (None for all kept levels).
+                :return dict: Return {'bids': [[price, size, exchange], ...],
+                    'asks': [[price, size, exchange], ...]} best first.
+        """
+        result = {'bids': [], 'asks': []}
+
+        with self.__lock:
+            if self.__ladder is None:
+                self.__ladder = {}
+                self.__ladder['bids'] = list(heapq.merge(\
+                    *[[[__price, __size, __exchange] for __price, __size in __top[0]]\
+                      for __exchange, __top in self.__tops.items()],\
+                    key=lambda level: -level[0]))
+                self.__ladder['asks'] = list(heapq.merge(\
+                    *[[[__price, __size, __exchange] for __price, __size in __top[1]]\
+                      for __exchange, __top in self.__tops.items()],\
+                    key=lambda level: level[0]))
+
+            __ladder = self.__ladder
+
+        for __side in ('bids', 'asks'):
+            __levels = __ladder[__side] if depth is None else __ladder[__side][:depth]
+            result[__side] = [list(__level) for __level in __levels]
+
+        return result
+
+    def get_exchanges(self):
+        """
+        get_exchanges
+        =============
+            This function return the exchanges with levels in the book.
+                :return list: Return list of str sorted.
+        """
+        with self.__lock:
+            result = sorted(self.__tops.keys())
+
+        return result
+
+    def get_version(self):
+        """
+        get_version
+        ===========
+            This function return a counter increased on each change of the book.
+                :return int: Return the version.
+        """
+        with self.__lock:
+            result = self.__version
+
+        return result
+
+class CcxwConsolidated():
+    """
+    CcxwConsolidated - Consolidated cross-exchange order book
+    =========================================================
+        This class subscribes the order_book stream of unified symbols on several
+        exchanges, with notify_on 'top_n', and keeps a ConsolidatedBook per symbol. The
+        books are updated from the Ccxw on_update hook, only when the best levels of a
+        contributing exchange change, so reads do not merge or decode the books. The
+        local books are not bounded by max_depth: a book trimmed to the merged depth
+        would run out of levels and resync on almost every update.
+
+        Example:
+
+            cons = CcxwConsolidated('BTC/USDT', ['binance', 'bybit', 'okx'], depth=10)
+            cons.start()
+            time.sleep(5)
+            best = cons.get_best_bid_ask('BTC/USDT')
+            ladder = cons.get_ladder('BTC/USDT', 5)
+            cons.stop()
+    """
+
+    def __init__(self, symbols, exchanges=None, depth: int=10, trading_type: str='SPOT',\
+                 testmode: bool=False, debug: bool=False):
+        """
+        CcxwConsolidated constructor
+        ============================
+            :param self: CcxwConsolidated instance.
+            :param symbols: str | list[str] unified symbols.
+            :param exchanges: list[str] | None, None for all the supported exchanges that
+                serve each symbol.
+            :param depth: int best levels of each exchange merged in the ladder.
+            :param trading_type: str only allowed 'SPOT'.
+            :param testmode: bool.
+            :param debug: bool Output verbosity.
+
+            :return: Return a new instance of the Class CcxwConsolidated.
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+
+        if symbols is None or len(symbols) == 0:
+            raise ValueError('The symbols list is not valid: ' + str(symbols))
+
+        self.__depth = max(int(depth), 1)
+        self.__books = {}
+        self.__ccxw_instances = {}
+        __streams = {}
+
+        for __symbol in symbols:
+            self.__books[__symbol] = ConsolidatedBook(self.__depth)
+
+            for __exchange in Ccxw.get_symbol_exchanges(__symbol, exchanges=exchanges,\
+                                                        trading_type=trading_type,\
+                                                        testmode=testmode):
+                __streams.setdefault(__exchange, []).append({\
+                    'endpoint': 'order_book',\
+                    'symbol': __symbol,\
+                    'notify_on': 'top_n'\
+                })
+
+        if len(__streams) == 0:
+            raise ValueError('No exchange serves the symbols: ' + str(symbols))
+
+        for __exchange, __exchange_streams in __streams.items():
+            self.__ccxw_instances[__exchange] = Ccxw(__exchange, __exchange_streams,\
+                                                     trading_type=trading_type,\
+                                                     testmode=testmode,\
+                                                     result_max_len=self.__depth,\
+                                                     data_max_len=self.__depth,\
+                                                     debug=debug,\
+                                                     on_update=self.__on_update)
+
+    def __on_update(self, exchange, endpoint, symbol, data):
+        """
+        __on_update
+        ===========
+            This function is the Ccxw on_update hook, it replace the best levels of the
+            exchange in the consolidated book of the symbol.
+                :param exchange: str.
+                :param endpoint: str.
+                :param symbol: str unified symbol.
+                :param data: dict order_book data.
+        """
+        if endpoint == 'order_book' and symbol in self.__books and isinstance(data, dict):
+            self.__books[symbol].update(exchange, data.get('bids'), data.get('asks'))
+
+    def start(self):
+        """
+        CcxwConsolidated start function.
+        ================================
+            This method start the websocket of every exchange.
+                :param self: CcxwConsolidated instance.
+
+                :return: None.
+        """
+        for __ccxw_instance in self.__ccxw_instances.values():
+            __ccxw_instance.start()
+
+    def stop(self):
+        """
+        CcxwConsolidated stop function.
+        ===============================
+            This method stop the websockets and remove their levels from the books.
+                :param self: CcxwConsolidated instance.
+
+                :return: None.
+        """
+        for __exchange, __ccxw_instance in self.__ccxw_instances.items():
+            __ccxw_instance.stop()
+
+            for __book in self.__books.values():
+                __book.remove(__exchange)
+
+    def get_exchanges(self):
+        """
+        CcxwConsolidated get_exchanges function.
+        ========================================
+            This method return the subscribed exchanges.
+                :param self: CcxwConsolidated instance.
+
+                :return: list of str.
+        """
+        result = sorted(self.__ccxw_instances.keys())
+
+        return result
+
+    def is_connections_ok(self):
+        """
+        CcxwConsolidated is_connections_ok function.
+        ============================================
+            This method check the connections of every exchange.
+                :param self: CcxwConsolidated instance.
+
+                :return: bool True if all the connections are ok.
+        """
+        result = all(__ccxw_instance.is_connections_ok()\
+                     for __ccxw_instance in self.__ccxw_instances.values())
+
+        return result
+
+    def get_best_bid_ask(self, symbol):
+        """
+        CcxwConsolidated get_best_bid_ask function.
+        ===========================================
+            This method return the consolidated best bid and ask of a symbol with their
+            source exchange.
+                :param self: CcxwConsolidated instance.
+                :param symbol: str unified symbol.
+
+                :return: dict with best_bid, best_bid_size, best_bid_exchange, best_ask,
+                    best_ask_size, best_ask_exchange, spread and version, None if there
+                    is no data.
+        """
+        result = None
+
+        if symbol in self.__books:
+            result = self.__books[symbol].get_best_bid_ask()
+
+        return result
+
+    def get_ladder(self, symbol, depth=None):
+        """
+        CcxwConsolidated get_ladder function.
+        =====================================
+            This method return the merged best levels of a symbol across exchanges.
+                :param self: CcxwConsolidated instance.
+                :param symbol: str unified symbol.
+                :param depth: int | None levels on each side (None for all).
+
+                :return: dict {'bids': [[price, size, exchange], ...],\
+                    'asks': [[price, size, exchange], ...]}, None if the symbol is unknown.
+        """
+        result = None
+
+        if symbol in self.__books:
+            result = self.__books[symbol].get_ladder(depth)
+
+        return result
@@ -0,0 +1,477 @@
+"""
+Ccxw - CryptoCurrency eXchange Websocket Library
+Incremental kline indicators
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+"""
+
+import abc
+import collections
+import math
+from threading import Lock
+
+class Indicator(abc.ABC):
+    """
+    Indicator - Incremental indicator base class
+    ============================================
+        An indicator keeps a state built only from closed candles. commit() adds a
+        closed candle to the state in O(1) and get_value() compute the value with the
+        in-progress candle on top of the state, also in O(1) and without changing it,
+        so a revised in-progress candle only needs a new get_value() call.
+
+        Subclasses must implement commit() and get_value(), candles are dicts with
+        float 'open', 'high', 'low' and 'close'.
+    """
+
+    def __init__(self, period=14):
+        """
+        Indicator constructor
+        =====================
+            Initializes an empty state.
+                :param period: int candles of the indicator.
+        """
+        self.period = max(int(period), 1)
+
+    @abc.abstractmethod
+    def commit(self, candle):
+        """
+        commit
+        ======
+            This function add a closed candle to the state.
+                :param candle: dict.
+        """
+
+    @abc.abstractmethod
+    def get_value(self, candle):
+        """
+        get_value
+        =========
+            This function return the value with the in-progress candle.
+                :param candle: dict | None in-progress candle.
+                :return float | dict | None: Return the value, None while warming up.
+        """
+
+class SmaIndicator(Indicator):
+    """
+    SmaIndicator - Simple moving average of close
+    =============================================
+        The state is the last period - 1 closes and their sum.
+    """
+
+    def __init__(self, period=20):
+        super().__init__(period)
+        self.__closes = collections.deque()
+        self.__sum = 0.0
+
+    def commit(self, candle):
+        self.__closes.append(candle['close'])
+        self.__sum += candle['close']
+
+        if len(self.__closes) >= self.period:
+            self.__sum -= self.__closes.popleft()
+
+    def get_value(self, candle):
+        result = None
+
+        if candle is not None and len(self.__closes) == self.period - 1:
+            result = (self.__sum + candle['close']) / self.period
+
+        return result
+
+class EmaIndicator(Indicator):
+    """
+    EmaIndicator - Exponential moving average of close
+    ==================================================
+        Seeded with the simple average of the first period closes.
+    """
+
+    def __init__(self, period=20):
+        super().__init__(period)
+        self.__alpha = 2 / (self.period + 1)
+        self.__count = 0
+        self.__sum = 0.0
+        self.__ema = None
+
+    def __get_next(self, close):
+        """
+        __get_next
+        ==========
+            This function return the average after one more close.
+                :param close: float.
+                :return float | None: Return the average, None while warming up.
+        """
+        result = None
+
+        if self.__ema is not None:
+            result = self.__alpha * close + (1 - self.__alpha) * self.__ema
+        elif self.__count + 1 == self.period:
+            result = (self.__sum + close) / self.period
+
+        return result
+
+    def commit(self, candle):
+        self.__ema = self.__get_next(candle['close'])
+        self.__count += 1
+        self.__sum += candle['close']
+
+    def get_value(self, candle):
+        result = self.__ema
+
+        if candle is not None:
+            result = self.__get_next(candle['close'])
+
+        return result
+
+class RsiIndicator(Indicator):
+    """
+    RsiIndicator - Relative strength index (Wilder)
+    ===============================================
+        Seeded with the simple average gain and loss of the first period changes.
+    """
+
+    def __init__(self, period=14):
+        super().__init__(period)
+        self.__last_close = None
+        self.__count = 0
+        self.__avg_gain = 0.0
+        self.__avg_loss = 0.0
+
+    def __get_next(self, close):
+        """
+        __get_next
+        ==========
+            This function return the count and average gain and loss after one more
+            close.
+                :param close: float.
+                :return tuple: Return (count, avg_gain, avg_loss).
+        """
+        result = (self.__count, self.__avg_gain, self.__avg_loss)
+
+        if self.__last_close is not None:
+            __change = close - self.__last_close
+            __gain = max(__change, 0.0)
+            __loss = max(-__change, 0.0)
+
+            if self.__count < self.period:
+                __divisor = self.__count + 1
+                result = (self.__count + 1,\
+                          (self.__avg_gain * self.__count + __gain) / __divisor,\
+                          (self.__avg_loss * self.__count + __loss) / __divisor)
+            else:
+                result = (self.__count + 1,\
+                          (self.__avg_gain * (self.period - 1) + __gain) / self.period,\
+                          (self.__avg_loss * (self.period - 1) + __loss) / self.period)
+
+        return result
+
+    def commit(self, candle):
+        self.__count, self.__avg_gain, self.__avg_loss = self.__get_next(candle['close'])
+        self.__last_close = candle['close']
+
+    def get_value(self, candle):
+        result = None
+
+        __count, __avg_gain, __avg_loss = (self.__count, self.__avg_gain, self.__avg_loss)
+
+        if candle is not None:
+            __count, __avg_gain, __avg_loss = self.__get_next(candle['close'])
+
+        if __count >= self.period:
+            result = 100.0
+
+            if __avg_loss > 0:
+                result = 100 - 100 / (1 + __avg_gain / __avg_loss)
+
+        return result
+
+class AtrIndicator(Indicator):
+    """
+    AtrIndicator - Average true range (Wilder)
+    ==========================================
+        Seeded with the simple average of the first period true ranges.
+    """
+
+    def __init__(self, period=14):
+        super().__init__(period)
+        self.__last_close = None
+        self.__count = 0
+        self.__atr = 0.0
+
+    def __get_next(self, candle):
+        """
+        __get_next
+        ==========
+            This function return the count and average after one more candle.
+                :param candle: dict.
+                :return tuple: Return (count, atr).
+        """
+        __true_range = candle['high'] - candle['low']
+
+        if self.__last_close is not None:
+            __true_range = max(__true_range, abs(candle['high'] - self.__last_close),\
+                               abs(candle['low'] - self.__last_close))
+
+        if self.__count < self.period:
+            result = (self.__count + 1,\
+                      (self.__atr * self.__count + __true_range) / (self.__count + 1))
+        else:
+            result = (self.__count + 1,\
+                      (self.__atr * (self.period - 1) + __true_range) / self.period)
+
+        return result
+
+    def commit(self, candle):
+        self.__count, self.__atr = self.__get_next(candle)
+        self.__last_close = candle['close']
+
+    def get_value(self, candle):
+        result = None
+
+        __count, __atr = (self.__count, self.__atr)
+
+        if candle is not None:
+            __count, __atr = self.__get_next(candle)
+
+        if __count >= self.period:
+            result = __atr
+
+        return result
+
+class BollingerIndicator(Indicator):
+    """
+    BollingerIndicator - Bollinger bands of close
+    =============================================
+        The state is the last period - 1 closes with their sum and sum of squares, the
+        bands use the population standard deviation.
+    """
+
+    def __init__(self, period=20, num_std=2.0):
+        super().__init__(period)
+        self.num_std = float(num_std)
+        self.__closes = collections.deque()
+        self.__sum = 0.0
+        self.__sum_squares = 0.0
+
+    def commit(self, candle):
+        __close = candle['close']
+        self.__closes.append(__close)
+        self.__sum += __close
+        self.__sum_squares += __close * __close
+
+        if len(self.__closes) >= self.period:
+            __old = self.__closes.popleft()
+            self.__sum -= __old
+            self.__sum_squares -= __old * __old
+
+    def get_value(self, candle):
+        result = None
+
+        if candle is not None and len(self.__closes) == self.period - 1:
+            __close = candle['close']
+            __mean = (self.__sum + __close) / self.period
+            __variance = (self.__sum_squares + __close * __close) / self.period - __mean * __mean
+            __std = math.sqrt(max(__variance, 0.0))
+            result = {'middle': __mean,\
+                      'upper': __mean + self.num_std * __std,\
+                      'lower': __mean - self.num_std * __std}
+
+        return result
+
+class KlineIndicators():
+    """
+    KlineIndicators - Indicators of a kline stream
+    ==============================================
+        This class feeds the candles of a kline stream to its indicators, candles are
+        kline messages ('open_time', 'open', 'hight', 'low' and 'close'). A candle
+        with the open time of the in-progress candle revises it, its values are
+        recomputed on top of the closed candles state. A newer open time closes the
+        in-progress candle: its last revision is committed once to every indicator.
+        Each update costs O(1) per indicator, revisions of already closed candles are
+        ignored.
+
+        Example:
+
+            indicators = KlineIndicators({'ema_20': {'type': 'ema', 'period': 20},\
+                                          'bb_20': {'type': 'bollinger', 'period': 20}})
+            indicators.update(klines)
+            values = indicators.get_values()  # {'ema_20': 67450.2, 'bb_20': {...}}
+    """
+
+    indicator_types = {
+        'sma': SmaIndicator,
+        'ema': EmaIndicator,
+        'rsi': RsiIndicator,
+        'atr': AtrIndicator,
+        'bollinger': BollingerIndicator
+    }
+
+    def __init__(self, indicators=None):
+        """
+        KlineIndicators constructor
+        ===========================
+            Initializes the indicators.
+                :param indicators: dict | None name -> {'type': 'sma' | 'ema' | 'rsi' |
+                    'atr' | 'bollinger', 'period': int, 'num_std': float (bollinger)}.
+                :raise ValueError: If an indicator spec is not valid.
+        """
+        self.__lock = Lock()
+        self.__indicators = {}
+        self.__live = None
+        self.__values = {}
+
+        if indicators is not None:
+            for __name, __spec in indicators.items():
+                if not self.is_valid_spec(__spec):
+                    raise ValueError('The indicator ' + str(__name) + ' is not valid: '\
+                                     + str(__spec))
+
+                __params = {__key: __value for __key, __value in __spec.items()\
+                            if __key != 'type'}
+                self.__indicators[__name] = self.indicator_types[__spec['type']](**__params)
+
+    @classmethod
+    def is_valid_spec(cls, spec):
+        """
+        is_valid_spec
+        =============
+            This function check an indicator spec: a known type, only the parameters
+            of the type and positive numbers, period an int.
+                :param spec: dict.
+                :return bool: Return True if the spec is valid.
+        """
+        result = isinstance(spec, dict)\
+            and isinstance(spec.get('type'), str)\
+            and spec['type'] in cls.indicator_types\
+            and set(spec).issubset({'type', 'period', 'num_std'})\
+            and ('num_std' not in spec or spec['type'] == 'bollinger')
+
+        for __key in ('period', 'num_std'):
+            result = result and (__key not in spec\
+                or (isinstance(spec[__key], (int, float))\
+                    and not isinstance(spec[__key], bool)\
+                    and spec[__key] > 0\
+                    and (__key == 'num_std' or isinstance(spec[__key], int))))
+
+        return result
+
+    @classmethod
+    def get_candle(cls, kline):
+        """
+        get_candle
+        ==========
+            This function parse a kline message.
+                :param kline: dict kline message.
+                :return dict | None: Return {'open_time': int, 'open', 'high', 'low',
+                    'close'} floats, None if a field is not a number.
+        """
+        try:
+            result = {
+                'open_time': int(kline['open_time']),
+                'open': float(kline['open']),
+                'high': float(kline['hight']),
+                'low': float(kline['low']),
+                'close': float(kline['close'])
+            }
+        except (KeyError, TypeError, ValueError):
+            result = None
+
+        return result
+
+    def __update_values(self):
+        """
+        __update_values
+        ===============
+            This function recompute the values with the in-progress candle, called with
+            the lock held.
+        """
+        self.__values = {__name: __indicator.get_value(self.__live)\
+                         for __name, __indicator in self.__indicators.items()}
+
+    def add(self, name, indicator, klines=None):
+        """
+        add
+        ===
+            This function register an indicator, warmed up with past klines.
+                :param name: str.
+                :param indicator: Indicator.
+                :param klines: list | None kline messages oldest first, the last one is
+                    taken as in-progress.
+                :raise ValueError: If indicator is not an Indicator.
+        """
+        if not isinstance(indicator, Indicator):
+            raise ValueError('The indicator ' + str(name) + ' is not an Indicator: '\
+                             + str(indicator))
+
+        with self.__lock:
+            if self.__live is None:
+                self.__indicators[name] = indicator
+                self.__update(klines or [])
+            else:
+                for __kline in klines or []:
+                    __candle = self.get_candle(__kline)
+
+                    if __candle is not None\
+                        and __candle['open_time'] < self.__live['open_time']:
+                        indicator.commit(__candle)
+
+                self.__indicators[name] = indicator
+
+            self.__update_values()
+
+    def __update(self, klines):
+        """
+        __update
+        ========
+            This function apply kline messages, called with the lock held.
+                :param klines: list kline messages oldest first.
+                :return bool: Return True if the in-progress candle changed.
+        """
+        result = False
+
+        for __kline in klines:
+            __candle = self.get_candle(__kline)
+
+            if __candle is None\
+                or (self.__live is not None\
+                    and __candle['open_time'] < self.__live['open_time']):
+                continue
+
+            if self.__live is not None and __candle['open_time'] > self.__live['open_time']:
+                for __indicator in self.__indicators.values():
+                    __indicator.commit(self.__live)
+
+            if __candle != self.__live:
+                self.__live = __candle
+                result = True
+
+        return result
+
+    def update(self, klines):
+        """
+        update
+        ======
+            This function apply the kline messages of a stream update.
+                :param klines: list kline messages oldest first.
+                :return bool: Return True if the in-progress candle changed.
+        """
+        with self.__lock:
+            result = self.__update(klines)
+
+            if result:
+                self.__update_values()
+
+        return result
+
+    def get_values(self):
+        """
+        get_values
+        ==========
+            This function return the values with the in-progress candle.
+                :return dict: Return name -> value (None while warming up).
+        """
+        with self.__lock:
+            result = dict(self.__values)
+            result['open_time'] = None if self.__live is None else self.__live['open_time']
+
+        return result
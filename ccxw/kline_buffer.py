@@ -0,0 +1,312 @@
+"""
+Ccxw - CryptoCurrency eXchange Websocket Library
+Ordered kline buffer
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+"""
+
+import time
+import array
+from threading import Lock
+
+try:
+    import numpy
+except ImportError: # numpy is an optional dependency, only used by get_arrays()
+    numpy = None
+
+class KlineBuffer():
+    """
+    KlineBuffer - Ordered columnar ring of candles
+    ==============================================
+        This class keeps the last max_len candles of a stream ordered by open time in
+        columns (open_time, close_time and last_update_id as array('q'), open, high,
+        low, close and volume as array('d')). Each column is a ring written twice, at
+        i and i + max_len, so the last n candles are always contiguous and get_arrays()
+        return zero-copy numpy views of them.
+
+        A dict open_time -> append sequence locates each candle, so updating the
+        current candle in place, appending a new one and evicting the oldest are O(1),
+        reading the last n candles is O(n). A candle older than the last one that is not
+        in the buffer (a late message) is inserted in order rebuilding the columns.
+
+        The message dicts are only kept for the newest items_len candles (the ones in
+        the stream output), older candles are rebuilt from the columns when they are
+        read, with the numeric fields formatted from the parsed values.
+
+        Example:
+
+            klines = KlineBuffer(max_len=2500, items_len=5)
+            klines.set(candle['open_time'], candle)
+            last_candles = klines.get_last(5)
+            arrays = klines.get_arrays(500)  # {'open_time': ..., 'close': ..., ...}
+    """
+
+    __int_columns = ('open_time', 'close_time', 'last_update_id')
+    __float_columns = ('open', 'high', 'low', 'close', 'volume')
+    __float_fields = ('open', 'hight', 'low', 'close', 'volume')
+
+    def __init__(self, max_len=2500, items_len=None):
+        """
+        KlineBuffer constructor
+        =======================
+            Initializes an empty buffer.
+                :param max_len: int candles kept.
+                :param items_len: int | None newest candles kept as message dicts, None
+                    for all.
+        """
+        self.__lock = Lock()
+        self.__max_len = max(int(max_len), 1)
+        self.__items_len = self.__max_len
+
+        if items_len is not None:
+            self.__items_len = min(max(int(items_len), 1), self.__max_len)
+
+        self.__columns = {}
+
+        for __name in self.__int_columns:
+            self.__columns[__name] = array.array('q', bytes(16 * self.__max_len))
+
+        for __name in self.__float_columns:
+            self.__columns[__name] = array.array('d', bytes(16 * self.__max_len))
+
+        self.__sequences = {}
+        self.__items = {}
+        self.__template = None
+        self.__first_sequence = 0
+        self.__next_sequence = 0
+
+    @classmethod
+    def __get_int(cls, value):
+        """
+        __get_int
+        =========
+            This function parse an integer field.
+                :param value: str | int | None.
+                :return int: Return the value, 0 if it is not a number.
+        """
+        try:
+            result = int(value)
+        except (TypeError, ValueError):
+            result = 0
+
+        return result
+
+    @classmethod
+    def __get_float(cls, value):
+        """
+        __get_float
+        ===========
+            This function parse a numeric field.
+                :param value: str | float | None.
+                :return float: Return the value, NaN if it is not a number.
+        """
+        try:
+            result = float(value)
+        except (TypeError, ValueError):
+            result = float('nan')
+
+        return result
+
+    @classmethod
+    def __format_float(cls, value):
+        """
+        __format_float
+        ==============
+            This function format a parsed value for a rebuilt message.
+                :param value: float.
+                :return str | None: Return the value without trailing zeros, None for NaN.
+        """
+        result = None
+
+        if value == value:
+            result = ('%.12f' % value).rstrip('0').rstrip('.')
+
+        return result
+
+    def __write(self, sequence, key, item):
+        """
+        __write
+        =======
+            This function write the columns of a candle in its ring position, called with
+            the lock held.
+                :param sequence: int append sequence of the candle.
+                :param key: int open time.
+                :param item: dict candle.
+        """
+        __index = sequence % self.__max_len
+        __values = (key, self.__get_int(item.get('close_time')),\
+                    self.__get_int(item.get('last_update_id')))
+
+        for __name, __value in zip(self.__int_columns, __values):
+            self.__columns[__name][__index] = __value
+            self.__columns[__name][__index + self.__max_len] = __value
+
+        for __name, __field in zip(self.__float_columns, self.__float_fields):
+            __value = self.__get_float(item.get(__field))
+            self.__columns[__name][__index] = __value
+            self.__columns[__name][__index + self.__max_len] = __value
+
+    def __append(self, key, item):
+        """
+        __append
+        ========
+            This function append a candle newer than the last one, evicting the oldest
+            candle and the message dict that left the items_len newest, called with the
+            lock held.
+                :param key: int open time.
+                :param item: dict candle.
+        """
+        if self.__next_sequence - self.__first_sequence >= self.__max_len:
+            __oldest_key = self.__get_key(self.__first_sequence)
+            del self.__sequences[__oldest_key]
+            self.__items.pop(__oldest_key, None)
+            self.__first_sequence += 1
+
+        self.__write(self.__next_sequence, key, item)
+        self.__sequences[key] = self.__next_sequence
+        self.__items[key] = item
+        self.__next_sequence += 1
+
+        __item_sequence = self.__next_sequence - self.__items_len - 1
+
+        if __item_sequence >= self.__first_sequence:
+            self.__items.pop(self.__get_key(__item_sequence), None)
+
+    def __get_key(self, sequence):
+        """
+        __get_key
+        =========
+            This function return the open time of a candle in the buffer.
+                :param sequence: int append sequence.
+                :return int: Return open time.
+        """
+        return self.__columns['open_time'][sequence % self.__max_len]
+
+    def __get_item(self, sequence):
+        """
+        __get_item
+        ==========
+            This function return the message dict of a candle, rebuilt from the columns
+            if it is not kept, called with the lock held.
+                :param sequence: int append sequence.
+                :return dict: Return candle.
+        """
+        __key = self.__get_key(sequence)
+        result = self.__items.get(__key)
+
+        if result is None:
+            __index = sequence % self.__max_len
+            result = dict(self.__template)
+            result['last_update_id'] = self.__columns['last_update_id'][__index]
+            result['open_time'] = __key
+            result['close_time'] = self.__columns['close_time'][__index]
+            result['open_time_date'] = time.strftime("%Y-%m-%d %H:%M:%S",\
+                time.gmtime(int(round(result['open_time']/1000))))
+            result['close_time_date'] = time.strftime("%Y-%m-%d %H:%M:%S",\
+                time.gmtime(int(round(result['close_time']/1000))))
+
+            for __name, __field in zip(self.__float_columns, self.__float_fields):
+                result[__field] = self.__format_float(self.__columns[__name][__index])
+
+            result['is_closed'] = True
+
+        return result
+
+    def set(self, key, item):
+        """
+        set
+        ===
+            This function update or add a candle, evicting the oldest when the buffer is
+            full.
+                :param key: int open time.
+                :param item: dict candle.
+        """
+        with self.__lock:
+            self.__template = {'endpoint': item.get('endpoint'),\
+                               'exchange': item.get('exchange'),\
+                               'symbol': item.get('symbol'),\
+                               'interval': item.get('interval')}
+
+            if key in self.__sequences:
+                __sequence = self.__sequences[key]
+                self.__write(__sequence, key, item)
+
+                if __sequence >= self.__next_sequence - self.__items_len:
+                    self.__items[key] = item
+
+            elif self.__next_sequence == self.__first_sequence\
+                or key > self.__get_key(self.__next_sequence - 1):
+                self.__append(key, item)
+
+            else:
+                __candles = [(self.__get_key(__sequence), self.__get_item(__sequence))\
+                             for __sequence in range(self.__first_sequence,\
+                                                     self.__next_sequence)]
+                __candles.append((key, item))
+                __candles.sort(key=lambda candle: candle[0])
+
+                self.__sequences = {}
+                self.__items = {}
+                self.__first_sequence = self.__next_sequence
+
+                for __key, __item in __candles:
+                    self.__append(__key, __item)
+
+    def get_last(self, count=None):
+        """
+        get_last
+        ========
+            This function return the last candles, oldest first.
+                :param count: int | None candles, None for all.
+                :return list: Return list of candles.
+        """
+        with self.__lock:
+            __first = self.__first_sequence
+
+            if count is not None:
+                __first = max(self.__next_sequence - max(count, 0), __first)
+
+            result = [self.__get_item(__sequence)\
+                      for __sequence in range(__first, self.__next_sequence)]
+
+        return result
+
+    def get_arrays(self, count=None):
+        """
+        get_arrays
+        ==========
+            This function return the last candles as numpy arrays, oldest first. The
+            arrays are read-only zero-copy views of the columns: the live candle changes
+            in place and later candles overwrite the ring, copy them to keep the values.
+                :param count: int | None candles, None for all.
+                :return dict | None: Return {'open_time': int64, 'close_time': int64,
+                    'last_update_id': int64, 'open': float64, 'high': float64,
+                    'low': float64, 'close': float64, 'volume': float64},
+                    None if numpy is not installed.
+        """
+        result = None
+
+        if numpy is not None:
+            with self.__lock:
+                __count = self.__next_sequence - self.__first_sequence
+
+                if count is not None:
+                    __count = min(max(count, 0), __count)
+
+                __index = (self.__next_sequence - __count) % self.__max_len
+                result = {}
+
+                for __name in self.__int_columns + self.__float_columns:
+                    __dtype = numpy.int64 if __name in self.__int_columns else numpy.float64
+                    result[__name] = numpy.frombuffer(self.__columns[__name], dtype=__dtype,\
+                                                      count=__count, offset=__index * 8)
+                    result[__name].flags.writeable = False
+
+        return result
+
+    def __len__(self):
+        with self.__lock:
+            result = self.__next_sequence - self.__first_sequence
+
+        return result
@@ -19,6 +19,9 @@ import pprint # pylint: disable=unused-import
 
 import ccxw.ccxw_common_functions as ccf
 from ccxw.safe_thread_vars import DictSafeThread
+from ccxw.kline_buffer import KlineBuffer
+from ccxw.order_book import OrderBook, OrderBookDeltaLog, OrderBookHistory,\
+    OrderBookIntegrity, OrderBookRecorder
 import ccxw
 
 class KucoinCcxwAuxClass():
@@ -39,11 +42,11 @@ class KucoinCcxwAuxClass():
         KucoinCcxwAuxClass constructor
         ==============================
             :param self: KucoinCcxwAuxClass instance.
-            :param streams: list[dict]
+            :param streams: list[dict] | None (None only for exchange metadata queries)
                                     dicts must have this struct.
                                         {
                                             'endpoint': str only allowed 'order_book' | 'kline' |\
-                                                'trades' | 'ticker',
+                                                'trades' | 'ticker' | 'bbo',
                                             'symbol': str unified symbol.,
                                             'interval': str '1m' | '3m' | '5m' | '15m' | '30m' |\
                                                 '1h' | '2h' | '4h' | '6h' | '8h' | '12h' | '1d' |\
@@ -101,22 +104,111 @@ class KucoinCcxwAuxClass():
         self.__ws_endpoint_on_close_vars = None
         self.__ws_temp_data = DictSafeThread()
 
+        self.__stream_index_cache = {}
+        self.__unified_symbol_cache = {}
+        self.__tick_size_cache = {}
+        self.__order_book_aggregation = {}
+        self.__order_book_depth_bands = {}
+        self.__order_book_delta_logs = {}
+        self.__order_book_histories = {}
+        self.__order_book_recorders = {}
+        self.__order_book_integrity = {}
+        self.__order_book_integrity_resync = {}
+        self.__order_book_notify_depth = {}
+        self.__order_book_notified = {}
+        self.__order_book_conflation = {}
+        self.__order_book_last_output = {}
+        self.__order_book_pending = {}
+        self.__order_book_output_lock = threading.Lock()
+        self.__order_book_max_depth = {}
+
+        self.__intervals_to_native = {}
+        self.__intervals_to_unified = {}
+
+        for __interval in self.get_supported_intervals():
+            __native_interval = self.__get_interval_from_unified_interval(__interval)
+            self.__intervals_to_native[__interval] = __native_interval
+            self.__intervals_to_unified[__native_interval] =\
+                self.get_unified_interval_from_interval(__native_interval)
+
         self.ping_interval_ms = 10.0
         self.ping_timeout_ms = 10.0
 
-        if not self.__check_streams_struct(streams):
-            raise ValueError('The streams struct is not valid' + str(streams))
+        if streams is not None:
+            if not self.__check_streams_struct(streams):
+                raise ValueError('The streams struct is not valid' + str(streams))
 
-        if len(streams) > __exchange_limit_streams:
-            raise ValueError('The exchange ' + str(self.__exchange)\
-                             + ' not alowed more than ' + str(__exchange_limit_streams)\
-                             + ' of streams.')
+            if len(streams) > __exchange_limit_streams:
+                raise ValueError('The exchange ' + str(self.__exchange)\
+                                 + ' not alowed more than ' + str(__exchange_limit_streams)\
+                                 + ' of streams.')
 
     def __del__(self):
 
         if not self.__stop_flag:
             self.stop()
 
+    def get_stream_buffer(self, endpoint, symbol, interval: str='none'):
+        """
+        get_stream_buffer
+        =================
+            This function return the kline or trades buffer of a stream, to be restored
+            in a new instance with set_stream_buffer().
+                :param endpoint: str 'kline' | 'trades'.
+                :param symbol: str unified symbol.
+                :param interval: str.
+                :return list | None: Return list of messages, None for other endpoints or
+                    if the stream has no data.
+        """
+        result = None
+
+        __buffer = self.__ws_temp_data[self.get_stream_index(endpoint, symbol, interval)]
+
+        if endpoint == 'kline' and isinstance(__buffer, KlineBuffer):
+            result = __buffer.get_last()
+        elif endpoint == 'trades' and isinstance(__buffer, queue.Queue):
+            result = list(__buffer.queue)
+
+        return result
+
+    def set_stream_buffer(self, endpoint, symbol, interval, messages):
+        """
+        set_stream_buffer
+        =================
+            This function restore the kline or trades buffer of a stream saved with
+            get_stream_buffer(), only while the stream has no data. New candles replace
+            the restored ones with the same open time.
+                :param endpoint: str 'kline' | 'trades'.
+                :param symbol: str unified symbol.
+                :param interval: str.
+                :param messages: list of messages.
+                :return bool: Return True if the buffer was restored.
+        """
+        result = False
+
+        __stream_index = self.get_stream_index(endpoint, symbol, interval)
+
+        if self.__ws_temp_data[__stream_index] is None\
+            and isinstance(messages, list) and len(messages) > 0:
+            if endpoint == 'kline':
+                __buffer = KlineBuffer(self.__data_max_len, self.__result_max_len)
+
+                for __message in messages:
+                    __buffer.set(int(__message['open_time']), __message)
+
+                self.__ws_temp_data[__stream_index] = __buffer
+                result = True
+            elif endpoint == 'trades':
+                __buffer = queue.Queue(maxsize=self.__data_max_len)
+
+                for __message in messages[-self.__data_max_len:]:
+                    __buffer.put(__message)
+
+                self.__ws_temp_data[__stream_index] = __buffer
+                result = True
+
+        return result
+
     def reset_ws_temp_data(self):
         """
         reset_ws_temp_data
@@ -152,6 +244,9 @@ class KucoinCcxwAuxClass():
         if self.__ping_thread:
             self.__ping_thread.join(45)
 
+        for __recorder in self.__order_book_recorders.values():
+            __recorder.close()
+
     def __check_streams_struct(self, streams):
         """
         __check_streams_struct
@@ -162,7 +257,7 @@ class KucoinCcxwAuxClass():
                                 dicts must have this struct.
                                     {
                                         'endpoint': str only allowed 'order_book' | 'kline' |\
-                                            'trades' | 'ticker',
+                                            'trades' | 'ticker' | 'bbo',
                                         'symbol': str unified symbol.,
                                         'interval': str '1m' | '3m' | '5m' | '15m' | '30m' |\
                                             '1h' | '2h' | '4h' | '6h' | '8h' | '12h' | '1d' |\
@@ -186,15 +281,27 @@ class KucoinCcxwAuxClass():
                     and 'symbol' in stream\
                     and stream['symbol'] is not None\
                     and isinstance(stream['symbol'], str)\
-                    and self.if_symbol_supported(stream['symbol'])
+                    and self.if_symbol_supported(stream['symbol'])\
+                    and ccf.is_valid_stream_options(stream)
 
                 if result and stream['endpoint'] == 'kline':
                     result = 'interval' in stream\
                         and stream['interval'] is not None\
                         and isinstance(stream['interval'], str)\
-                        and stream['interval'] in\
-                            ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h',\
-                             '6h', '8h', '12h', '1d', '1w']
+                        and stream['interval'] in self.get_supported_intervals()
+
+        return result
+
+    def get_supported_intervals(self):
+        """
+        get_supported_intervals
+        =======================
+            This function return the unified intervals supported for kline endpoint.
+
+                :return list: Return list of unified intervals.
+        """
+        result = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h',\
+                  '6h', '8h', '12h', '1d', '1w']
 
         return result
 
@@ -359,6 +466,63 @@ class KucoinCcxwAuxClass():
 
         return result
 
+    def get_exchange_symbols_index(self):
+        """
+        get_exchange_symbols_index
+        ==========================
+            This function get exchange symbols data indexed by unified symbol.
+                :return dict: Return dict unified symbol -> {'symbol': native symbol,
+                    'intervals': list of supported unified intervals,
+                    'tick_size': str price tick size or None}.
+        """
+
+        result = None
+        __main_data = self.get_exchange_info()
+
+        if __main_data is not None and isinstance(__main_data,dict)\
+            and 'data' in __main_data and isinstance(__main_data['data'],list):
+            result = {}
+            __intervals = self.get_supported_intervals()
+            for symbol_data in __main_data['data']:
+                if symbol_data is not None and isinstance(symbol_data,dict)\
+                    and 'symbol' in symbol_data and 'baseCurrency' in symbol_data\
+                    and 'quoteCurrency' in symbol_data\
+                    and isinstance(symbol_data['baseCurrency'],str)\
+                    and isinstance(symbol_data['quoteCurrency'],str):
+                    __unified_symbol = symbol_data['baseCurrency'].upper() + '/'\
+                        + symbol_data['quoteCurrency'].upper()
+                    __tick_size = None
+                    if 'priceIncrement' in symbol_data:
+                        __tick_size = str(symbol_data['priceIncrement'])
+                    result[__unified_symbol] = {
+                        'symbol': symbol_data['symbol'],
+                        'intervals': __intervals,
+                        'tick_size': __tick_size
+                    }
+
+        return result
+
+    def get_symbol_tick_size(self, symbol):
+        """
+        get_symbol_tick_size
+        ====================
+            This function get the price tick size of a symbol from exchange info.
+                :param symbol: str unified symbol.
+                :return str | None: Return tick size, None if it is unknown.
+        """
+        result = self.__tick_size_cache.get(symbol)
+
+        if result is None:
+            __index = self.get_exchange_symbols_index()
+
+            if __index is not None and symbol in __index:
+                result = __index[symbol]['tick_size']
+
+                if result is not None:
+                    self.__tick_size_cache[symbol] = result
+
+        return result
+
     def get_unified_symbol_from_symbol(self, symbol):
         """
         get_unified_symbol_from_symbol
@@ -368,33 +532,41 @@ class KucoinCcxwAuxClass():
                 :param symbol: str.
                 :return str: Return unified symbol.
         """
-        result = symbol
+        result = self.__unified_symbol_cache.get(symbol)
+
+        if result is None:
+            result = symbol
+
+            full_list_symbols = self.get_exchange_full_list_symbols(False)
 
-        full_list_symbols = self.get_exchange_full_list_symbols(False)
+            for symbol_rpl in full_list_symbols:
+                if symbol.replace('-', '').lower() == symbol_rpl.replace('/', '').lower():
+                    result = symbol_rpl
+                    break
 
-        for symbol_rpl in full_list_symbols:
-            if symbol.replace('-', '').lower() == symbol_rpl.replace('/', '').lower():
-                result = symbol_rpl
-                break
+            self.__unified_symbol_cache[symbol] = result
 
         return result
 
     def __get_interval_from_unified_interval(self, interval):
-        result = '1'
+        result = self.__intervals_to_native.get(interval)
 
-        if interval is not None:
-            result = str(interval)
+        if result is None:
+            result = '1'
 
-            if 'm' in result:
-                result = result.replace('m', 'min')
-            elif 'h' in result or 'H' in result:
-                result = result.lower().replace('h', 'hour')
-            elif 'd' in result or 'D' in result:
-                result = result.lower().replace('d', 'day')
-            elif 'w' in result or 'W' in result:
-                result = result.lower().replace('w', 'week')
+            if interval is not None:
+                result = str(interval)
 
-            result = str(result)
+                if 'm' in result:
+                    result = result.replace('m', 'min')
+                elif 'h' in result or 'H' in result:
+                    result = result.lower().replace('h', 'hour')
+                elif 'd' in result or 'D' in result:
+                    result = result.lower().replace('d', 'day')
+                elif 'w' in result or 'W' in result:
+                    result = result.lower().replace('w', 'week')
+
+                result = str(result)
 
         return result
 
@@ -408,21 +580,24 @@ class KucoinCcxwAuxClass():
                 :return str: Return unified interval.
         """
 
-        result = interval
+        result = self.__intervals_to_unified.get(interval)
+
+        if result is None:
+            result = interval
 
-        if result is not None:
-            result = str(interval)
+            if result is not None:
+                result = str(interval)
 
-            if 'min' in result:
-                result = result.replace('min', 'm')
-            elif 'hour' in result:
-                result = result.replace('hour', 'h')
-            elif 'day' in result:
-                result = result.replace('day', 'd')
-            elif 'week' in result:
-                result = result.replace('week', 'w')
+                if 'min' in result:
+                    result = result.replace('min', 'm')
+                elif 'hour' in result:
+                    result = result.replace('hour', 'h')
+                elif 'day' in result:
+                    result = result.replace('day', 'd')
+                elif 'week' in result:
+                    result = result.replace('week', 'w')
 
-            result = str(result)
+                result = str(result)
 
         return result
 
@@ -455,16 +630,40 @@ class KucoinCcxwAuxClass():
                 :param interval: str.
                 :return str: Return stream index
         """
-        result = 'stream'
+        __key = (endpoint, symbol, interval)
+        result = self.__stream_index_cache.get(__key)
 
-        if interval is None:
-            interval = 'none'
+        if result is None:
+            result = 'stream'
+
+            if interval is None:
+                interval = 'none'
 
-        result = result + '_' + endpoint + '_'\
-            + self.get_unified_symbol_from_symbol(symbol) + '_'\
-            + self.get_unified_interval_from_interval(interval)
+            result = result + '_' + endpoint + '_'\
+                + self.get_unified_symbol_from_symbol(symbol) + '_'\
+                + self.get_unified_interval_from_interval(interval)
 
-        result = result.replace('/','').lower()
+            result = result.replace('/','').lower()
+
+            self.__stream_index_cache[__key] = result
+
+        return result
+
+    def __get_order_book_channel(self, stream):
+        """
+        __get_order_book_channel
+        ========================
+            This function return the native topic for the depth of an order_book
+            stream: level2Depth5 for depth 5, level2Depth50 otherwise. Both push
+            snapshots every 100 ms, update_speed is ignored. The incremental level2
+            topic is not used for 'full', its full snapshot needs API keys.
+                :param stream: dict.
+                :return str: Return topic.
+        """
+        result = '/spotMarket/level2Depth50'
+
+        if stream.get('depth') == 5:
+            result = '/spotMarket/level2Depth5'
 
         return result
 
@@ -505,7 +704,7 @@ class KucoinCcxwAuxClass():
             if stream['endpoint'] == 'order_book':
                 result = True
 
-                __topic_open['topic'] = '/spotMarket/level2Depth50:'\
+                __topic_open['topic'] = self.__get_order_book_channel(stream) + ':'\
                     + stream['symbol'].replace("/","-").upper()
                 __topic_close['topic'] = __topic_open['topic']
 
@@ -527,10 +726,53 @@ class KucoinCcxwAuxClass():
                     + stream['symbol'].replace("/","-").upper()
                 __topic_close['topic'] = __topic_open['topic']
 
+            elif stream['endpoint'] == 'bbo':
+                __topic_open['topic'] = '/spotMarket/level1:'\
+                    + stream['symbol'].replace("/","-").upper()
+                __topic_close['topic'] = __topic_open['topic']
+
             __stream_index = self.get_stream_index(stream['endpoint'],\
                                                      stream['symbol'],\
                                                      interval=interval)
             self.__ws_temp_data[__stream_index] = None
+            __native_symbol = stream['symbol'].replace('/', '-').upper()
+            self.__unified_symbol_cache[__native_symbol] = stream['symbol']
+            self.__stream_index_cache[(stream['endpoint'],\
+                                       __native_symbol,\
+                                       self.__intervals_to_native.get(interval, interval))]\
+                = __stream_index
+
+            if stream['endpoint'] == 'order_book':
+                self.__order_book_max_depth[__stream_index] = stream.get('max_depth')
+                self.__order_book_aggregation[__stream_index] = stream.get('aggregation')
+                self.__order_book_depth_bands[__stream_index] = stream.get('depth_bands_bps')
+
+                if stream.get('output_mode') == 'delta':
+                    self.__order_book_delta_logs[__stream_index] = OrderBookDeltaLog(\
+                        snapshot_interval=stream.get('snapshot_interval', 100))
+
+                if stream.get('notify_on') == 'bbo':
+                    self.__order_book_notify_depth[__stream_index] = 1
+                elif stream.get('notify_on') == 'top_n':
+                    self.__order_book_notify_depth[__stream_index] = self.__result_max_len
+
+                if stream.get('conflation_ms') is not None:
+                    self.__order_book_conflation[__stream_index] = stream['conflation_ms'] / 1000
+
+                if stream.get('history') is not None:
+                    self.__order_book_histories[__stream_index] = OrderBookHistory(\
+                        **stream['history'])
+
+                if stream.get('record') is not None:
+                    self.__order_book_recorders[__stream_index] = OrderBookRecorder(\
+                        **stream['record'])
+
+                self.__order_book_integrity[__stream_index] = OrderBookIntegrity(\
+                    stream.get('max_snapshot_age'))
+                self.__order_book_integrity_resync[__stream_index] = (
+                    stream.get('integrity_resync', False)
+                )
+
             self.__ws_endpoint_on_open_vars.append(json.dumps(__topic_open))
             self.__ws_endpoint_on_close_vars.append(json.dumps(__topic_close))
 
@@ -609,6 +851,265 @@ class KucoinCcxwAuxClass():
             with self.__stop_flag_lock:
                 __local_stop = self.__stop_flag
 
+    def get_book_stats(self, symbol):
+        """
+        get_book_stats
+        ==============
+            This function return the statistics of the local order book of a symbol,
+            they are computed by the book engine on each change.
+                :param symbol: str unified symbol.
+                :return dict | None: Return dict with book statistics, None if no book.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            result = __book_data['book'].get_stats()
+
+        return result
+
+    def get_order_book_arrays(self, symbol, depth=None):
+        """
+        get_order_book_arrays
+        =====================
+            This function return the local order book of a symbol as numpy float64
+            arrays, read-only and shared until the book changes.
+                :param symbol: str unified symbol.
+                :param depth: int | None levels on each side (None for all).
+                :return dict | None: Return {'bids': (prices, sizes), 'asks': (prices, sizes)},
+                    None if the book is not available or numpy is not installed.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            result = __book_data['book'].get_arrays(depth)
+
+        return result
+
+    def get_klines_arrays(self, symbol, interval, count=None):
+        """
+        get_klines_arrays
+        =================
+            This function return the last candles of a kline stream as numpy arrays,
+            read-only zero-copy views of the columnar buffer.
+                :param symbol: str unified symbol.
+                :param interval: str unified interval.
+                :param count: int | None candles (None for all).
+                :return dict | None: Return dict column -> array, None if the stream has
+                    no data or numpy is not installed.
+        """
+        result = None
+
+        __buffer = self.__ws_temp_data[self.get_stream_index('kline', symbol, interval)]
+
+        if isinstance(__buffer, KlineBuffer):
+            result = __buffer.get_arrays(count)
+
+        return result
+
+    def get_aggregated_order_book(self, symbol, depth=None):
+        """
+        get_aggregated_order_book
+        =========================
+            This function return the price buckets of the local order book of a symbol,
+            they are updated by the book engine on each level change.
+                :param symbol: str unified symbol.
+                :param depth: int | None buckets on each side (None for all).
+                :return dict | None: Return dict with step, bids and asks ([price, size]),
+                    None if the stream has no aggregation or the book is not available.
+        """
+        result = None
+
+        __book_data = self.__ws_temp_data[self.get_stream_index('order_book', symbol)]
+
+        if isinstance(__book_data, dict) and __book_data.get('book') is not None\
+            and __book_data['book'].get_aggregation_step() is not None:
+            result = {}
+            result['step'] = __book_data['book'].get_aggregation_step()
+            result['bids'] = __book_data['book'].get_aggregated_bids(depth)
+            result['asks'] = __book_data['book'].get_aggregated_asks(depth)
+
+        return result
+
+    def __is_order_book_notify_due(self, stream_index):
+        """
+        __is_order_book_notify_due
+        ==========================
+            This function check if an order_book message must be built for a stream with
+            notify_on, only when the watched best levels changed since the last message.
+                :param stream_index: str.
+                :return bool: Return True if the message must be built.
+        """
+        result = True
+
+        __book_data = self.__ws_temp_data[stream_index]
+
+        if self.__order_book_notify_depth.get(stream_index) is not None\
+            and isinstance(__book_data, dict) and __book_data.get('book') is not None:
+            __notified = (__book_data['book'], __book_data['book'].get_top_version())
+            __last_notified = self.__order_book_notified.get(stream_index)
+
+            result = __last_notified is None or __last_notified[0] is not __notified[0]\
+                or __last_notified[1] != __notified[1]
+
+            if result:
+                self.__order_book_notified[stream_index] = __notified
+
+        return result
+
+    def __get_order_book_output(self, stream_index, message_out):
+        """
+        __get_order_book_output
+        =======================
+            This function complete an order_book message with the book levels, or keep
+            it pending when the stream has conflation_ms and the last message is recent,
+            the pending message is completed by the next due message or on read.
+                :param stream_index: str.
+                :param message_out: dict message without levels.
+                :return dict | None: Return the complete message, None if it is pending.
+        """
+        result = None
+
+        __conflation = self.__order_book_conflation.get(stream_index)
+
+        with self.__order_book_output_lock:
+            if __conflation is not None\
+                and time.time() - self.__order_book_last_output.get(stream_index, 0) < __conflation:
+                self.__order_book_pending[stream_index] = message_out
+            else:
+                result = self.__materialize_order_book_message(stream_index, message_out)
+
+        return result
+
+    def __materialize_order_book_message(self, stream_index, message_out):
+        """
+        __materialize_order_book_message
+        ================================
+            This function add the book levels and the timestamps to an order_book
+            message, called with the output lock held.
+                :param stream_index: str.
+                :param message_out: dict message without levels.
+                :return dict: Return the complete message.
+        """
+        result = message_out
+
+        self.__order_book_pending.pop(stream_index, None)
+        self.__order_book_last_output[stream_index] = time.time()
+
+        result['bids'] = self.__ws_temp_data[stream_index]['book'].get_bids(self.__result_max_len)
+        result['asks'] = self.__ws_temp_data[stream_index]['book'].get_asks(self.__result_max_len)
+        self.__set_order_book_delta_output(stream_index, result)
+        __current_datetime = datetime.datetime.now(datetime.timezone.utc)
+        __current_timestamp = __current_datetime.strftime("%s.%f")
+        __current_datetime = __current_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")
+        result['timestamp'] = __current_timestamp
+        result['datetime'] = __current_datetime
+
+        return result
+
+    def get_pending_order_book(self, symbol):
+        """
+        get_pending_order_book
+        ======================
+            This function complete the pending (conflated) order_book message of a
+            symbol with the current book.
+                :param symbol: str unified symbol.
+                :return dict | None: Return the message, None if nothing is pending.
+        """
+        result = None
+
+        __stream_index = self.get_stream_index('order_book', symbol)
+
+        with self.__order_book_output_lock:
+            __message_out = self.__order_book_pending.get(__stream_index)
+
+            if __message_out is not None\
+                and isinstance(self.__ws_temp_data[__stream_index], dict)\
+                and self.__ws_temp_data[__stream_index].get('book') is not None:
+                result = self.__materialize_order_book_message(__stream_index, __message_out)
+
+        return result
+
+    def __set_order_book_delta_output(self, stream_index, message_out):
+        """
+        __set_order_book_delta_output
+        =============================
+            This function replace the levels of an order_book message with the last
+            entry of the stream delta log when the stream output_mode is 'delta'.
+                :param stream_index: str.
+                :param message_out: dict normalized message.
+        """
+        __delta_log = self.__order_book_delta_logs.get(stream_index)
+
+        if __delta_log is not None:
+            __entry = __delta_log.get_last_entry()
+
+            if __entry is not None:
+                message_out['bids'] = __entry['bids']
+                message_out['asks'] = __entry['asks']
+                message_out['type'] = __entry['type']
+                message_out['sequence'] = __entry['sequence']
+
+    def get_order_book_deltas(self, symbol, from_sequence=0):
+        """
+        get_order_book_deltas
+        =====================
+            This function return the snapshots and level changes of a symbol recorded
+            after from_sequence, only for streams with output_mode 'delta'.
+                :param symbol: str unified symbol.
+                :param from_sequence: int last sequence already applied.
+                :return list | None: Return list of dict {sequence, type, bids, asks}.
+        """
+        result = None
+
+        __delta_log = self.__order_book_delta_logs.get(self.get_stream_index('order_book', symbol))
+
+        if __delta_log is not None:
+            result = __delta_log.get_entries(from_sequence)
+
+        return result
+
+    def get_order_book_history(self, symbol, start_time=None, end_time=None):
+        """
+        get_order_book_history
+        ======================
+            This function return the sampled best levels of a symbol between two times,
+            only for streams with history.
+                :param symbol: str unified symbol.
+                :param start_time: float | None unix time.
+                :param end_time: float | None unix time.
+                :return list | None: Return list of dict {timestamp, bids, asks}.
+        """
+        result = None
+
+        __history = self.__order_book_histories.get(self.get_stream_index('order_book', symbol))
+
+        if __history is not None:
+            result = __history.get_samples(start_time, end_time)
+
+        return result
+
+    def get_order_book_integrity(self, symbol):
+        """
+        get_order_book_integrity
+        ========================
+            This function return the invariant check counters of the local order book
+            of a symbol, kept across resyncs.
+                :param symbol: str unified symbol.
+                :return dict | None: Return dict with counters, None without order book.
+        """
+        result = None
+
+        __integrity = self.__order_book_integrity.get(self.get_stream_index('order_book', symbol))
+
+        if __integrity is not None:
+            result = __integrity.get_counters()
+
+        return result
+
     def manage_websocket_message_order_book(self, data):
         """
         manage_websocket_message_order_book
@@ -643,29 +1144,43 @@ class KucoinCcxwAuxClass():
                     __bids = __temp_data['data']['bids']
                     __asks = __temp_data['data']['asks']
 
-                    __message_out = None
-                    __message_out = {}
-                    __message_out['endpoint'] = 'order_book'
-                    __message_out['exchange'] = self.__exchange
-                    __message_out['symbol'] = __symbol
-                    __message_out['interval'] = None
-                    __message_out['last_update_id'] = __temp_data['data']['timestamp']
-                    __message_out['diff_update_id'] = 0
-
-                    __message_out['bids'] = __bids[:self.__result_max_len]
-                    __message_out['asks'] = __asks[:self.__result_max_len]
-                    __message_out['type'] = 'snapshot'
-                    __current_datetime = datetime.datetime.now(datetime.timezone.utc)
-                    __current_timestamp = __current_datetime.strftime("%s.%f")
-                    __current_datetime = (
-                        __current_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")
-                    )
-                    __message_out['timestamp'] = __current_timestamp
-                    __message_out['datetime'] = __current_datetime
-
-                    result = __message_out
+                    __book = None
+
+                    if isinstance(self.__ws_temp_data[__stream_index], dict):
+                        __book = self.__ws_temp_data[__stream_index].get('book')
+
+                    if __book is None:
+                        __book = OrderBook(self.get_symbol_tick_size(\
+                            self.get_unified_symbol_from_symbol(__symbol)),\
+                            self.__order_book_max_depth.get(__stream_index),\
+                            aggregation=self.__order_book_aggregation.get(__stream_index),\
+                            depth_bands_bps=self.__order_book_depth_bands.get(__stream_index),\
+                            delta_log=self.__order_book_delta_logs.get(__stream_index),\
+                            notify_depth=self.__order_book_notify_depth.get(__stream_index),\
+                            history=self.__order_book_histories.get(__stream_index),\
+                            integrity=self.__order_book_integrity.get(__stream_index),\
+                            recorder=self.__order_book_recorders.get(__stream_index))
+                        __book.set_snapshot(__bids, __asks)
+                    else:
+                        __book.replace(__bids, __asks)
+
+                    __temp_data['book'] = __book
                     self.__ws_temp_data[__stream_index] = __temp_data
 
+                    if self.__is_order_book_notify_due(__stream_index):
+                        __message_out = None
+                        __message_out = {}
+                        __message_out['endpoint'] = 'order_book'
+                        __message_out['exchange'] = self.__exchange
+                        __message_out['symbol'] = __symbol
+                        __message_out['interval'] = None
+                        __message_out['last_update_id'] = __temp_data['data']['timestamp']
+                        __message_out['diff_update_id'] = 0
+
+                        __message_out['type'] = 'snapshot'
+
+                        result = self.__get_order_book_output(__stream_index, __message_out)
+
         return result
 
     def manage_websocket_message_kline(self, data):
@@ -719,8 +1234,9 @@ class KucoinCcxwAuxClass():
                     __delta_time = __delta_time - 1
 
                     if self.__ws_temp_data[__stream_index] is None\
-                        or not isinstance(self.__ws_temp_data[__stream_index], dict):
-                        self.__ws_temp_data[__stream_index] = {}
+                        or not isinstance(self.__ws_temp_data[__stream_index], KlineBuffer):
+                        self.__ws_temp_data[__stream_index] = KlineBuffer(self.__data_max_len,\
+                                                                          self.__result_max_len)
 
                     __message_add = None
                     __message_add = {}
@@ -748,17 +1264,13 @@ class KucoinCcxwAuxClass():
                     __message_add['volume'] = __temp_data['data']['candles'][5]
                     __message_add['is_closed'] = None
 
-                    self.__ws_temp_data[__stream_index][int(__message_add['open_time'])] = (
-                        __message_add
-                    )
-
-                    while len(self.__ws_temp_data[__stream_index]) > self.__data_max_len:
-                        __first_key = min(list(self.__ws_temp_data[__stream_index].keys()))
-                        __nc = self.__ws_temp_data[__stream_index].pop(__first_key,None)
-
-                    __message_out = list(self.__ws_temp_data[__stream_index].values())
+                    self.__ws_temp_data[__stream_index].set(int(__message_add['open_time']),\
+                                                            __message_add)
 
-                    result = __message_out[:self.__result_max_len]
+                    __message_out = (
+                        self.__ws_temp_data[__stream_index].get_last(self.__result_max_len)
+                    )
+                    result = __message_out
 
         return result
 
@@ -888,6 +1400,63 @@ class KucoinCcxwAuxClass():
 
         return result
 
+    def manage_websocket_message_bbo(self, data):
+        """
+        manage_websocket_message_bbo
+        ============================
+            This function manage websocket message and normalize result
+            data for bbo endpoint (/spotMarket/level1 topic).
+
+                :param data: dict.
+                :return dict: Return dict with normalized data.
+        """
+        result = None
+
+        __temp_data = data
+
+        if __temp_data is not None and isinstance(__temp_data,dict):
+            if 'type' in __temp_data and __temp_data['type'] == 'message'\
+                and  'data' in __temp_data and isinstance(__temp_data['data'],dict)\
+                and 'timestamp' in __temp_data['data']:
+
+                __symbol = __temp_data['topic'].split(':')[1]
+                __stream_index = self.get_stream_index('bbo', __symbol)
+
+                self.__ws_temp_data[__stream_index] = __temp_data
+
+                __message_add = None
+                __message_add = {}
+                __message_add['endpoint'] = 'bbo'
+                __message_add['exchange'] = self.__exchange
+                __message_add['symbol'] = __symbol
+                __message_add['interval'] = None
+                __message_add['update_id'] = None
+                __message_add['event_time'] = int(__temp_data['data']['timestamp'])
+                __message_add['event_time_date'] = (
+                    time.strftime("%Y-%m-%d %H:%M:%S",\
+                                  time.gmtime(int(round(__message_add['event_time']/1000))))\
+                    + '.' + str(round(math.modf(round(__message_add['event_time']/1000,\
+                                                      3))[0]*1000)).rjust(3,'0')
+                )
+                __message_add['best_bid_price'] = None
+                __message_add['best_bid_quantity'] = None
+                __message_add['best_ask_price'] = None
+                __message_add['best_ask_quantity'] = None
+
+                if isinstance(__temp_data['data'].get('bids'), list)\
+                    and len(__temp_data['data']['bids']) >= 2:
+                    __message_add['best_bid_price'] = __temp_data['data']['bids'][0]
+                    __message_add['best_bid_quantity'] = __temp_data['data']['bids'][1]
+
+                if isinstance(__temp_data['data'].get('asks'), list)\
+                    and len(__temp_data['data']['asks']) >= 2:
+                    __message_add['best_ask_price'] = __temp_data['data']['asks'][0]
+                    __message_add['best_ask_quantity'] = __temp_data['data']['asks'][1]
+
+                result = __message_add
+
+        return result
+
     def manage_websocket_message(self, ws, message_in): # pylint: disable=unused-argument
         """
         manage_websocket_message
@@ -926,7 +1495,8 @@ class KucoinCcxwAuxClass():
                             if len(__tmp_split) > 0:
                                 __tmp_endpoint = __temp_data['topic'].split(':')[0]
 
-                        if __tmp_endpoint == '/spotMarket/level2Depth50':
+                        if __tmp_endpoint in ('/spotMarket/level2Depth50',\
+                                              '/spotMarket/level2Depth5'):
                             __endpoint = 'order_book'
                         elif __tmp_endpoint == '/market/candles':
                             __endpoint = 'kline'
@@ -934,6 +1504,8 @@ class KucoinCcxwAuxClass():
                             __endpoint = 'trades'
                         elif __tmp_endpoint == '/market/ticker':
                             __endpoint = 'ticker'
+                        elif __tmp_endpoint == '/spotMarket/level1':
+                            __endpoint = 'bbo'
                     elif 'type' in __temp_data\
                         and __temp_data['type'] is not None\
                         and isinstance(__temp_data['type'], str)\
@@ -977,6 +1549,14 @@ class KucoinCcxwAuxClass():
                     result['min_proc_time_ms'] = 0
                     result['max_proc_time_ms'] = 0
 
+                elif __endpoint == 'bbo':
+                    __message_out = self.manage_websocket_message_bbo(__temp_data)
+
+                    result = {}
+                    result['data'] = __message_out
+                    result['min_proc_time_ms'] = 0
+                    result['max_proc_time_ms'] = 0
+
         except Exception as exc: # pylint: disable=broad-except
             print(str(exc))
 
@@ -0,0 +1,1460 @@
+"""
+Ccxw - CryptoCurrency eXchange Websocket Library
+Local order book engine
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+"""
+
+import bisect
+import math
+import time
+import os
+import json
+import collections
+import array
+from threading import Lock
+
+try:
+    import numpy
+except ImportError: # numpy is an optional dependency, only used by get_arrays()
+    numpy = None
+
+class OrderBook():
+    """
+    OrderBook - Local sorted order book
+    ===================================
+        This class keeps both sides of a local order book sorted by parsed price.
+        Each side is a dict price key -> [price, size, parsed size, parsed price]
+        plus a sorted list of keys, so a level insert or delete is a bisect plus a
+        list insert/remove, and the top k levels are read in O(k) without sorting.
+
+        When the symbol tick size is known, prices are keyed by their integer tick
+        index (round(price / tick_size)), so '0.10' and '0.1' are the same level and
+        comparisons are integer comparisons. Without tick size the parsed float is used.
+
+        Bid keys are stored negated, so index 0 is always the best level on both
+        sides.
+
+        With max_depth only the best max_depth levels plus a margin are kept on each
+        side. Once a side was trimmed, changes beyond its worst retained level are
+        ignored, and when the side falls below max_depth levels the book reports
+        itself exhausted (is_depth_exhausted()) so the caller can resync it.
+
+        Book statistics (mid, spread, microprice, imbalance and depth within bps bands
+        of mid) are computed by get_stats() once per book version. The size within each
+        depth band is a running sum adjusted by the size difference of each level
+        change, get_stats() only moves the band edges to the current mid, visiting the
+        levels the edges crossed. Without readers the statistics cost only the running
+        sums, with depth_bands_bps=() nothing.
+
+        With aggregation ({'step': price_step} or {'bps': bps_of_mid}) the levels are
+        also summed into price buckets (bids rounded down, asks rounded up) that are
+        updated with the size difference of each level change. The bps step is fixed
+        with the mid price of each snapshot.
+
+        With delta_log (OrderBookDeltaLog) every snapshot and every set of applied
+        level changes is recorded with a sequence number.
+
+        With history (OrderBookHistory) the best levels are sampled after book changes,
+        at most once per history interval.
+
+        With recorder (OrderBookRecorder) every snapshot is written as a checkpoint and
+        every update as a diff, as received, so the book can be rebuilt as of a past
+        time.
+
+        With notify_depth the book counts the changes that touch the best notify_depth
+        levels of a side (get_top_version()), so callers can skip the output of updates
+        that only change deeper levels.
+
+        With numpy installed get_arrays() return float64 (prices, sizes) arrays of each
+        side, built from the parsed values once per book version and shared read-only
+        by the next reads until the book changes.
+
+        After each snapshot and update the book runs O(1) invariant checks (best bid
+        below best ask, the two best levels of each side ordered by parsed price and
+        no negative sizes in the changed levels), is_consistent() return the last
+        result and, with integrity (OrderBookIntegrity), the violations are counted.
+
+        Example:
+
+            book = OrderBook('0.01')
+            book.set_snapshot(bids, asks)
+            book.update(bids_changes, asks_changes)
+            top_bids = book.get_bids(10)
+    """
+
+    def __init__(self, tick_size=None, max_depth=None, depth_bands_bps=None,\
+                 aggregation=None, delta_log=None, notify_depth=None, history=None,\
+                 integrity=None, recorder=None):
+        """
+        OrderBook constructor
+        =====================
+            Initializes an empty book.
+                :param tick_size: str | float | None price tick size, None if it is unknown.
+                :param max_depth: int | None levels needed on each side, None for full book.
+                :param depth_bands_bps: tuple | None bands in bps around mid for depth
+                    statistics, None for (10, 25, 50, 100).
+                :param aggregation: dict | None {'step': price_step} or {'bps': bps_of_mid}.
+                :param delta_log: OrderBookDeltaLog | None log of snapshots and changes.
+                :param notify_depth: int | None best levels watched by get_top_version().
+                :param history: OrderBookHistory | None sampled history of the best levels.
+                :param integrity: OrderBookIntegrity | None counters of invariant violations.
+                :param recorder: OrderBookRecorder | None file of diffs and checkpoints.
+        """
+        self.__lock = Lock()
+        self.__notify_depth = None
+        self.__top_version = 0
+        self.__version = 0
+        self.__arrays = None
+        self.__arrays_version = None
+
+        if notify_depth is not None and int(notify_depth) > 0:
+            self.__notify_depth = int(notify_depth)
+
+        self.__delta_log = delta_log
+        self.__history = history
+        self.__integrity = integrity
+        self.__recorder = recorder
+        self.__consistent = True
+        self.__bad_size = False
+        self.__aggregation = None
+        self.__bucket_step = None
+
+        if isinstance(aggregation, dict) and len(aggregation) == 1\
+            and ('step' in aggregation or 'bps' in aggregation):
+            self.__aggregation = dict(aggregation)
+            if 'step' in aggregation and float(aggregation['step']) > 0:
+                self.__bucket_step = float(aggregation['step'])
+
+        self.__bids_buckets = {}
+        self.__asks_buckets = {}
+        self.__bids_bucket_keys = []
+        self.__asks_bucket_keys = []
+        if depth_bands_bps is None:
+            depth_bands_bps = (10, 25, 50, 100)
+
+        self.__depth_bands_bps = sorted(depth_bands_bps)
+        self.__band_edges = None
+        self.__bids_band_sums = [0.0] * len(self.__depth_bands_bps)
+        self.__asks_band_sums = [0.0] * len(self.__depth_bands_bps)
+        self.__stats = None
+        self.__stats_version = None
+        self.__tick_size = None
+        self.__max_depth = None
+        self.__max_levels = None
+
+        if max_depth is not None and int(max_depth) > 0:
+            self.__max_depth = int(max_depth)
+            self.__max_levels = self.__max_depth + max(10, self.__max_depth // 2)
+
+        try:
+            if tick_size is not None and float(tick_size) > 0:
+                self.__tick_size = float(tick_size)
+        except (TypeError, ValueError):
+            self.__tick_size = None
+
+        self.__bids_levels = {}
+        self.__asks_levels = {}
+        self.__bids_keys = []
+        self.__asks_keys = []
+        self.__bids_truncated = False
+        self.__asks_truncated = False
+
+    def __get_key(self, price, is_bid):
+        """
+        __get_key
+        =========
+            This function return the sort key for a price.
+                :param price: str | float.
+                :param is_bid: bool.
+                :return int | float: Return sort key.
+        """
+        result = float(price)
+
+        if self.__tick_size is not None:
+            result = int(round(result / self.__tick_size))
+
+        if is_bid:
+            result = -result
+
+        return result
+
+    def __get_price(self, key, is_bid):
+        """
+        __get_price
+        ===========
+            This function return the price as float from a sort key.
+                :param key: int | float.
+                :param is_bid: bool.
+                :return float: Return price.
+        """
+        result = key
+
+        if is_bid:
+            result = -result
+
+        if self.__tick_size is not None:
+            result = result * self.__tick_size
+
+        return float(result)
+
+    def __set_level(self, levels, keys, price, size, is_bid, is_truncated):
+        """
+        __set_level
+        ===========
+            This function insert, update or delete (size 0) one level of a side.
+            Levels beyond the worst retained level of a trimmed side are ignored.
+                :return bool: Return True if the book changed.
+        """
+        result = False
+
+        __price = float(price)
+        __key = self.__get_key(__price, is_bid)
+        __size = float(size)
+
+        __is_top = self.__notify_depth is None or len(keys) < self.__notify_depth\
+            or __key <= keys[self.__notify_depth - 1]
+
+        if is_truncated and len(keys) > 0 and __key > keys[-1]:
+            pass
+        elif __size == 0:
+            __old_level = levels.pop(__key, None)
+            if __old_level is not None:
+                del keys[bisect.bisect_left(keys, __key)]
+                self.__add_to_bucket(__key, -__old_level[2], -1, is_bid)
+                self.__add_to_bands(__key, -__old_level[2], is_bid)
+                result = True
+        else:
+            __old_level = levels.get(__key)
+            if __size < 0:
+                self.__bad_size = True
+            if __old_level is None:
+                bisect.insort(keys, __key)
+                self.__add_to_bucket(__key, __size, 1, is_bid)
+                self.__add_to_bands(__key, __size, is_bid)
+                result = True
+            elif __old_level[1] != size:
+                self.__add_to_bucket(__key, __size - __old_level[2], 0, is_bid)
+                self.__add_to_bands(__key, __size - __old_level[2], is_bid)
+                result = True
+            levels[__key] = [price, size, __size, __price]
+
+        if result:
+            self.__version += 1
+
+            if __is_top:
+                self.__top_version += 1
+
+        return result
+
+    def __get_bucket_key(self, key, is_bid, step):
+        """
+        __get_bucket_key
+        ================
+            This function return the bucket index of a level, bids are rounded down and
+            asks up, bid bucket keys are negated like level keys.
+                :param key: int | float level key.
+                :param is_bid: bool.
+                :param step: float bucket price step.
+                :return int: Return bucket key.
+        """
+        __index = round(self.__get_price(key, is_bid) / step, 9)
+
+        if is_bid:
+            result = -math.floor(__index)
+        else:
+            result = math.ceil(__index)
+
+        return result
+
+    def __build_buckets(self, levels, is_bid, step):
+        """
+        __build_buckets
+        ===============
+            This function sum all levels of a side into buckets.
+                :return tuple: Return (buckets {key: [levels_count, size]}, sorted keys).
+        """
+        __buckets = {}
+
+        if step is not None:
+            for __key, __level in levels.items():
+                __bucket_key = self.__get_bucket_key(__key, is_bid, step)
+                if __bucket_key not in __buckets:
+                    __buckets[__bucket_key] = [0, 0.0]
+                __buckets[__bucket_key][0] += 1
+                __buckets[__bucket_key][1] += __level[2]
+
+        return (__buckets, sorted(__buckets))
+
+    def __add_to_bucket(self, key, size_diff, count_diff, is_bid):
+        """
+        __add_to_bucket
+        ===============
+            This function apply the change of one level to its bucket, buckets without
+            levels are removed.
+        """
+        if self.__bucket_step is not None:
+            __buckets = self.__bids_buckets if is_bid else self.__asks_buckets
+            __bucket_keys = self.__bids_bucket_keys if is_bid else self.__asks_bucket_keys
+            __bucket_key = self.__get_bucket_key(key, is_bid, self.__bucket_step)
+            __bucket = __buckets.get(__bucket_key)
+
+            if __bucket is None:
+                __bucket = [0, 0.0]
+                __buckets[__bucket_key] = __bucket
+                bisect.insort(__bucket_keys, __bucket_key)
+
+            __bucket[0] += count_diff
+            __bucket[1] += size_diff
+
+            if __bucket[0] <= 0:
+                del __buckets[__bucket_key]
+                del __bucket_keys[bisect.bisect_left(__bucket_keys, __bucket_key)]
+
+    def __add_to_bands(self, key, size_diff, is_bid):
+        """
+        __add_to_bands
+        ==============
+            This function apply the size change of one level to the running sums of the
+            depth bands that contain it, with the band edges of the last get_stats().
+        """
+        if self.__band_edges is not None:
+            __sums = self.__bids_band_sums if is_bid else self.__asks_band_sums
+            __side = 0 if is_bid else 1
+
+            for __index, __edges in enumerate(self.__band_edges):
+                if key <= __edges[__side]:
+                    __sums[__index] += size_diff
+
+    def __move_bands(self, mid):
+        """
+        __move_bands
+        ============
+            This function move the depth band edges to a mid price, adding or removing
+            from the running sums only the levels between the old and the new edges (all
+            the levels inside the bands after a snapshot), called with the lock held.
+                :param mid: float.
+        """
+        __band_edges = [(self.__get_key(mid * (1 - __band / 10000), True),\
+                         self.__get_key(mid * (1 + __band / 10000), False))\
+                        for __band in self.__depth_bands_bps]
+
+        for __side, __levels, __keys, __sums in\
+            ((0, self.__bids_levels, self.__bids_keys, self.__bids_band_sums),\
+             (1, self.__asks_levels, self.__asks_keys, self.__asks_band_sums)):
+            for __index, __edges in enumerate(__band_edges):
+                __new_limit = bisect.bisect_right(__keys, __edges[__side])
+                __old_limit = 0
+                __sign = 1
+
+                if self.__band_edges is not None:
+                    __old_limit = bisect.bisect_right(__keys, self.__band_edges[__index][__side])
+                else:
+                    __sums[__index] = 0.0
+
+                if __new_limit < __old_limit:
+                    __new_limit, __old_limit = __old_limit, __new_limit
+                    __sign = -1
+
+                for __key in __keys[__old_limit:__new_limit]:
+                    __sums[__index] += __sign * __levels[__key][2]
+
+        self.__band_edges = __band_edges
+
+    def __get_current_stats(self):
+        """
+        __get_current_stats
+        ===================
+            This function compute the book statistics, called with the lock held.
+                :return dict | None: Return statistics, None if a side is empty.
+        """
+        result = None
+
+        if len(self.__bids_keys) > 0 and len(self.__asks_keys) > 0:
+            __best_bid = self.__get_price(self.__bids_keys[0], True)
+            __best_ask = self.__get_price(self.__asks_keys[0], False)
+            __best_bid_size = self.__bids_levels[self.__bids_keys[0]][2]
+            __best_ask_size = self.__asks_levels[self.__asks_keys[0]][2]
+            __mid = (__best_bid + __best_ask) / 2
+            __top_size = __best_bid_size + __best_ask_size
+
+            result = {}
+            result['best_bid'] = __best_bid
+            result['best_bid_size'] = __best_bid_size
+            result['best_ask'] = __best_ask
+            result['best_ask_size'] = __best_ask_size
+            result['mid'] = __mid
+            result['spread'] = __best_ask - __best_bid
+            result['spread_bps'] = None
+            result['microprice'] = None
+            result['imbalance'] = None
+            result['depth_bps'] = {}
+
+            if __mid > 0:
+                result['spread_bps'] = (__best_ask - __best_bid) / __mid * 10000
+
+            if __top_size > 0:
+                result['microprice'] = (__best_bid * __best_ask_size\
+                                        + __best_ask * __best_bid_size) / __top_size
+                result['imbalance'] = (__best_bid_size - __best_ask_size) / __top_size
+
+            if len(self.__depth_bands_bps) > 0:
+                self.__move_bands(__mid)
+
+            for __index, __band in enumerate(self.__depth_bands_bps):
+                result['depth_bps'][str(__band)] = {'bids': self.__bids_band_sums[__index],\
+                                                    'asks': self.__asks_band_sums[__index]}
+
+        return result
+
+    def __check_integrity(self):
+        """
+        __check_integrity
+        =================
+            This function check the book invariants in O(1), called with the lock held
+            after each change. The two best levels of each side are compared by parsed
+            price, so a level stored under a wrong key is detected when it reaches the top.
+                :return list: Return the violated invariants, empty if the book is consistent.
+        """
+        result = []
+
+        if self.__bad_size:
+            result.append('bad_size')
+            self.__bad_size = False
+
+        for __levels, __keys, __sign in ((self.__bids_levels, self.__bids_keys, -1),\
+                                         (self.__asks_levels, self.__asks_keys, 1)):
+            if len(__keys) > 1 and 'unordered' not in result\
+                and __sign * (__levels[__keys[1]][3] - __levels[__keys[0]][3]) <= 0:
+                result.append('unordered')
+
+        if len(self.__bids_keys) > 0 and len(self.__asks_keys) > 0\
+            and self.__bids_levels[self.__bids_keys[0]][3]\
+                >= self.__asks_levels[self.__asks_keys[0]][3]:
+            result.append('crossed')
+
+        self.__consistent = len(result) == 0
+
+        return result
+
+    def __trim(self, levels, keys):
+        """
+        __trim
+        ======
+            This function remove the levels beyond the retained depth of a side.
+                :return list: Return removed levels as (key, level), empty if none.
+        """
+        result = []
+
+        if self.__max_levels is not None and len(keys) > self.__max_levels:
+            for __key in keys[self.__max_levels:]:
+                result.append((__key, levels.pop(__key)))
+            del keys[self.__max_levels:]
+
+        return result
+
+    def get_tick_size(self):
+        """
+        get_tick_size
+        =============
+            This function return the tick size used for price keys.
+                :return float | None: Return tick size, None if prices are keyed by float.
+        """
+        return self.__tick_size
+
+    def clear(self):
+        """
+        clear
+        =====
+            This function remove all levels from the book.
+        """
+        with self.__lock:
+            self.__bids_levels = {}
+            self.__asks_levels = {}
+            self.__bids_keys = []
+            self.__asks_keys = []
+            self.__bids_truncated = False
+            self.__asks_truncated = False
+            self.__band_edges = None
+            self.__bids_buckets = {}
+            self.__asks_buckets = {}
+            self.__bids_bucket_keys = []
+            self.__asks_bucket_keys = []
+            self.__version += 1
+
+    def set_snapshot(self, bids, asks, truncated=None):
+        """
+        set_snapshot
+        ============
+            This function replace the whole book with a snapshot.
+                :param bids: list of [price, size, ...] (only the first two items are used).
+                :param asks: list of [price, size, ...] (only the first two items are used).
+                :param truncated: tuple | None (bids, asks) sides known to be trimmed, as
+                    returned by get_truncated(), for snapshots of a trimmed book.
+        """
+        __bids_levels = {}
+        __asks_levels = {}
+
+        __bad_size = False
+
+        for __level in bids:
+            __size = float(__level[1])
+            if __size != 0:
+                __price = float(__level[0])
+                __bad_size = __bad_size or __size < 0
+                __bids_levels[self.__get_key(__price, True)] =\
+                    [__level[0], __level[1], __size, __price]
+
+        for __level in asks:
+            __size = float(__level[1])
+            if __size != 0:
+                __price = float(__level[0])
+                __bad_size = __bad_size or __size < 0
+                __asks_levels[self.__get_key(__price, False)] =\
+                    [__level[0], __level[1], __size, __price]
+
+        __bids_keys = sorted(__bids_levels)
+        __asks_keys = sorted(__asks_levels)
+
+        __bids_truncated = len(self.__trim(__bids_levels, __bids_keys)) > 0
+        __asks_truncated = len(self.__trim(__asks_levels, __asks_keys)) > 0
+
+        if truncated is not None:
+            __bids_truncated = __bids_truncated or bool(truncated[0])
+            __asks_truncated = __asks_truncated or bool(truncated[1])
+
+        __bucket_step = self.__bucket_step
+
+        if self.__aggregation is not None and 'bps' in self.__aggregation\
+            and len(__bids_keys) > 0 and len(__asks_keys) > 0:
+            __mid = (self.__get_price(__bids_keys[0], True)\
+                     + self.__get_price(__asks_keys[0], False)) / 2
+            if __mid > 0:
+                __bucket_step = __mid * float(self.__aggregation['bps']) / 10000
+
+        __bids_buckets = self.__build_buckets(__bids_levels, True, __bucket_step)
+        __asks_buckets = self.__build_buckets(__asks_levels, False, __bucket_step)
+
+        with self.__lock:
+            self.__bucket_step = __bucket_step
+            self.__bids_buckets, self.__bids_bucket_keys = __bids_buckets
+            self.__asks_buckets, self.__asks_bucket_keys = __asks_buckets
+            self.__bids_levels = __bids_levels
+            self.__asks_levels = __asks_levels
+            self.__bids_keys = __bids_keys
+            self.__asks_keys = __asks_keys
+            self.__bids_truncated = __bids_truncated
+            self.__asks_truncated = __asks_truncated
+            self.__top_version += 1
+            self.__version += 1
+            self.__band_edges = None
+            self.__bad_size = __bad_size
+            __violations = self.__check_integrity()
+
+        if self.__integrity is not None:
+            self.__integrity.add_snapshot()
+            self.__integrity.add_check(__violations)
+
+        if self.__delta_log is not None:
+            self.__delta_log.add_snapshot(self)
+
+        if self.__recorder is not None:
+            self.__recorder.add_snapshot(self)
+
+        if self.__history is not None:
+            self.__history.add_sample(self)
+
+    def update(self, bids, asks):
+        """
+        update
+        ======
+            This function apply level changes, a size of 0 removes the level.
+                :param bids: list of [price, size, ...] (only the first two items are used).
+                :param asks: list of [price, size, ...] (only the first two items are used).
+                :return tuple: Return (bids, asks) changes really applied as [price, size],
+                    levels removed by max_depth are included with size '0'.
+        """
+        __bids_changes = []
+        __asks_changes = []
+
+        with self.__lock:
+            for __level in bids:
+                if self.__set_level(self.__bids_levels, self.__bids_keys,\
+                                    __level[0], __level[1], True, self.__bids_truncated):
+                    __bids_changes.append([__level[0], __level[1]])
+
+            for __level in asks:
+                if self.__set_level(self.__asks_levels, self.__asks_keys,\
+                                    __level[0], __level[1], False, self.__asks_truncated):
+                    __asks_changes.append([__level[0], __level[1]])
+
+            for __key, __level in self.__trim(self.__bids_levels, self.__bids_keys):
+                self.__version += 1
+                self.__bids_truncated = True
+                self.__add_to_bucket(__key, -__level[2], -1, True)
+                self.__add_to_bands(__key, -__level[2], True)
+                __bids_changes.append([__level[0], '0'])
+
+            for __key, __level in self.__trim(self.__asks_levels, self.__asks_keys):
+                self.__version += 1
+                self.__asks_truncated = True
+                self.__add_to_bucket(__key, -__level[2], -1, False)
+                self.__add_to_bands(__key, -__level[2], False)
+                __asks_changes.append([__level[0], '0'])
+
+            __violations = self.__check_integrity()
+
+        if self.__integrity is not None:
+            self.__integrity.add_check(__violations)
+
+        if self.__delta_log is not None:
+            self.__delta_log.add_delta(self, __bids_changes, __asks_changes)
+
+        if self.__recorder is not None:
+            self.__recorder.add_diff(self, bids, asks)
+
+        if self.__history is not None:
+            self.__history.add_sample(self)
+
+        return (__bids_changes, __asks_changes)
+
+    def replace(self, bids, asks):
+        """
+        replace
+        =======
+            This function replace the book with a new snapshot applying only the
+            differences with the current levels, used by exchanges that only send
+            snapshots so changes are recorded like diffs. For the integrity counters it
+            is a new snapshot.
+                :param bids: list of [price, size, ...] (only the first two items are used).
+                :param asks: list of [price, size, ...] (only the first two items are used).
+                :return tuple: Return (bids, asks) changes really applied as [price, size].
+        """
+        __changes = []
+
+        if self.__integrity is not None:
+            self.__integrity.add_snapshot()
+
+        with self.__lock:
+            # A snapshot has every level, so none is beyond the retained range
+            self.__bids_truncated = False
+            self.__asks_truncated = False
+
+            for __levels, __new_levels, __is_bid in ((self.__bids_levels, bids, True),\
+                                                      (self.__asks_levels, asks, False)):
+                __new_keys = set()
+                __side_changes = []
+
+                for __level in __new_levels:
+                    __new_keys.add(self.__get_key(__level[0], __is_bid))
+                    __side_changes.append([__level[0], __level[1]])
+
+                for __key, __level in __levels.items():
+                    if __key not in __new_keys:
+                        __side_changes.append([__level[0], '0'])
+
+                __changes.append(__side_changes)
+
+        return self.update(__changes[0], __changes[1])
+
+    def is_depth_exhausted(self):
+        """
+        is_depth_exhausted
+        ==================
+            This function check if a trimmed side has less than max_depth levels, then
+            the levels beyond the retained range are unknown and the book needs a resync.
+                :return bool: Return True if the book must be resynced.
+        """
+        result = False
+
+        with self.__lock:
+            if self.__max_depth is not None:
+                result = (self.__bids_truncated and len(self.__bids_keys) < self.__max_depth)\
+                    or (self.__asks_truncated and len(self.__asks_keys) < self.__max_depth)
+
+        return result
+
+    def get_truncated(self):
+        """
+        get_truncated
+        =============
+            This function return which sides were trimmed by max_depth, their levels
+            beyond the worst retained one are unknown.
+                :return tuple: Return (bids_truncated, asks_truncated).
+        """
+        result = None
+
+        with self.__lock:
+            result = (self.__bids_truncated, self.__asks_truncated)
+
+        return result
+
+    def is_consistent(self):
+        """
+        is_consistent
+        =============
+            This function return the result of the last invariant check.
+                :return bool: Return True if no invariant was violated by the last change.
+        """
+        result = True
+
+        with self.__lock:
+            result = self.__consistent
+
+        return result
+
+    def get_bids(self, depth=None):
+        """
+        get_bids
+        ========
+            This function return best bids first.
+                :param depth: int | None (None for all levels).
+                :return list: Return list of [price, size].
+        """
+        result = None
+
+        with self.__lock:
+            result = [self.__bids_levels[__key][:2] for __key in self.__bids_keys[:depth]]
+
+        return result
+
+    def get_asks(self, depth=None):
+        """
+        get_asks
+        ========
+            This function return best asks first.
+                :param depth: int | None (None for all levels).
+                :return list: Return list of [price, size].
+        """
+        result = None
+
+        with self.__lock:
+            result = [self.__asks_levels[__key][:2] for __key in self.__asks_keys[:depth]]
+
+        return result
+
+    def get_values(self, depth=None):
+        """
+        get_values
+        ==========
+            This function return the parsed prices and sizes, best first.
+                :param depth: int | None (None for all levels).
+                :return tuple: Return (bids, asks) lists of (price, size) floats.
+        """
+        result = None
+
+        with self.__lock:
+            result = ([(self.__bids_levels[__key][3], self.__bids_levels[__key][2])\
+                       for __key in self.__bids_keys[:depth]],\
+                      [(self.__asks_levels[__key][3], self.__asks_levels[__key][2])\
+                       for __key in self.__asks_keys[:depth]])
+
+        return result
+
+    def get_arrays(self, depth=None):
+        """
+        get_arrays
+        ==========
+            This function return the levels as numpy float64 arrays, best first. The
+            arrays are read-only and shared by all reads of the same book version.
+                :param depth: int | None (None for all levels).
+                :return dict | None: Return {'bids': (prices, sizes), 'asks': (prices, sizes)},
+                    None if numpy is not installed.
+        """
+        result = None
+
+        if numpy is not None:
+            with self.__lock:
+                if self.__arrays_version != self.__version:
+                    __arrays = {}
+
+                    for __side, __levels, __keys in (('bids', self.__bids_levels, self.__bids_keys),\
+                                                     ('asks', self.__asks_levels, self.__asks_keys)):
+                        __prices = numpy.fromiter((__levels[__key][3] for __key in __keys),\
+                                                  dtype=numpy.float64, count=len(__keys))
+                        __sizes = numpy.fromiter((__levels[__key][2] for __key in __keys),\
+                                                 dtype=numpy.float64, count=len(__keys))
+                        __prices.flags.writeable = False
+                        __sizes.flags.writeable = False
+                        __arrays[__side] = (__prices, __sizes)
+
+                    self.__arrays = __arrays
+                    self.__arrays_version = self.__version
+
+                __arrays = self.__arrays
+
+            result = {}
+            result['bids'] = (__arrays['bids'][0][:depth], __arrays['bids'][1][:depth])
+            result['asks'] = (__arrays['asks'][0][:depth], __arrays['asks'][1][:depth])
+
+        return result
+
+    def get_top_version(self):
+        """
+        get_top_version
+        ===============
+            This function return a counter increased by each snapshot and each level change
+            inside the best notify_depth levels (any change without notify_depth).
+                :return int: Return version.
+        """
+        result = 0
+
+        with self.__lock:
+            result = self.__top_version
+
+        return result
+
+    def get_aggregation_step(self):
+        """
+        get_aggregation_step
+        ====================
+            This function return the price step of the aggregated view.
+                :return float | None: Return step, None without aggregation or snapshot.
+        """
+        result = None
+
+        with self.__lock:
+            result = self.__bucket_step
+
+        return result
+
+    def get_aggregated_bids(self, depth=None):
+        """
+        get_aggregated_bids
+        ===================
+            This function return the bid buckets, best first.
+                :param depth: int | None (None for all buckets).
+                :return list: Return list of [bucket_price, size], empty without aggregation.
+        """
+        result = []
+
+        with self.__lock:
+            if self.__bucket_step is not None:
+                result = [[round(-__key * self.__bucket_step, 12), self.__bids_buckets[__key][1]]\
+                          for __key in self.__bids_bucket_keys[:depth]]
+
+        return result
+
+    def get_aggregated_asks(self, depth=None):
+        """
+        get_aggregated_asks
+        ===================
+            This function return the ask buckets, best first.
+                :param depth: int | None (None for all buckets).
+                :return list: Return list of [bucket_price, size], empty without aggregation.
+        """
+        result = []
+
+        with self.__lock:
+            if self.__bucket_step is not None:
+                result = [[round(__key * self.__bucket_step, 12), self.__asks_buckets[__key][1]]\
+                          for __key in self.__asks_bucket_keys[:depth]]
+
+        return result
+
+    def get_stats(self):
+        """
+        get_stats
+        =========
+            This function return the statistics of the book, computed once per book
+            version.
+                :return dict | None: Return dict with best_bid, best_bid_size, best_ask,
+                    best_ask_size, mid, spread, spread_bps, microprice, imbalance and
+                    depth_bps {band: {'bids': size, 'asks': size}}, None if a side is empty.
+        """
+        result = None
+
+        with self.__lock:
+            if self.__stats_version != self.__version:
+                self.__stats = self.__get_current_stats()
+                self.__stats_version = self.__version
+
+            if self.__stats is not None:
+                result = dict(self.__stats)
+                result['depth_bps'] = {__band: dict(__depth) for __band, __depth\
+                                       in self.__stats['depth_bps'].items()}
+
+        return result
+
+    def get_len(self):
+        """
+        get_len
+        =======
+            This function return the number of levels on each side.
+                :return tuple: Return (bids_len, asks_len).
+        """
+        result = None
+
+        with self.__lock:
+            result = (len(self.__bids_keys), len(self.__asks_keys))
+
+        return result
+
+class OrderBookDeltaLog():
+    """
+    OrderBookDeltaLog - Sequenced order book changes
+    ================================================
+        This class keeps the last snapshots and level changes of a local order book,
+        each one with a sequence number, so consumers that maintain their own book only
+        move the changed levels. A full snapshot is recorded each snapshot_interval
+        deltas for recovery. The log is kept by the stream, so sequence numbers continue
+        when the book is rebuilt after a resync.
+
+        Example:
+
+            delta_log = OrderBookDeltaLog()
+            book = OrderBook('0.01', delta_log=delta_log)
+            entries = delta_log.get_entries(from_sequence)
+    """
+
+    def __init__(self, max_len=1000, snapshot_interval=100):
+        """
+        OrderBookDeltaLog constructor
+        =============================
+            Initializes an empty log.
+                :param max_len: int entries kept.
+                :param snapshot_interval: int deltas between full snapshots.
+        """
+        self.__lock = Lock()
+        self.__entries = collections.deque(maxlen=max(int(max_len), 1))
+        self.__snapshot_interval = max(int(snapshot_interval), 1)
+        self.__sequence = 0
+        self.__deltas_since_snapshot = 0
+
+    def __add_entry(self, entry_type, bids, asks):
+        """
+        __add_entry
+        ===========
+            This function append one entry, called with the lock held.
+                :return dict: Return the new entry.
+        """
+        self.__sequence += 1
+
+        result = {}
+        result['sequence'] = self.__sequence
+        result['type'] = entry_type
+        result['bids'] = bids
+        result['asks'] = asks
+
+        self.__entries.append(result)
+
+        return result
+
+    def add_snapshot(self, book):
+        """
+        add_snapshot
+        ============
+            This function record the full book.
+                :param book: OrderBook.
+                :return dict: Return the new entry.
+        """
+        __bids = book.get_bids()
+        __asks = book.get_asks()
+
+        with self.__lock:
+            self.__deltas_since_snapshot = 0
+            result = self.__add_entry('snapshot', __bids, __asks)
+
+        return result
+
+    def add_delta(self, book, bids, asks):
+        """
+        add_delta
+        =========
+            This function record the level changes of one update, followed by a full
+            snapshot when snapshot_interval deltas were recorded.
+                :param book: OrderBook.
+                :param bids: list of [price, size] changed bids, size '0' for removed levels.
+                :param asks: list of [price, size] changed asks, size '0' for removed levels.
+                :return dict | None: Return the last entry, None if there were no changes.
+        """
+        result = None
+
+        if len(bids) > 0 or len(asks) > 0:
+            with self.__lock:
+                result = self.__add_entry('delta', bids, asks)
+                self.__deltas_since_snapshot += 1
+                __add_snapshot = self.__deltas_since_snapshot >= self.__snapshot_interval
+
+            if __add_snapshot:
+                result = self.add_snapshot(book)
+
+        return result
+
+    def get_sequence(self):
+        """
+        get_sequence
+        ============
+            This function return the last sequence number.
+                :return int: Return sequence, 0 if empty.
+        """
+        result = 0
+
+        with self.__lock:
+            result = self.__sequence
+
+        return result
+
+    def get_last_entry(self):
+        """
+        get_last_entry
+        ==============
+            This function return the last recorded entry.
+                :return dict | None: Return entry.
+        """
+        result = None
+
+        with self.__lock:
+            if len(self.__entries) > 0:
+                result = dict(self.__entries[-1])
+
+        return result
+
+    def get_entries(self, from_sequence=0):
+        """
+        get_entries
+        ===========
+            This function return the entries after a sequence number. If some entry after
+            from_sequence was already discarded, the entries start at the last snapshot.
+                :param from_sequence: int last sequence already applied by the consumer.
+                :return list: Return list of dict {sequence, type ('snapshot' | 'delta'),
+                    bids, asks}.
+        """
+        result = []
+
+        with self.__lock:
+            __entries = list(self.__entries)
+
+        if len(__entries) > 0 and from_sequence < __entries[0]['sequence'] - 1:
+            __start = 0
+            for __index, __entry in enumerate(__entries):
+                if __entry['type'] == 'snapshot':
+                    __start = __index
+            __entries = __entries[__start:]
+        else:
+            __entries = [__entry for __entry in __entries if __entry['sequence'] > from_sequence]
+
+        result = [dict(__entry) for __entry in __entries]
+
+        return result
+
+class OrderBookHistory():
+    """
+    OrderBookHistory - Sampled best levels ring
+    ===========================================
+        This class keeps the last max_len samples of the best depth levels of a local
+        order book, taken by the book after its changes and at most once per
+        interval_ms. While the book does not change no sample is taken, the book is the
+        last sample. Each sample is one array('d'):
+
+            [timestamp, bid_price_1, bid_size_1, ..., ask_price_1, ask_size_1, ...]
+
+        with NaN for missing levels, so samples are compact and fixed size. The history
+        is kept by the stream, so it continues when the book is rebuilt after a resync.
+
+        Example:
+
+            history = OrderBookHistory(interval_ms=100, depth=10, max_len=3000)
+            book = OrderBook('0.01', history=history)
+            samples = history.get_samples(time.time() - 60)
+    """
+
+    def __init__(self, interval_ms=100, depth=10, max_len=3000):
+        """
+        OrderBookHistory constructor
+        ============================
+            Initializes an empty history.
+                :param interval_ms: int | float min time between samples.
+                :param depth: int levels sampled on each side.
+                :param max_len: int samples kept.
+        """
+        self.__lock = Lock()
+        self.__interval = max(float(interval_ms), 0) / 1000
+        self.__depth = max(int(depth), 1)
+        self.__samples = collections.deque(maxlen=max(int(max_len), 1))
+        self.__last_sample_time = None
+
+    def get_depth(self):
+        """
+        get_depth
+        =========
+            This function return the levels sampled on each side.
+                :return int: Return depth.
+        """
+        return self.__depth
+
+    def add_sample(self, book):
+        """
+        add_sample
+        ==========
+            This function sample the best levels of a book if interval_ms elapsed since
+            the last sample.
+                :param book: OrderBook.
+                :return bool: Return True if a sample was added.
+        """
+        result = False
+
+        __now = time.time()
+
+        with self.__lock:
+            if self.__last_sample_time is None\
+                or __now - self.__last_sample_time >= self.__interval:
+                self.__last_sample_time = __now
+                result = True
+
+        if result:
+            __bids, __asks = book.get_values(self.__depth)
+            __sample = array.array('d', [__now])
+
+            for __levels in (__bids, __asks):
+                for __level in __levels:
+                    __sample.extend(__level)
+                __sample.extend([math.nan] * (2 * (self.__depth - len(__levels))))
+
+            with self.__lock:
+                self.__samples.append(__sample)
+
+        return result
+
+    def get_samples(self, start_time=None, end_time=None):
+        """
+        get_samples
+        ===========
+            This function return the samples taken between start_time and end_time.
+                :param start_time: float | None unix time, None from the first sample.
+                :param end_time: float | None unix time, None up to the last sample.
+                :return list: Return list of dict {timestamp, bids, asks} oldest first,
+                    levels as [price, size] floats.
+        """
+        result = []
+
+        with self.__lock:
+            __samples = list(self.__samples)
+
+        for __sample in reversed(__samples):
+            if start_time is not None and __sample[0] < start_time:
+                break
+
+            if end_time is None or __sample[0] <= end_time:
+                __data = {}
+                __data['timestamp'] = __sample[0]
+                __data['bids'] = []
+                __data['asks'] = []
+
+                for __index in range(0, 2 * self.__depth):
+                    __side = 'bids' if __index < self.__depth else 'asks'
+                    __price = __sample[1 + 2 * __index]
+                    if not math.isnan(__price):
+                        __data[__side].append([__price, __sample[2 + 2 * __index]])
+
+                result.append(__data)
+
+        result.reverse()
+
+        return result
+
+class OrderBookIntegrity():
+    """
+    OrderBookIntegrity - Order book invariant counters
+    ==================================================
+        This class counts the invariant checks of a local order book and their
+        violations: 'crossed' (best bid not below best ask), 'unordered' (best levels
+        out of price order), 'bad_size' (negative size) and, with max_snapshot_age,
+        'stale_snapshot' (counted once per snapshot older than max_snapshot_age
+        seconds). It is kept by the stream, so counters continue when the book is
+        rebuilt after a resync.
+
+        Example:
+
+            integrity = OrderBookIntegrity(max_snapshot_age=3600)
+            book = OrderBook('0.01', integrity=integrity)
+            counters = integrity.get_counters()
+    """
+
+    def __init__(self, max_snapshot_age=None):
+        """
+        OrderBookIntegrity constructor
+        ==============================
+            Initializes the counters.
+                :param max_snapshot_age: int | float | None seconds, None without age limit.
+        """
+        self.__lock = Lock()
+        self.__max_snapshot_age = None
+
+        if max_snapshot_age is not None and float(max_snapshot_age) > 0:
+            self.__max_snapshot_age = float(max_snapshot_age)
+
+        self.__counters = {
+            'checks': 0,
+            'crossed': 0,
+            'unordered': 0,
+            'bad_size': 0,
+            'stale_snapshot': 0
+        }
+        self.__consistent = True
+        self.__snapshot_time = None
+        self.__snapshot_stale = False
+
+    def add_snapshot(self):
+        """
+        add_snapshot
+        ============
+            This function restart the snapshot age.
+        """
+        with self.__lock:
+            self.__snapshot_time = time.time()
+            self.__snapshot_stale = False
+
+    def add_check(self, violations):
+        """
+        add_check
+        =========
+            This function record the result of one book check and the snapshot age.
+                :param violations: list of str violated invariants, empty if consistent.
+                :return bool: Return True if the book is consistent and its snapshot is not
+                    stale.
+        """
+        __now = time.time()
+
+        with self.__lock:
+            self.__counters['checks'] += 1
+
+            for __violation in violations:
+                self.__counters[__violation] += 1
+
+            self.__consistent = len(violations) == 0
+
+            if self.__max_snapshot_age is not None and self.__snapshot_time is not None\
+                and not self.__snapshot_stale\
+                and __now - self.__snapshot_time > self.__max_snapshot_age:
+                self.__snapshot_stale = True
+                self.__counters['stale_snapshot'] += 1
+
+            result = self.__consistent and not self.__snapshot_stale
+
+        return result
+
+    def is_snapshot_stale(self):
+        """
+        is_snapshot_stale
+        =================
+            This function return if the snapshot was older than max_snapshot_age on the
+            last check.
+                :return bool: Return True if the snapshot is stale.
+        """
+        result = False
+
+        with self.__lock:
+            result = self.__snapshot_stale
+
+        return result
+
+    def get_counters(self):
+        """
+        get_counters
+        ============
+            This function return the counters.
+                :return dict: Return dict with checks, crossed, unordered, bad_size,
+                    stale_snapshot, consistent (last check) and snapshot_age (seconds,
+                    None before the first snapshot).
+        """
+        result = None
+
+        with self.__lock:
+            result = dict(self.__counters)
+            result['consistent'] = self.__consistent
+            result['snapshot_age'] = None
+
+            if self.__snapshot_time is not None:
+                result['snapshot_age'] = time.time() - self.__snapshot_time
+
+        return result
+
+class OrderBookRecorder():
+    """
+    OrderBookRecorder - Recorded order book diffs with checkpoints
+    ==============================================================
+        This class writes the diffs applied to a local order book to a file, one JSON
+        record per line {'timestamp', 'type' ('checkpoint' | 'diff'), 'bids', 'asks'},
+        with a full book checkpoint on each snapshot and at least every
+        checkpoint_interval seconds, checkpoints also keep the trimmed sides of a book
+        with max_depth in 'truncated'. Each checkpoint is also written to the index file
+        (path + '.idx') as {'timestamp', 'offset'}, the byte offset of its record.
+
+        OrderBookRecorder.get_book_at() rebuilds the book as of a past timestamp: it
+        seeks to the last checkpoint before it and replays the following diffs with the
+        same OrderBook engine, so a query costs the diffs since one checkpoint, not the
+        whole file. Files are buffered and flushed on each checkpoint and on close().
+
+        Example:
+
+            recorder = OrderBookRecorder('/data/btc_usdt.book', checkpoint_interval=60)
+            book = OrderBook('0.01', recorder=recorder)
+            past_book = OrderBookRecorder.get_book_at('/data/btc_usdt.book', timestamp)
+    """
+
+    def __init__(self, path, checkpoint_interval=60):
+        """
+        OrderBookRecorder constructor
+        =============================
+            Initializes the recorder, the files are opened in append mode on the first
+            record.
+                :param path: str file of the records, the index is path + '.idx'.
+                :param checkpoint_interval: int | float max seconds between checkpoints.
+        """
+        self.__lock = Lock()
+        self.__path = path
+        self.__checkpoint_interval = max(float(checkpoint_interval), 0)
+        self.__file = None
+        self.__index_file = None
+        self.__checkpoint_time = None
+
+    def __write(self, record_type, bids, asks, truncated=None):
+        """
+        __write
+        =======
+            This function write one record and, for checkpoints, its index entry, called
+            with the lock held.
+                :param record_type: str 'checkpoint' | 'diff'.
+                :param bids: list of [price, size].
+                :param asks: list of [price, size].
+                :param truncated: tuple | None (bids, asks) trimmed sides of a checkpoint.
+        """
+        if self.__file is None:
+            self.__file = open(self.__path, 'ab') # pylint: disable=consider-using-with
+            self.__index_file = open(self.__path + '.idx', 'ab') # pylint: disable=consider-using-with
+
+        __timestamp = time.time()
+        __offset = self.__file.tell()
+        __record = {'timestamp': __timestamp, 'type': record_type, 'bids': bids, 'asks': asks}
+
+        if truncated is not None:
+            __record['truncated'] = list(truncated)
+
+        self.__file.write(json.dumps(__record, separators=(',', ':')).encode('utf-8') + b'\n')
+
+        if record_type == 'checkpoint':
+            self.__checkpoint_time = __timestamp
+            __index = {'timestamp': __timestamp, 'offset': __offset}
+            self.__index_file.write(json.dumps(__index).encode('utf-8') + b'\n')
+            self.__file.flush()
+            self.__index_file.flush()
+
+    def add_snapshot(self, book):
+        """
+        add_snapshot
+        ============
+            This function record a checkpoint with the full book.
+                :param book: OrderBook.
+        """
+        __bids = book.get_bids()
+        __asks = book.get_asks()
+        __truncated = book.get_truncated()
+
+        with self.__lock:
+            self.__write('checkpoint', __bids, __asks, __truncated)
+
+    def add_diff(self, book, bids, asks):
+        """
+        add_diff
+        ========
+            This function record the levels of one update as received, followed by a
+            checkpoint when the last one is older than checkpoint_interval.
+                :param book: OrderBook.
+                :param bids: list of [price, size, ...] (only the first two items are used).
+                :param asks: list of [price, size, ...] (only the first two items are used).
+        """
+        with self.__lock:
+            self.__write('diff', [[__level[0], __level[1]] for __level in bids],\
+                         [[__level[0], __level[1]] for __level in asks])
+            __add_checkpoint = self.__checkpoint_time is None\
+                or time.time() - self.__checkpoint_time >= self.__checkpoint_interval
+
+        if __add_checkpoint:
+            self.add_snapshot(book)
+
+    def close(self):
+        """
+        close
+        =====
+            This function flush and close the files, the next record opens them again.
+        """
+        with self.__lock:
+            for __file in (self.__file, self.__index_file):
+                if __file is not None:
+                    __file.close()
+
+            self.__file = None
+            self.__index_file = None
+
+    @classmethod
+    def get_checkpoint_offset(cls, path, timestamp):
+        """
+        get_checkpoint_offset
+        =====================
+            This function return the offset of the last checkpoint recorded at or before
+            timestamp, from the index file.
+                :param path: str file of the records.
+                :param timestamp: float unix time.
+                :return int | None: Return the byte offset, None if there is no checkpoint.
+        """
+        result = None
+
+        __timestamps = []
+        __offsets = []
+
+        if os.path.exists(path + '.idx'):
+            with open(path + '.idx', 'rb') as __index_file:
+                for __line in __index_file:
+                    if __line.endswith(b'\n'):
+                        __index = json.loads(__line)
+                        __timestamps.append(__index['timestamp'])
+                        __offsets.append(__index['offset'])
+
+        __position = bisect.bisect_right(__timestamps, timestamp)
+
+        if __position > 0:
+            result = __offsets[__position - 1]
+
+        return result
+
+    @classmethod
+    def get_book_at(cls, path, timestamp, tick_size=None, max_depth=None):
+        """
+        get_book_at
+        ===========
+            This function rebuild the book as of timestamp from the recorded files.
+                :param path: str file of the records.
+                :param timestamp: float unix time.
+                :param tick_size: str | float | None price tick size of the symbol.
+                :param max_depth: int | None levels kept on each side, as the recorded book.
+                :return OrderBook | None: Return the book, None if there is no checkpoint
+                    before timestamp.
+        """
+        result = None
+
+        __offset = cls.get_checkpoint_offset(path, timestamp)
+
+        if __offset is not None:
+            result = OrderBook(tick_size, max_depth)
+
+            with open(path, 'rb') as __file:
+                __file.seek(__offset)
+
+                for __line in __file:
+                    if not __line.endswith(b'\n'):
+                        break
+
+                    __record = json.loads(__line)
+
+                    if __record['timestamp'] > timestamp:
+                        break
+
+                    if __record['type'] == 'checkpoint':
+                        result.set_snapshot(__record['bids'], __record['asks'],\
+                                            __record.get('truncated'))
+                    else:
+                        result.update(__record['bids'], __record['asks'])
+
+        return result
@@ -86,6 +86,9 @@ def main(argv): # pylint: disable=unused-argument
                 print(__to_prt)
             time.sleep(1)
 
+        __to_prt = f'{__exchange}: INTEGRITY: {__ccxw_inst.get_order_book_integrity(__symbol)}'
+        print(__to_prt)
+
         __ccxw_inst.stop()
         __to_prt = f'{__exchange}: ERRORS: {__count_errors[__exchange]}'
         print(__to_prt)
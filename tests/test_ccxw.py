@@ -328,6 +328,45 @@ class TestCcxw(unittest.TestCase):
 
         return result
 
+    def __check_data_structure_bbo(self, data):
+
+        result = False
+
+        schema = Schema({'data': Or(And(dict, len), None),
+                         'min_proc_time_ms': float,
+                         'max_proc_time_ms': float
+                        }
+        )
+
+        schema_data = Schema({'endpoint': str,
+                              'exchange': str,
+                              'symbol': str,
+                              'interval': Or(str, None),
+                              'update_id': Or(int, None),
+                              'event_time': int,
+                              'event_time_date': str,
+                              'best_bid_price': Or(str, None),
+                              'best_bid_quantity': Or(str, None),
+                              'best_ask_price': Or(str, None),
+                              'best_ask_quantity': Or(str, None)
+                            }
+                        )
+
+        if data is not None and schema.is_valid(data)\
+             and data['data'] is not None and schema_data.is_valid(data['data']):
+
+            result = all(
+                data['data'][key] is None or self.__is_numeric_string(data['data'][key])
+                for key in [
+                    'best_bid_price',
+                    'best_bid_quantity',
+                    'best_ask_price',
+                    'best_ask_quantity',
+                ]
+            )
+
+        return result
+
     def __check_data_structure_local(self, endpoint, data):
         result = False
 
@@ -339,6 +378,8 @@ class TestCcxw(unittest.TestCase):
             result = self.__check_data_structure_trades(data)
         elif endpoint == 'ticker':
             result = self.__check_data_structure_ticker(data)
+        elif endpoint == 'bbo':
+            result = self.__check_data_structure_bbo(data)
 
         return result
 
@@ -0,0 +1,87 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+consolidated book tests cases.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_consolidated.py
+"""
+import unittest
+
+from ccxw.consolidated import ConsolidatedBook
+
+class TestConsolidatedBook(unittest.TestCase):
+    """
+    TestConsolidatedBook - Auxiliary class for testing ConsolidatedBook
+    ===================================================================
+        This class contains helper functions for testing the ConsolidatedBook class.
+    """
+
+    def setUp(self):
+        self.__book = ConsolidatedBook(depth=2)
+        self.__book.update('binance', [['100.1', '2'], ['100', '1'], ['99', '9']],\
+                           [['100.3', '1'], ['100.4', '2']])
+        self.__book.update('okx', [['100.2', '1'], ['99.9', '3']], [['100.5', '4']])
+
+    def test_best_bid_ask(self):
+        """
+        test_best_bid_ask
+        =================
+            The best bid and ask come from the exchange with the best price.
+        """
+        __best = self.__book.get_best_bid_ask()
+        self.assertEqual((__best['best_bid'], __best['best_bid_size']), (100.2, 1.0))
+        self.assertEqual(__best['best_bid_exchange'], 'okx')
+        self.assertEqual((__best['best_ask'], __best['best_ask_exchange']), (100.3, 'binance'))
+        self.assertAlmostEqual(__best['spread'], 0.1)
+
+    def test_update(self):
+        """
+        test_update
+        ===========
+            Top changes move the best across exchanges, unchanged tops are ignored.
+        """
+        __version = self.__book.get_version()
+        self.assertFalse(self.__book.update('okx', [['100.2', '1'], ['99.9', '3']],\
+                                            [['100.5', '4']]))
+        self.assertEqual(self.__book.get_version(), __version)
+
+        self.__book.update('okx', [['100.0', '1']], [['100.25', '1']])
+        __best = self.__book.get_best_bid_ask()
+        self.assertEqual((__best['best_bid'], __best['best_bid_exchange']), (100.1, 'binance'))
+        self.assertEqual((__best['best_ask'], __best['best_ask_exchange']), (100.25, 'okx'))
+
+        for __price in range(0, 50):
+            self.__book.update('okx', [[str(90 + __price / 10), '1']], [['101', '1']])
+
+        __best = self.__book.get_best_bid_ask()
+        self.assertEqual(__best['best_bid_exchange'], 'binance')
+        self.assertEqual(__best['best_ask_exchange'], 'binance')
+
+        self.__book.remove('binance')
+        __best = self.__book.get_best_bid_ask()
+        self.assertEqual((__best['best_bid'], __best['best_ask']), (94.9, 101.0))
+        self.assertEqual(self.__book.get_exchanges(), ['okx'])
+
+        self.__book.update('okx', [], [['0', '0']])
+        self.assertIsNone(self.__book.get_best_bid_ask())
+
+    def test_ladder(self):
+        """
+        test_ladder
+        ===========
+            The ladder merges the kept levels of each exchange best first.
+        """
+        self.assertEqual(self.__book.get_ladder(),\
+                         {'bids': [[100.2, 1.0, 'okx'], [100.1, 2.0, 'binance'],\
+                                   [100.0, 1.0, 'binance'], [99.9, 3.0, 'okx']],\
+                          'asks': [[100.3, 1.0, 'binance'], [100.4, 2.0, 'binance'],\
+                                   [100.5, 4.0, 'okx']]})
+        self.assertEqual(self.__book.get_ladder(1)['asks'], [[100.3, 1.0, 'binance']])
+
+        self.__book.update('binance', [], [['100.2', '1']])
+        self.assertEqual(self.__book.get_ladder(2)['bids'], [[100.2, 1.0, 'okx'], [99.9, 3.0, 'okx']])
+        self.assertEqual(self.__book.get_ladder(1)['asks'], [[100.2, 1.0, 'binance']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,343 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+exchange classes tests cases, with stubbed exchange info.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_exchanges.py
+"""
+import json
+import unittest
+from unittest import mock
+
+import ccxw.ccxw_common_functions as ccf
+from ccxw.ccxw import CcxwExchangeConfig
+from ccxw.binance import BinanceCcxwAuxClass
+from ccxw.bingx import BingxCcxwAuxClass
+from ccxw.bybit import BybitCcxwAuxClass
+from ccxw.kucoin import KucoinCcxwAuxClass
+from ccxw.okx import OkxCcxwAuxClass
+
+BINANCE_EXCHANGE_INFO = {'symbols': [{'symbol': 'BTCUSDT', 'baseAsset': 'BTC',\
+                                      'quoteAsset': 'USDT', 'status': 'TRADING',\
+                                      'filters': [{'filterType': 'PRICE_FILTER',\
+                                                   'tickSize': '0.01'}]}]}
+
+class TestStreamRouting(unittest.TestCase):
+    """
+    TestStreamRouting - Auxiliary class for testing the stream routing tables
+    =========================================================================
+        This class contains helper functions for testing the memoized stream index and
+        the interval translation tables.
+    """
+
+    native_intervals = {
+        'binance': {'1m': '1m', '1h': '1h', '1d': '1d', '1w': '1w', '1mo': '1mo'},
+        'binanceus': {'1m': '1m', '1h': '1h', '1d': '1d', '1w': '1w', '1mo': '1mo'},
+        'bybit': {'1m': '1', '1h': '60', '12h': '720', '1d': 'D', '1w': 'W', '1mo': 'M'},
+        'bingx': {'1m': '1min', '1h': '60min', '2h': '2hour', '1d': '1day', '1w': '1week',\
+                  '1mo': '1mon'},
+        'kucoin': {'1m': '1min', '1h': '1hour', '1d': '1day', '1w': '1week'},
+        'okx': {'1m': '1m', '1h': '1Hutc', '1d': '1Dutc', '1w': '1Wutc', '1mo': '1Mutc'}
+    }
+
+    def setUp(self):
+        __patcher = mock.patch.object(BinanceCcxwAuxClass, 'get_exchange_info',\
+                                      lambda *_: BINANCE_EXCHANGE_INFO)
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+    def test_stream_index(self):
+        """
+        test_stream_index
+        =================
+            The native forms of the streams are routed without symbol lookups.
+        """
+        __binance = BinanceCcxwAuxClass([{'endpoint': 'kline', 'symbol': 'BTC/USDT',\
+                                          'interval': '1m'}])
+        __binance.get_websocket_endpoint_path()
+        __stream_index = __binance.get_stream_index('kline', 'BTC/USDT', '1m')
+        self.assertEqual(__stream_index, 'stream_kline_btcusdt_1m')
+
+        with mock.patch.object(BinanceCcxwAuxClass, 'get_exchange_full_list_symbols',\
+                               side_effect=AssertionError('Symbol lookup')):
+            self.assertEqual(__binance.get_stream_index('kline', 'BTCUSDT', '1m'),\
+                             __stream_index)
+            self.assertEqual(__binance.get_stream_index('kline', 'BTC/USDT', '1m'),\
+                             __stream_index)
+            self.assertEqual(__binance.get_unified_symbol_from_symbol('BTCUSDT'), 'BTC/USDT')
+
+    def test_intervals(self):
+        """
+        test_intervals
+        ==============
+            Every supported interval translates to its native form and back.
+        """
+        for __exchange, __aux_class in CcxwExchangeConfig.exchange_classes.items():
+            __aux = __aux_class(streams=None)
+            __to_native = getattr(__aux, '_' + __aux_class.__name__\
+                                  + '__get_interval_from_unified_interval',\
+                                  lambda interval: interval)
+
+            for __interval in __aux.get_supported_intervals():
+                __native = __to_native(__interval)
+                self.assertEqual(__aux.get_unified_interval_from_interval(__native),\
+                                 __interval, __exchange)
+
+            for __interval, __native in self.native_intervals[__exchange].items():
+                self.assertEqual(__to_native(__interval), __native, __exchange)
+
+class TestOrderBookChannels(unittest.TestCase):
+    """
+    TestOrderBookChannels - Auxiliary class for testing the order book channel tiers
+    ================================================================================
+        This class contains helper functions for testing the native channel of each
+        depth and update_speed of an order_book stream.
+    """
+
+    depths = (None, 5, 20, 50, 'full')
+
+    channels = {
+        BinanceCcxwAuxClass: ('__get_order_book_channel',\
+                              ('@depth@100ms', '@depth5@100ms', '@depth20@100ms',\
+                               '@depth@100ms', '@depth@100ms')),
+        BybitCcxwAuxClass: ('__get_order_book_channel_depth', (50, 50, 50, 50, 1000)),
+        OkxCcxwAuxClass: ('__get_order_book_channel',\
+                          ('books', 'books5', 'books', 'books', 'books')),
+        KucoinCcxwAuxClass: ('__get_order_book_channel',\
+                             ('/spotMarket/level2Depth50', '/spotMarket/level2Depth5',\
+                              '/spotMarket/level2Depth50', '/spotMarket/level2Depth50',\
+                              '/spotMarket/level2Depth50')),
+        BingxCcxwAuxClass: ('__get_order_book_channel',\
+                            ('@depth100', '@depth5', '@depth20', '@depth50', '@depth100'))
+    }
+
+    def test_channels(self):
+        """
+        test_channels
+        =============
+            Each depth subscribes the nearest native channel.
+        """
+        for __aux_class, (__function, __channels) in self.channels.items():
+            __get_channel = getattr(__aux_class(streams=None),\
+                                    '_' + __aux_class.__name__ + __function)
+
+            for __depth, __channel in zip(self.depths, __channels):
+                __stream = {'endpoint': 'order_book', 'symbol': 'BTC/USDT'}
+
+                if __depth is not None:
+                    __stream['depth'] = __depth
+
+                self.assertEqual(__get_channel(__stream), __channel, __aux_class.__name__)
+
+        __get_channel = getattr(BinanceCcxwAuxClass(streams=None),\
+                                '_BinanceCcxwAuxClass__get_order_book_channel')
+        self.assertEqual(__get_channel({'depth': 20, 'update_speed': '1000ms'}), '@depth20')
+        self.assertEqual(__get_channel({'update_speed': '1000ms'}), '@depth')
+
+    def test_binance_depth_50(self):
+        """
+        test_binance_depth_50
+        =====================
+            Binance depth 50 keeps a 50 level book seeded by a 100 level snapshot.
+        """
+        with mock.patch.object(BinanceCcxwAuxClass, 'get_exchange_info',\
+                               lambda *_: BINANCE_EXCHANGE_INFO):
+            __binance = BinanceCcxwAuxClass([{'endpoint': 'order_book', 'symbol': 'BTC/USDT',\
+                                              'depth': 50}])
+            __binance.get_api_url()
+            __binance.get_websocket_endpoint_path()
+            __stream_index = __binance.get_stream_index('order_book', 'BTC/USDT')
+
+            self.assertEqual(getattr(__binance, '_BinanceCcxwAuxClass__order_book_max_depth')\
+                             [__stream_index], 50)
+
+            with mock.patch('ccxw.binance.ccf.file_get_contents_url',\
+                            return_value=None) as __get_url:
+                getattr(__binance, '_BinanceCcxwAuxClass__get_order_book_snapshot')('BTCUSDT')
+
+            self.assertTrue(__get_url.call_args[0][0].endswith('/depth?symbol=BTCUSDT&limit=100'))
+
+class TestSnapshotStreams(unittest.TestCase):
+    """
+    TestSnapshotStreams - Auxiliary class for testing the snapshot order book streams
+    =================================================================================
+        This class contains helper functions for testing the stream options of the
+        exchanges that send the whole book in each message.
+    """
+
+    def get_aux(self, aux_class, exchange_info, stream):
+        """
+        get_aux
+        =======
+            This function create an exchange class with stubbed exchange info.
+                :return object: Return the exchange class instance.
+        """
+        __patcher = mock.patch.object(aux_class, 'get_exchange_info', lambda *_: exchange_info)
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+        result = aux_class([stream])
+        result.get_websocket_endpoint_path()
+
+        return result
+
+    def get_book(self, aux):
+        """
+        get_book
+        ========
+            This function return the local book of the BTC/USDT order_book stream.
+                :return OrderBook: Return the book.
+        """
+        __ws_temp_data = getattr(aux, '_' + type(aux).__name__ + '__ws_temp_data')
+
+        return __ws_temp_data[aux.get_stream_index('order_book', 'BTC/USDT')]['book']
+
+    def test_max_depth(self):
+        """
+        test_max_depth
+        ==============
+            max_depth bounds the books built from snapshot messages.
+        """
+        __stream = {'endpoint': 'order_book', 'symbol': 'BTC/USDT', 'max_depth': 2}
+        __bids = [[str(1000 - __level), '1'] for __level in range(50)]
+        __asks = [[str(1001 + __level), '1'] for __level in range(50)]
+
+        __kucoin = self.get_aux(KucoinCcxwAuxClass,\
+                                {'data': [{'symbol': 'BTC-USDT', 'baseCurrency': 'BTC',\
+                                           'quoteCurrency': 'USDT', 'priceIncrement': '1'}]},\
+                                __stream)
+        __kucoin.manage_websocket_message(None, json.dumps({\
+            'type': 'message', 'topic': '/spotMarket/level2Depth50:BTC-USDT',\
+            'subject': 'level2', 'data': {'bids': __bids, 'asks': __asks, 'timestamp': 1}}))
+
+        __bingx = self.get_aux(BingxCcxwAuxClass,\
+                               {'data': {'symbols': [{'symbol': 'BTC-USDT', 'tickSize': 1}]}},\
+                               __stream)
+        __bingx.manage_websocket_message(None, json.dumps({\
+            'code': 0, 'success': True, 'dataType': 'BTC-USDT@depth50',\
+            'data': {'bids': __bids, 'asks': list(reversed(__asks))}}))
+
+        for __aux in (__kucoin, __bingx):
+            self.assertEqual(self.get_book(__aux).get_len(), (12, 12))
+            self.assertEqual(self.get_book(__aux).get_bids()[0], ['1000', '1'])
+
+    def test_options_endpoint(self):
+        """
+        test_options_endpoint
+        =====================
+            The order book options are rejected on other endpoints.
+        """
+        for __option in ({'max_depth': 20}, {'depth': 5}, {'conflation_ms': 100},\
+                         {'aggregation': {'step': 1}}):
+            self.assertTrue(ccf.is_valid_stream_options(dict(endpoint='order_book',\
+                                                             **__option)))
+
+            for __endpoint in ('kline', 'trades', 'ticker', 'bbo'):
+                self.assertFalse(ccf.is_valid_stream_options(dict(endpoint=__endpoint,\
+                                                                  **__option)))
+
+        self.assertTrue(ccf.is_valid_stream_options({'endpoint': 'trades', 'max_depth': None}))
+
+class TestBbo(unittest.TestCase):
+    """
+    TestBbo - Auxiliary class for testing the bbo message normalization
+    ===================================================================
+        This class contains helper functions for testing the bbo endpoint data of each
+        exchange.
+    """
+
+    messages = {
+        BinanceCcxwAuxClass: (BINANCE_EXCHANGE_INFO, 'BTCUSDT',\
+                              {'u': 7, 's': 'BTCUSDT', 'b': '25.35', 'B': '31.21',\
+                               'a': '25.36', 'A': '40.66'}),
+        BybitCcxwAuxClass: ({'result': {'list': [{'symbol': 'BTCUSDT', 'baseCoin': 'BTC',\
+                                                  'quoteCoin': 'USDT',\
+                                                  'priceFilter': {'tickSize': '0.01'}}]}},\
+                            'BTCUSDT',\
+                            {'topic': 'orderbook.1.BTCUSDT', 'type': 'snapshot',\
+                             'ts': 1672304484978,\
+                             'data': {'s': 'BTCUSDT', 'b': [['25.35', '31.21']],\
+                                      'a': [['25.36', '40.66']], 'u': 7, 'seq': 1}}),
+        OkxCcxwAuxClass: ({'data': [{'instId': 'BTC-USDT', 'baseCcy': 'BTC', 'quoteCcy': 'USDT',\
+                                     'tickSz': '0.1'}]},\
+                          'BTC/USDT',\
+                          {'arg': {'channel': 'bbo-tbt', 'instId': 'BTC-USDT'},\
+                           'data': [{'bids': [['25.35', '31.21', '0', '1']],\
+                                     'asks': [['25.36', '40.66', '0', '1']],\
+                                     'ts': '1672304484978', 'seqId': 7}]}),
+        KucoinCcxwAuxClass: ({'data': [{'symbol': 'BTC-USDT', 'baseCurrency': 'BTC',\
+                                        'quoteCurrency': 'USDT', 'priceIncrement': '1'}]},\
+                             'BTC-USDT',\
+                             {'type': 'message', 'topic': '/spotMarket/level1:BTC-USDT',\
+                              'subject': 'level1',\
+                              'data': {'bids': ['25.35', '31.21'], 'asks': ['25.36', '40.66'],\
+                                       'timestamp': 1672304484978}}),
+        BingxCcxwAuxClass: ({'data': {'symbols': [{'symbol': 'BTC-USDT', 'tickSize': 1}]}},\
+                            'BTC/USDT',\
+                            {'code': 0, 'success': True, 'dataType': 'BTC-USDT@bookTicker',\
+                             'data': {'e': 'bookTicker', 'u': 7, 'E': 1672304484978,\
+                                      's': 'BTC-USDT', 'b': 25.35, 'B': 31.21, 'a': 25.36,\
+                                      'A': 40.66}})
+    }
+
+    def get_aux(self, aux_class, exchange_info):
+        """
+        get_aux
+        =======
+            This function create an exchange class with a BTC/USDT bbo stream and stubbed
+            exchange info.
+                :return object: Return the exchange class instance.
+        """
+        __patcher = mock.patch.object(aux_class, 'get_exchange_info', lambda *_: exchange_info)
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+        result = aux_class([{'endpoint': 'bbo', 'symbol': 'BTC/USDT'}])
+        result.get_websocket_endpoint_path()
+        setattr(result, '_' + aux_class.__name__ + '__is_stopped', True)
+
+        return result
+
+    def test_bbo(self):
+        """
+        test_bbo
+        ========
+            The native best bid and ask messages are normalized to the same fields.
+        """
+        for __aux_class, (__exchange_info, __symbol, __message) in self.messages.items():
+            __aux = self.get_aux(__aux_class, __exchange_info)
+            __data = __aux.manage_websocket_message(None, json.dumps(__message))['data']
+
+            self.assertEqual(__data['endpoint'], 'bbo', __aux_class.__name__)
+            self.assertEqual(__data['exchange'], __aux_class.__module__.split('.')[-1])
+            self.assertEqual(__data['symbol'], __symbol, __aux_class.__name__)
+            self.assertIsNone(__data['interval'])
+            self.assertIn(__data['update_id'], (7, None), __aux_class.__name__)
+            self.assertIsInstance(__data['event_time'], int)
+            self.assertEqual(len(__data['event_time_date']), 23)
+            self.assertEqual((__data['best_bid_price'], __data['best_bid_quantity'],\
+                              __data['best_ask_price'], __data['best_ask_quantity']),\
+                             ('25.35', '31.21', '25.36', '40.66'), __aux_class.__name__)
+
+    def test_bybit_delta(self):
+        """
+        test_bybit_delta
+        ================
+            A Bybit delta keeps the side sent empty and clears the side with size 0.
+        """
+        __exchange_info, _, __message = self.messages[BybitCcxwAuxClass]
+        __bybit = self.get_aux(BybitCcxwAuxClass, __exchange_info)
+        __bybit.manage_websocket_message(None, json.dumps(__message))
+
+        __delta = {'topic': 'orderbook.1.BTCUSDT', 'type': 'delta', 'ts': 1672304485000,\
+                   'data': {'s': 'BTCUSDT', 'b': [], 'a': [['25.36', '0']], 'u': 8, 'seq': 2}}
+        __data = __bybit.manage_websocket_message(None, json.dumps(__delta))['data']
+
+        self.assertEqual((__data['best_bid_price'], __data['best_bid_quantity']),\
+                         ('25.35', '31.21'))
+        self.assertIsNone(__data['best_ask_price'])
+        self.assertEqual(__data['update_id'], 8)
+
+if __name__ == '__main__':
+    unittest.main()
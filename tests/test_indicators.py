@@ -0,0 +1,152 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+kline indicators tests cases.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_indicators.py
+"""
+import math
+import unittest
+
+import ccxw.ccxw_common_functions as ccf
+from ccxw.indicators import Indicator, KlineIndicators, EmaIndicator
+
+def get_kline(open_time, close):
+    """
+    get_kline
+    =========
+        This function return a kline message.
+            :param open_time: int.
+            :param close: float.
+            :return dict: Return kline.
+    """
+    return {'open_time': open_time, 'open': str(close - 1), 'hight': str(close + 2),\
+            'low': str(close - 2), 'close': str(close)}
+
+CLOSES = [10, 11, 12, 11, 13, 15, 14, 13, 16, 18, 17, 19]
+
+class TestKlineIndicators(unittest.TestCase):
+    """
+    TestKlineIndicators - Auxiliary class for testing KlineIndicators
+    =================================================================
+        This class contains helper functions for testing the KlineIndicators class.
+    """
+
+    def setUp(self):
+        self.__indicators = KlineIndicators({'sma_3': {'type': 'sma', 'period': 3},\
+                                             'ema_3': {'type': 'ema', 'period': 3},\
+                                             'rsi_3': {'type': 'rsi', 'period': 3},\
+                                             'atr_3': {'type': 'atr', 'period': 3},\
+                                             'bb_3': {'type': 'bollinger', 'period': 3,\
+                                                      'num_std': 2}})
+
+        for __open_time, __close in enumerate(CLOSES):
+            # Each candle is first seen with a revision that must be rolled back
+            self.__indicators.update([get_kline(__open_time, __close + 100)])
+            self.__indicators.update([get_kline(__open_time, __close)])
+
+    def test_values(self):
+        """
+        test_values
+        ===========
+            The values match a full recompute over the closes.
+        """
+        __values = self.__indicators.get_values()
+        self.assertEqual(__values['open_time'], len(CLOSES) - 1)
+        self.assertAlmostEqual(__values['sma_3'], sum(CLOSES[-3:]) / 3)
+
+        __ema = sum(CLOSES[:3]) / 3
+
+        for __close in CLOSES[3:]:
+            __ema = 0.5 * __close + 0.5 * __ema
+
+        self.assertAlmostEqual(__values['ema_3'], __ema)
+
+        __changes = [__new - __old for __old, __new in zip(CLOSES, CLOSES[1:])]
+        __gain = sum(max(__change, 0) for __change in __changes[:3]) / 3
+        __loss = sum(max(-__change, 0) for __change in __changes[:3]) / 3
+
+        for __change in __changes[3:]:
+            __gain = (__gain * 2 + max(__change, 0)) / 3
+            __loss = (__loss * 2 + max(-__change, 0)) / 3
+
+        self.assertAlmostEqual(__values['rsi_3'], 100 - 100 / (1 + __gain / __loss))
+
+        __ranges = [4] + [max(4, abs(__new + 2 - __old), abs(__new - 2 - __old))\
+                          for __old, __new in zip(CLOSES, CLOSES[1:])]
+        __atr = sum(__ranges[:3]) / 3
+
+        for __range in __ranges[3:]:
+            __atr = (__atr * 2 + __range) / 3
+
+        self.assertAlmostEqual(__values['atr_3'], __atr)
+
+        __mean = sum(CLOSES[-3:]) / 3
+        __std = math.sqrt(sum((__close - __mean) ** 2 for __close in CLOSES[-3:]) / 3)
+        self.assertAlmostEqual(__values['bb_3']['middle'], __mean)
+        self.assertAlmostEqual(__values['bb_3']['upper'], __mean + 2 * __std)
+        self.assertAlmostEqual(__values['bb_3']['lower'], __mean - 2 * __std)
+
+    def test_warm_up_and_late_candles(self):
+        """
+        test_warm_up_and_late_candles
+        =============================
+            Values are None while warming up, revisions of closed candles are ignored.
+        """
+        __indicators = KlineIndicators({'sma_3': {'type': 'sma', 'period': 3}})
+        __indicators.update([get_kline(0, 1), get_kline(1, 2)])
+        self.assertIsNone(__indicators.get_values()['sma_3'])
+
+        __indicators.update([get_kline(1, 2), get_kline(2, 3)])
+        self.assertAlmostEqual(__indicators.get_values()['sma_3'], 2)
+
+        self.assertFalse(__indicators.update([get_kline(0, 100), get_kline(2, 3)]))
+        self.assertAlmostEqual(__indicators.get_values()['sma_3'], 2)
+
+    def test_add(self):
+        """
+        test_add
+        ========
+            An added indicator is warmed up with past klines.
+        """
+        __klines = [get_kline(__open_time, __close)\
+                    for __open_time, __close in enumerate(CLOSES)]
+        self.__indicators.add('ema_5', EmaIndicator(period=5), __klines)
+
+        __indicators = KlineIndicators({'ema_5': {'type': 'ema', 'period': 5}})
+        __indicators.update(__klines)
+        self.assertAlmostEqual(self.__indicators.get_values()['ema_5'],\
+                               __indicators.get_values()['ema_5'])
+
+    def test_invalid(self):
+        """
+        test_invalid
+        ============
+            Invalid specs, or indicators on other endpoints, are rejected by the stream
+            validation, invalid specs by the constructor, Indicator is abstract.
+        """
+        for __spec in ({'type': 'macd'}, {'type': ['sma']}, {'period': 3},\
+                       {'type': 'sma', 'length': 3}, {'type': 'ema', 'num_std': 2},\
+                       {'type': 'sma', 'period': 2.5}, {'type': 'sma', 'period': -1},\
+                       {'type': 'sma', 'period': True}, 'sma'):
+            self.assertFalse(ccf.is_valid_stream_options({'endpoint': 'kline',\
+                                                          'indicators': {'x': __spec}}))
+
+            with self.assertRaises(ValueError):
+                KlineIndicators({'x': __spec})
+
+        __indicators = {'x': {'type': 'sma', 'period': 3}}
+        self.assertTrue(ccf.is_valid_stream_options({'endpoint': 'kline',\
+                                                     'indicators': __indicators}))
+        self.assertFalse(ccf.is_valid_stream_options({'endpoint': 'trades',\
+                                                      'indicators': __indicators}))
+
+        with self.assertRaises(TypeError):
+            Indicator() # pylint: disable=abstract-class-instantiated
+
+        with self.assertRaises(ValueError):
+            self.__indicators.add('x', {'type': 'sma', 'period': 3})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+kline buffer tests cases.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_kline_buffer.py
+"""
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ccxw.kline_buffer import KlineBuffer
+
+def get_kline(open_time, close):
+    """
+    get_kline
+    =========
+        This function return a kline message.
+            :param open_time: int.
+            :param close: str.
+            :return dict: Return kline.
+    """
+    return {'endpoint': 'kline', 'exchange': 'binance', 'symbol': 'BTCUSDT', 'interval': '1m',\
+            'last_update_id': open_time + 1, 'open_time': open_time,\
+            'close_time': open_time + 59999, 'open_time_date': '', 'close_time_date': '',\
+            'open': '1.5', 'close': close, 'hight': '2', 'low': '1', 'volume': '10.25',\
+            'is_closed': False}
+
+class TestKlineBuffer(unittest.TestCase):
+    """
+    TestKlineBuffer - Auxiliary class for testing KlineBuffer
+    =========================================================
+        This class contains helper functions for testing the KlineBuffer class.
+    """
+
+    def setUp(self):
+        self.__klines = KlineBuffer(max_len=3)
+
+        for __open_time in (60, 120, 180):
+            self.__klines.set(__open_time, {'open_time': __open_time, 'close': '1'})
+
+    def test_update_and_append(self):
+        """
+        test_update_and_append
+        ======================
+            The current candle is updated in place and new candles evict the oldest.
+        """
+        self.__klines.set(180, {'open_time': 180, 'close': '2'})
+        self.assertEqual(len(self.__klines), 3)
+        self.assertEqual(self.__klines.get_last(1), [{'open_time': 180, 'close': '2'}])
+
+        self.__klines.set(240, {'open_time': 240, 'close': '3'})
+        self.assertEqual([__kline['open_time'] for __kline in self.__klines.get_last()],\
+                         [120, 180, 240])
+
+    def test_get_last(self):
+        """
+        test_get_last
+        =============
+            The last candles are returned oldest first.
+        """
+        self.assertEqual([__kline['open_time'] for __kline in self.__klines.get_last(2)],\
+                         [120, 180])
+        self.assertEqual(len(self.__klines.get_last(10)), 3)
+        self.assertEqual(self.__klines.get_last(0), [])
+
+    def test_late_candle(self):
+        """
+        test_late_candle
+        ================
+            Late candles are inserted in order, or evicted if they are the oldest.
+        """
+        self.__klines.set(150, {'open_time': 150})
+        self.assertEqual([__kline['open_time'] for __kline in self.__klines.get_last()],\
+                         [120, 150, 180])
+
+        self.__klines.set(30, {'open_time': 30})
+        self.assertEqual([__kline['open_time'] for __kline in self.__klines.get_last()],\
+                         [120, 150, 180])
+
+    def test_items_len(self):
+        """
+        test_items_len
+        ==============
+            Only the newest candles keep their message, older ones are rebuilt.
+        """
+        __klines = KlineBuffer(max_len=4, items_len=2)
+
+        for __open_time in range(0, 300000, 60000):
+            __klines.set(__open_time, get_kline(__open_time, str(__open_time / 60000)))
+
+        __last = __klines.get_last()
+        self.assertEqual([__kline['open_time'] for __kline in __last],\
+                         [60000, 120000, 180000, 240000])
+        self.assertEqual(__last[-1], get_kline(240000, '4.0'))
+        self.assertEqual(__last[0]['close'], '1')
+        self.assertEqual((__last[0]['hight'], __last[0]['volume']), ('2', '10.25'))
+        self.assertEqual((__last[0]['close_time'], __last[0]['last_update_id']), (119999, 60001))
+        self.assertEqual(__last[0]['open_time_date'], '1970-01-01 00:01:00')
+        self.assertTrue(__last[0]['is_closed'])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_arrays(self):
+        """
+        test_arrays
+        ===========
+            Arrays are read-only zero-copy views of the last candles, oldest first.
+        """
+        __klines = KlineBuffer(max_len=3)
+
+        for __open_time in range(0, 300000, 60000):
+            __klines.set(__open_time, get_kline(__open_time, str(__open_time / 60000)))
+
+        __arrays = __klines.get_arrays()
+        self.assertEqual(__arrays['open_time'].dtype, numpy.int64)
+        self.assertEqual(__arrays['open_time'].tolist(), [120000, 180000, 240000])
+        self.assertEqual(__arrays['close'].tolist(), [2.0, 3.0, 4.0])
+        self.assertEqual(__arrays['high'].tolist(), [2.0, 2.0, 2.0])
+        self.assertFalse(__arrays['close'].flags.writeable)
+        self.assertEqual(__klines.get_arrays(2)['close'].tolist(), [3.0, 4.0])
+        self.assertEqual(__klines.get_arrays(0)['close'].tolist(), [])
+
+        __klines.set(240000, get_kline(240000, '4.5'))
+        self.assertEqual(__arrays['close'].tolist(), [2.0, 3.0, 4.5])
+
+if __name__ == '__main__':
+    unittest.main()
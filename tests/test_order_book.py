@@ -0,0 +1,380 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+order book engine tests cases.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_order_book.py
+"""
+import os
+import tempfile
+import time
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ccxw.order_book import OrderBook, OrderBookDeltaLog, OrderBookHistory, OrderBookIntegrity,\
+    OrderBookRecorder
+
+class TestOrderBook(unittest.TestCase):
+    """
+    TestOrderBook - Auxiliary class for testing OrderBook
+    =====================================================
+        This class contains helper functions for testing the OrderBook class.
+    """
+
+    def setUp(self):
+        self.__book = OrderBook()
+        self.__book.set_snapshot([['100.0', '1'], ['101.5', '2'], ['99', '3']],\
+                                 [['102', '1'], ['103.25', '4'], ['102.5', '0']])
+
+    def test_snapshot_sorted(self):
+        """
+        test_snapshot_sorted
+        ====================
+            Snapshot levels are sorted best first and zero sizes are dropped.
+        """
+        self.assertEqual(self.__book.get_bids(),\
+                         [['101.5', '2'], ['100.0', '1'], ['99', '3']])
+        self.assertEqual(self.__book.get_asks(), [['102', '1'], ['103.25', '4']])
+        self.assertEqual(self.__book.get_len(), (3, 2))
+
+    def test_update(self):
+        """
+        test_update
+        ===========
+            Diffs insert, replace and delete levels keeping the order.
+        """
+        self.__book.update([['100.5', '7'], ['101.5', '0'], ['99', '5']],\
+                           [['101.75', '2'], ['103.25', '0'], ['104', '0']])
+
+        self.assertEqual(self.__book.get_bids(),\
+                         [['100.5', '7'], ['100.0', '1'], ['99', '5']])
+        self.assertEqual(self.__book.get_asks(), [['101.75', '2'], ['102', '1']])
+
+    def test_top_k(self):
+        """
+        test_top_k
+        ==========
+            Depth limited reads return only the best levels.
+        """
+        self.assertEqual(self.__book.get_bids(1), [['101.5', '2']])
+        self.assertEqual(self.__book.get_asks(5), [['102', '1'], ['103.25', '4']])
+
+    def test_tick_size_keys(self):
+        """
+        test_tick_size_keys
+        ===================
+            With tick size, equal prices in different formats are the same level.
+        """
+        __book = OrderBook('0.01000000')
+        __book.set_snapshot([['0.10', '1'], ['0.09', '2']], [['0.11', '1']])
+        __book.update([['0.1', '5'], ['0.090', '0']], [['0.110', '3']])
+
+        self.assertEqual(__book.get_tick_size(), 0.01)
+        self.assertEqual(__book.get_bids(), [['0.1', '5']])
+        self.assertEqual(__book.get_asks(), [['0.110', '3']])
+
+    def test_invalid_tick_size(self):
+        """
+        test_invalid_tick_size
+        ======================
+            Invalid tick sizes fall back to float keys.
+        """
+        self.assertIsNone(OrderBook('0').get_tick_size())
+        self.assertIsNone(OrderBook('abc').get_tick_size())
+
+    def test_max_depth(self):
+        """
+        test_max_depth
+        ==============
+            Bounded books keep max_depth plus margin and detect exhaustion.
+        """
+        __book = OrderBook(max_depth=2)
+        __book.set_snapshot([[str(100 - i), '1'] for i in range(0, 20)],\
+                            [[str(101 + i), '1'] for i in range(0, 5)])
+
+        self.assertEqual(__book.get_len(), (12, 5))
+
+        __book.update([['50', '1']], [['150', '1']])
+        self.assertEqual(__book.get_len(), (12, 6))
+        self.assertFalse(__book.is_depth_exhausted())
+
+        __book.update([[str(100 - i), '0'] for i in range(0, 11)], [])
+        self.assertEqual(__book.get_bids(), [['89', '1']])
+        self.assertTrue(__book.is_depth_exhausted())
+
+        # A snapshot stream message replaces every level, deeper levels fill in again
+        __book.replace([[str(95 - i), '1'] for i in range(0, 20)], [['101', '1']])
+        self.assertEqual(__book.get_len(), (12, 1))
+        self.assertEqual(__book.get_bids()[-1], ['84', '1'])
+        self.assertFalse(__book.is_depth_exhausted())
+
+    def test_stats(self):
+        """
+        test_stats
+        ==========
+            Statistics follow the book changes.
+        """
+        __book = OrderBook('0.5', depth_bands_bps=(10, 100))
+        __book.set_snapshot([['100', '3'], ['99.5', '2'], ['98', '4']],\
+                            [['100.5', '1'], ['101', '5'], ['103', '1']])
+
+        __stats = __book.get_stats()
+        self.assertEqual(__stats['mid'], 100.25)
+        self.assertEqual(__stats['spread'], 0.5)
+        self.assertEqual(__stats['microprice'], (100 * 1 + 100.5 * 3) / 4)
+        self.assertEqual(__stats['imbalance'], 0.5)
+        self.assertEqual(__stats['depth_bps']['10'], {'bids': 3.0, 'asks': 1.0})
+        self.assertEqual(__stats['depth_bps']['100'], {'bids': 5.0, 'asks': 6.0})
+
+        __book.update([['100', '0']], [])
+        __stats = __book.get_stats()
+        self.assertEqual(__stats['best_bid'], 99.5)
+        self.assertEqual(__stats['mid'], 100.0)
+
+        __book.update([], [['100.5', '0'], ['101', '0'], ['103', '0']])
+        self.assertIsNone(__book.get_stats())
+
+    def test_stats_bands(self):
+        """
+        test_stats_bands
+        ================
+            Depth band sums follow level changes and mid moves across band edges, like
+            a book rebuilt from a snapshot.
+        """
+        __book = OrderBook('0.5', depth_bands_bps=(10, 100))
+        __book.set_snapshot([['100', '3'], ['99.5', '2'], ['98', '4']],\
+                            [['100.5', '1'], ['101', '5'], ['103', '1']])
+        __book.get_stats()
+
+        for __bids, __asks in (([['99.5', '6'], ['99', '1']], [['101', '0']]),\
+                               ([['100', '0']], [['100.5', '0'], ['99.5', '1']]),\
+                               ([['99.5', '0'], ['97', '2']], [['99.5', '0'], ['100', '2']]),\
+                               ([['99.5', '4']], [])):
+            __book.update(__bids, __asks)
+            __rebuilt = OrderBook('0.5', depth_bands_bps=(10, 100))
+            __rebuilt.set_snapshot(__book.get_bids(), __book.get_asks())
+            self.assertEqual(__book.get_stats()['depth_bps'],\
+                             __rebuilt.get_stats()['depth_bps'])
+
+        self.assertEqual(__book.get_stats()['depth_bps'],\
+                         {'10': {'bids': 4.0, 'asks': 2.0}, '100': {'bids': 5.0, 'asks': 2.0}})
+
+        __book = OrderBook('0.5', depth_bands_bps=())
+        __book.set_snapshot([['100', '3']], [['100.5', '1']])
+        self.assertEqual(__book.get_stats()['depth_bps'], {})
+
+    def test_aggregation(self):
+        """
+        test_aggregation
+        ================
+            Buckets follow the level changes and trims.
+        """
+        __book = OrderBook('0.1', max_depth=2, aggregation={'step': 1})
+        __book.set_snapshot([['100.5', '1'], ['100.2', '2'], ['99.9', '3']],\
+                            [['100.6', '1'], ['101.0', '2'], ['101.3', '4']])
+
+        self.assertEqual(__book.get_aggregation_step(), 1.0)
+        self.assertEqual(__book.get_aggregated_bids(), [[100.0, 3.0], [99.0, 3.0]])
+        self.assertEqual(__book.get_aggregated_asks(), [[101.0, 3.0], [102.0, 4.0]])
+
+        __book.update([['100.5', '0'], ['99.9', '1'], ['98.1', '5']], [['101.3', '0']])
+        self.assertEqual(__book.get_aggregated_bids(), [[100.0, 2.0], [99.0, 1.0], [98.0, 5.0]])
+        self.assertEqual(__book.get_aggregated_asks(1), [[101.0, 3.0]])
+
+        __book = OrderBook(aggregation={'bps': 100})
+        __book.set_snapshot([['99', '1'], ['98.5', '1']], [['101', '1']])
+        self.assertEqual(__book.get_aggregation_step(), 1.0)
+        self.assertEqual(__book.get_aggregated_bids(), [[99.0, 1.0], [98.0, 1.0]])
+        self.assertEqual(OrderBook().get_aggregated_asks(), [])
+
+    def test_delta_log(self):
+        """
+        test_delta_log
+        ==============
+            Applied changes are recorded with sequence numbers and periodic snapshots.
+        """
+        __delta_log = OrderBookDeltaLog(max_len=4, snapshot_interval=2)
+        __book = OrderBook(delta_log=__delta_log)
+        __book.set_snapshot([['100', '1']], [['101', '1']])
+
+        self.assertEqual(__book.update([['100', '1'], ['99', '0']], []), ([], []))
+        self.assertEqual(__book.update([['100', '2']], [['101', '0']]), ([['100', '2']], [['101', '0']]))
+        self.assertEqual(__delta_log.get_entries(1),\
+                         [{'sequence': 2, 'type': 'delta', 'bids': [['100', '2']], 'asks': [['101', '0']]}])
+
+        __book.replace([['100', '2'], ['98', '1']], [['102', '3']])
+        self.assertEqual(__delta_log.get_sequence(), 4)
+        self.assertEqual(__delta_log.get_last_entry(),\
+                         {'sequence': 4, 'type': 'snapshot', 'bids': [['100', '2'], ['98', '1']],\
+                          'asks': [['102', '3']]})
+
+        __book.update([['97', '1']], [])
+        __book.update([['96', '1']], [])
+        self.assertEqual([__entry['sequence'] for __entry in __delta_log.get_entries(3)], [4, 5, 6, 7])
+        self.assertEqual([__entry['sequence'] for __entry in __delta_log.get_entries(0)], [7])
+        self.assertEqual([__entry['sequence'] for __entry in __delta_log.get_entries(5)], [6, 7])
+
+    def test_top_version(self):
+        """
+        test_top_version
+        ================
+            Only changes inside the watched levels increase the top version.
+        """
+        __book = OrderBook(notify_depth=2)
+        __book.set_snapshot([['100', '1'], ['99', '1'], ['98', '1']], [['101', '1']])
+        __version = __book.get_top_version()
+
+        __book.update([['98', '5'], ['97', '1']], [])
+        self.assertEqual(__book.get_top_version(), __version)
+
+        __book.update([], [['105', '1']])
+        self.assertEqual(__book.get_top_version(), __version + 1)
+
+        __book.update([['99', '0']], [])
+        self.assertEqual(__book.get_top_version(), __version + 2)
+
+        __book.update([['100', '1']], [])
+        self.assertEqual(__book.get_top_version(), __version + 2)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_arrays(self):
+        """
+        test_arrays
+        ===========
+            Array views are float64, read-only and rebuilt only after a change.
+        """
+        __arrays = self.__book.get_arrays()
+        __prices, __sizes = __arrays['bids']
+
+        self.assertEqual(__prices.dtype, numpy.float64)
+        self.assertEqual(__prices.tolist(), [101.5, 100.0, 99.0])
+        self.assertEqual(__sizes.tolist(), [2.0, 1.0, 3.0])
+        self.assertFalse(__prices.flags.writeable)
+        self.assertIs(self.__book.get_arrays()['asks'][0].base, __arrays['asks'][0].base)
+        self.assertEqual(self.__book.get_arrays(1)['asks'][0].tolist(), [102.0])
+
+        self.__book.update([], [['102', '0']])
+        self.assertEqual(self.__book.get_arrays()['asks'][0].tolist(), [103.25])
+
+    def test_history(self):
+        """
+        test_history
+        ============
+            Samples are taken at most once per interval and read by time range.
+        """
+        __history = OrderBookHistory(interval_ms=50, depth=2, max_len=3)
+        __book = OrderBook(history=__history)
+        __book.set_snapshot([['100', '1'], ['99', '2'], ['98', '3']], [['101', '4']])
+        __book.update([['100', '5']], [])
+
+        __samples = __history.get_samples()
+        self.assertEqual(len(__samples), 1)
+        self.assertEqual(__samples[0]['bids'], [[100.0, 1.0], [99.0, 2.0]])
+        self.assertEqual(__samples[0]['asks'], [[101.0, 4.0]])
+
+        time.sleep(0.06)
+        __book.update([['100', '6']], [])
+        __samples = __history.get_samples()
+        self.assertEqual(len(__samples), 2)
+        self.assertEqual(__samples[1]['bids'][0], [100.0, 6.0])
+        self.assertEqual(__history.get_samples(__samples[1]['timestamp']), [__samples[1]])
+        self.assertEqual(__history.get_samples(end_time=__samples[0]['timestamp']), [__samples[0]])
+
+    def test_integrity(self):
+        """
+        test_integrity
+        ==============
+            Invariant violations are detected on each change and counted across books.
+        """
+        __integrity = OrderBookIntegrity(max_snapshot_age=0.05)
+        __book = OrderBook(integrity=__integrity)
+        __book.set_snapshot([['100', '1'], ['99', '1']], [['101', '1']])
+        self.assertTrue(__book.is_consistent())
+
+        __book.update([['101.5', '1']], [])
+        self.assertFalse(__book.is_consistent())
+        __book.update([['101.5', '0'], ['98', '-1']], [])
+        self.assertFalse(__book.is_consistent())
+        __book.update([['98', '0']], [])
+        self.assertTrue(__book.is_consistent())
+
+        __book = OrderBook(integrity=__integrity)
+        __book.set_snapshot([['100', '1']], [['101', '1']])
+        time.sleep(0.06)
+        __book.update([['99', '1']], [])
+        self.assertTrue(__book.is_consistent())
+        self.assertTrue(__integrity.is_snapshot_stale())
+
+        __counters = __integrity.get_counters()
+        self.assertEqual(__counters['checks'], 6)
+        self.assertEqual((__counters['crossed'], __counters['bad_size']), (1, 1))
+        self.assertEqual((__counters['unordered'], __counters['stale_snapshot']), (0, 1))
+
+        __book.replace([['100', '1']], [['101', '1']])
+        self.assertFalse(__integrity.is_snapshot_stale())
+
+    def test_recorder(self):
+        """
+        test_recorder
+        =============
+            Recorded books are rebuilt as of a past time from the nearest checkpoint.
+        """
+        with tempfile.TemporaryDirectory() as __directory:
+            __path = os.path.join(__directory, 'book')
+            __recorder = OrderBookRecorder(__path, checkpoint_interval=0.05)
+            __book = OrderBook(recorder=__recorder)
+            __book.set_snapshot([['100', '1'], ['99', '2']], [['101', '1']])
+            __book.update([['100', '3']], [['101', '0'], ['102', '5']])
+            __time_first = time.time()
+
+            time.sleep(0.06)
+            __book.update([['98', '1']], [])
+            __time_second = time.time()
+            __book.update([['100', '0']], [])
+            __recorder.close()
+
+            self.assertIsNone(OrderBookRecorder.get_book_at(__path, __time_first - 60))
+            self.assertEqual(OrderBookRecorder.get_checkpoint_offset(__path, __time_first), 0)
+            self.assertGreater(OrderBookRecorder.get_checkpoint_offset(__path, __time_second), 0)
+
+            __past_book = OrderBookRecorder.get_book_at(__path, __time_first)
+            self.assertEqual(__past_book.get_bids(), [['100', '3'], ['99', '2']])
+            self.assertEqual(__past_book.get_asks(), [['102', '5']])
+
+            __past_book = OrderBookRecorder.get_book_at(__path, __time_second)
+            self.assertEqual(__past_book.get_bids(), [['100', '3'], ['99', '2'], ['98', '1']])
+
+            __past_book = OrderBookRecorder.get_book_at(__path, time.time())
+            self.assertEqual(__past_book.get_bids(), __book.get_bids())
+
+            # A bounded book ignores the levels beyond its trimmed side after replay too
+            __path = os.path.join(__directory, 'bounded_book')
+            __recorder = OrderBookRecorder(__path)
+            __book = OrderBook(max_depth=2, recorder=__recorder)
+            __book.set_snapshot([[str(100 - __level), '1'] for __level in range(20)],\
+                                [['101', '1']])
+            __book.update([['100', '0'], ['80', '1']], [])
+            __recorder.close()
+
+            __past_book = OrderBookRecorder.get_book_at(__path, time.time(), max_depth=2)
+            self.assertEqual(__past_book.get_truncated(), (True, False))
+            self.assertEqual(__past_book.get_len(), (11, 1))
+            self.assertEqual(__past_book.get_bids(), __book.get_bids())
+
+    def test_clear(self):
+        """
+        test_clear
+        ==========
+            Clear remove all levels.
+        """
+        self.__book.clear()
+        self.assertEqual(self.__book.get_len(), (0, 0))
+        self.assertEqual(self.__book.get_bids(10), [])
+
+if __name__ == '__main__':
+    unittest.main()
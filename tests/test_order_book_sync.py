@@ -0,0 +1,345 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+exchange order book synchronization tests cases, driven by crafted messages
+without network.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_order_book_sync.py
+"""
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from ccxw.binance import BinanceCcxwAuxClass
+from ccxw.binanceus import BinanceusCcxwAuxClass
+from ccxw.bybit import BybitCcxwAuxClass
+from ccxw.okx import OkxCcxwAuxClass
+
+class FakeWebSocket():
+    """
+    FakeWebSocket - Websocket that keeps the sent messages
+    ======================================================
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        """
+        send
+        ====
+            This function keep a sent message.
+                :param message: str.
+        """
+        self.sent.append(json.loads(message))
+
+    def close(self):
+        """
+        close
+        =====
+            This function do nothing, there is no connection.
+        """
+
+class TestOkxOrderBookSync(unittest.TestCase):
+    """
+    TestOkxOrderBookSync - Auxiliary class for testing the OKX order book checksum
+    ==============================================================================
+        This class contains helper functions for testing the OKX local order book.
+    """
+
+    # Checksum examples of the OKX order book documentation
+    __bids = [['3366.1', '7', '0', '3'], ['3366', '6', '3', '4']]
+    __asks = [['3366.8', '9', '10', '3'], ['3368', '8', '3', '4']]
+    __checksum = -1881014294 # crc32('3366.1:7:3366.8:9:3366:6:3368:8')
+    __checksum_unequal = 1164732920 # crc32('3366.1:7:3366.8:9:3366:6')
+
+    def setUp(self):
+        __exchange_info = {'data': [{'instId': 'BTC-USDT', 'baseCcy': 'BTC',\
+                                     'quoteCcy': 'USDT', 'tickSz': '0.1'}]}
+        __patcher = mock.patch.object(OkxCcxwAuxClass, 'get_exchange_info',\
+                                      return_value=__exchange_info)
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+        self.__okx = OkxCcxwAuxClass([{'endpoint': 'order_book', 'symbol': 'BTC/USDT',\
+                                       'depth': 'full'}])
+        self.__okx.get_websocket_endpoint_path()
+        self.__ws = FakeWebSocket()
+        self.__okx._OkxCcxwAuxClass__ws_public = self.__ws
+        self.__okx._OkxCcxwAuxClass__is_stopped = True # Never started, no stop() on delete
+
+    def __send(self, action, bids, asks, checksum, seq_id):
+        """
+        __send
+        ======
+            This function feed a books message.
+                :return dict | None: Return the managed data.
+        """
+        __message = {'arg': {'channel': 'books', 'instId': 'BTC-USDT'}, 'action': action,\
+                     'data': [{'bids': bids, 'asks': asks, 'ts': '1', 'checksum': checksum,\
+                               'seqId': seq_id, 'prevSeqId': seq_id - 1}]}
+
+        return self.__okx.manage_websocket_message(None, json.dumps(__message))['data']
+
+    def test_checksum(self):
+        """
+        test_checksum
+        =============
+            The documented checksums match with equal and unequal side lengths.
+        """
+        self.assertIsNotNone(self.__send('snapshot', self.__bids, self.__asks,\
+                                         self.__checksum, 1))
+        self.assertIsNotNone(self.__send('update', [], [['3368', '0', '0', '0']],\
+                                         self.__checksum_unequal, 2))
+        self.assertEqual(self.__okx.get_order_book_counters('BTC/USDT'),\
+                         {'checksum_ok': 2, 'checksum_errors': 0, 'resyncs': 0})
+        self.assertEqual(self.__ws.sent, [])
+
+    def test_checksum_error_resync(self):
+        """
+        test_checksum_error_resync
+        ==========================
+            A wrong checksum drops the book and resubscribes only its instrument.
+        """
+        self.__send('snapshot', self.__bids, self.__asks, self.__checksum, 1)
+        self.assertIsNone(self.__send('update', [['3366.2', '1', '0', '1']], [],\
+                                      self.__checksum, 2))
+        self.assertEqual(self.__okx.get_order_book_counters('BTC/USDT'),\
+                         {'checksum_ok': 1, 'checksum_errors': 1, 'resyncs': 1})
+        self.assertEqual(self.__ws.sent,\
+                         [{'op': 'unsubscribe', 'args': [{'channel': 'books',\
+                                                          'instId': 'BTC-USDT'}]},\
+                          {'op': 'subscribe', 'args': [{'channel': 'books',\
+                                                        'instId': 'BTC-USDT'}]}])
+        self.assertIsNone(self.__okx.get_book_stats('BTC/USDT'))
+
+        self.assertIsNotNone(self.__send('snapshot', self.__bids, self.__asks,\
+                                         self.__checksum, 3))
+
+class BinanceOrderBookSyncMixin():
+    """
+    BinanceOrderBookSyncMixin - Shared tests of the Binance order book sequencing
+    =============================================================================
+        The Binance and Binance US classes keep the same sequencing code, so the same
+        tests run on both. The REST snapshot is stubbed and diffs are crafted
+        depthUpdate events.
+    """
+
+    aux_class = None
+
+    def setUp(self): # pylint: disable=invalid-name
+        """
+        setUp
+        =====
+            This function create the auxiliary class with a stubbed snapshot.
+        """
+        __exchange_info = {'symbols': [{'symbol': 'BTCUSDT', 'baseAsset': 'BTC',\
+                                        'quoteAsset': 'USDT',\
+                                        'filters': [{'filterType': 'PRICE_FILTER',\
+                                                     'tickSize': '0.01'}]}]}
+        self.snapshot = {'lastUpdateId': 100, 'bids': [['100', '1'], ['99', '2']],\
+                         'asks': [['101', '1'], ['102', '2']]}
+        self.fetch = threading.Event()
+        __class_prefix = '_' + self.aux_class.__name__
+
+        def get_snapshot(*_):
+            self.fetch.wait(5)
+            return self.snapshot
+
+        for __name, __value in (('get_exchange_info', lambda *_: __exchange_info),\
+                                (__class_prefix + '__get_order_book_snapshot', get_snapshot)):
+            __patcher = mock.patch.object(self.aux_class, __name, __value)
+            __patcher.start()
+            self.addCleanup(__patcher.stop)
+
+        self.aux = self.aux_class([{'endpoint': 'order_book', 'symbol': 'BTC/USDT'}])
+        self.aux.get_websocket_endpoint_path()
+        self.addCleanup(self.aux.stop)
+        self.results = getattr(self.aux, __class_prefix + '__snapshot_results')
+
+    def send(self, first_id, last_id, bids=None, asks=None):
+        """
+        send
+        ====
+            This function feed a depthUpdate event.
+                :return dict | None: Return the managed data.
+        """
+        __message = {'e': 'depthUpdate', 'E': 1, 's': 'BTCUSDT', 'U': first_id, 'u': last_id,\
+                     'b': bids or [], 'a': asks or []}
+        __managed = self.aux.manage_websocket_message(None, json.dumps(__message))
+
+        return None if __managed is None else __managed['data']
+
+    def wait_snapshot(self):
+        """
+        wait_snapshot
+        =============
+            This function let the worker fetch the requested snapshot and wait for it.
+        """
+        __time_end = time.time() + 5
+        self.fetch.set()
+
+        while self.results.qsize() == 0 and time.time() < __time_end:
+            time.sleep(0.01)
+
+        self.fetch.clear()
+        self.assertEqual(self.results.qsize(), 1)
+
+    def test_buffer_replay(self):
+        """
+        test_buffer_replay
+        ==================
+            Diffs buffered during the snapshot fetch are replayed: stale ones are
+            dropped, the one straddling lastUpdateId + 1 and the next ones are applied.
+        """
+        self.assertIsNone(self.send(95, 99, [['100', '5']]))
+        self.assertIsNone(self.send(99, 102, [['99', '3']]))
+        self.assertIsNone(self.send(103, 104, [], [['101', '0']]))
+        self.wait_snapshot()
+
+        __data = self.send(105, 105, [['100.5', '1']])
+        self.assertEqual(__data['last_update_id'], 105)
+        self.assertEqual(__data['bids'], [['100.5', '1'], ['100', '1'], ['99', '3']])
+        self.assertEqual(__data['asks'], [['102', '2']])
+        self.assertEqual(self.aux.get_order_book_counters('BTC/USDT'),\
+                         {'gaps': 0, 'resyncs': 0})
+
+        self.assertIsNone(self.send(104, 105, [['100', '7']]))
+        self.assertEqual(self.send(106, 106)['bids'][1], ['100', '1'])
+
+    def test_gap_resync(self):
+        """
+        test_gap_resync
+        ===============
+            A gap drops the book, counts a resync and rebuilds from a new snapshot.
+        """
+        self.send(101, 101)
+        self.wait_snapshot()
+        self.assertIsNotNone(self.send(102, 102))
+
+        self.assertIsNone(self.send(104, 104, [['98', '1']]))
+        self.assertEqual(self.aux.get_order_book_counters('BTC/USDT'),\
+                         {'gaps': 1, 'resyncs': 1})
+        self.assertIsNone(self.aux.get_book_stats('BTC/USDT'))
+
+        self.snapshot = {'lastUpdateId': 104, 'bids': [['98', '1']], 'asks': [['101', '1']]}
+        self.wait_snapshot()
+        __data = self.send(105, 105, [['97', '1']])
+        self.assertEqual(__data['bids'], [['98', '1'], ['97', '1']])
+
+    def test_snapshot_older_than_buffer(self):
+        """
+        test_snapshot_older_than_buffer
+        ===============================
+            A snapshot older than the buffered diffs is discarded and a newer one is
+            requested, without counting a gap.
+        """
+        self.send(150, 151)
+        self.wait_snapshot()
+        self.snapshot = {'lastUpdateId': 151, 'bids': [['100', '1']], 'asks': [['101', '1']]}
+
+        self.assertIsNone(self.send(152, 152))
+        self.wait_snapshot()
+        self.assertEqual(self.send(153, 153, [['99', '1']])['last_update_id'], 153)
+        self.assertEqual(self.aux.get_order_book_counters('BTC/USDT'),\
+                         {'gaps': 0, 'resyncs': 0})
+
+class TestBinanceOrderBookSync(BinanceOrderBookSyncMixin, unittest.TestCase):
+    """
+    TestBinanceOrderBookSync - Binance order book sequencing tests
+    ==============================================================
+    """
+
+    aux_class = BinanceCcxwAuxClass
+
+class TestBinanceusOrderBookSync(BinanceOrderBookSyncMixin, unittest.TestCase):
+    """
+    TestBinanceusOrderBookSync - Binance US order book sequencing tests
+    ===================================================================
+    """
+
+    aux_class = BinanceusCcxwAuxClass
+
+class TestBybitOrderBookSync(unittest.TestCase):
+    """
+    TestBybitOrderBookSync - Auxiliary class for testing the Bybit order book sequencing
+    ====================================================================================
+        This class contains helper functions for testing the Bybit local order book.
+    """
+
+    def setUp(self):
+        __exchange_info = {'result': {'list': [{'symbol': 'BTCUSDT', 'baseCoin': 'BTC',\
+                                                'quoteCoin': 'USDT',\
+                                                'priceFilter': {'tickSize': '0.01'}}]}}
+        __patcher = mock.patch.object(BybitCcxwAuxClass, 'get_exchange_info',\
+                                      return_value=__exchange_info)
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+        self.__bybit = BybitCcxwAuxClass([{'endpoint': 'order_book', 'symbol': 'BTC/USDT'}])
+        self.__bybit.get_websocket_endpoint_path()
+        self.addCleanup(self.__bybit.stop)
+        self.__ws = FakeWebSocket()
+
+        self.__send('snapshot', 5, [['100', '1'], ['99', '2']], [['101', '1']])
+
+    def __send(self, message_type, update_id, bids=None, asks=None):
+        """
+        __send
+        ======
+            This function feed an orderbook.50 message.
+                :return dict | None: Return the managed data.
+        """
+        __message = {'topic': 'orderbook.50.BTCUSDT', 'type': message_type, 'ts': 1,\
+                     'data': {'s': 'BTCUSDT', 'b': bids or [], 'a': asks or [],\
+                              'u': update_id, 'seq': update_id}}
+
+        return self.__bybit.manage_websocket_message(self.__ws, json.dumps(__message))['data']
+
+    def test_sequence(self):
+        """
+        test_sequence
+        =============
+            Only the delta with u == last u + 1 is applied, older deltas are ignored.
+        """
+        __data = self.__send('delta', 6, [['100', '0']])
+        self.assertEqual((__data['type'], __data['last_update_id']), ('update', 6))
+        self.assertEqual(__data['bids'], [['99', '2']])
+
+        self.assertIsNone(self.__send('delta', 6, [['98', '1']]))
+        self.assertIsNone(self.__send('delta', 4, [['98', '1']]))
+        self.assertEqual(self.__send('delta', 7)['bids'], [['99', '2']])
+        self.assertEqual(self.__bybit.get_order_book_counters('BTC/USDT'),\
+                         {'gaps': 0, 'resyncs': 0})
+
+    def test_reset(self):
+        """
+        test_reset
+        ==========
+            A delta with u == 1 replaces the book as a snapshot.
+        """
+        __data = self.__send('delta', 1, [['90', '1']], [['91', '1']])
+        self.assertEqual((__data['type'], __data['last_update_id']), ('snapshot', 1))
+        self.assertEqual((__data['bids'], __data['asks']), ([['90', '1']], [['91', '1']]))
+        self.assertEqual(self.__send('delta', 2)['last_update_id'], 2)
+
+    def test_gap_resync(self):
+        """
+        test_gap_resync
+        ===============
+            A gap counts, drops the book and subscribes again only its topic.
+        """
+        self.assertIsNone(self.__send('delta', 8, [['98', '1']]))
+        self.assertEqual(self.__bybit.get_order_book_counters('BTC/USDT'),\
+                         {'gaps': 1, 'resyncs': 1})
+        self.assertEqual([(__sent['op'], __sent['args']) for __sent in self.__ws.sent],\
+                         [('unsubscribe', ['orderbook.50.BTCUSDT']),\
+                          ('subscribe', ['orderbook.50.BTCUSDT'])])
+        self.assertIsNone(self.__send('delta', 9))
+        self.assertEqual(self.__send('snapshot', 20, [['98', '1']])['bids'], [['98', '1']])
+
+if __name__ == '__main__':
+    unittest.main()
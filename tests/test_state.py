@@ -0,0 +1,265 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+state file tests cases.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_state.py
+"""
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import ccxw.ccxw
+from ccxw import Ccxw
+from ccxw.binance import BinanceCcxwAuxClass
+from ccxw.indicators import KlineIndicators
+
+class FakeWebSocketApp():
+    """
+    FakeWebSocketApp - Websocket client that never connects
+    =======================================================
+        run_forever() returns at once, so the launcher only creates the temporal
+        database.
+    """
+
+    def __init__(self, *_, **__):
+        pass
+
+    def run_forever(self, **_):
+        """
+        run_forever
+        ===========
+            This function return at once.
+        """
+        return False
+
+class TestState(unittest.TestCase):
+    """
+    TestState - Auxiliary class for testing the Ccxw state file
+    ===========================================================
+        This class contains helper functions for testing the state save and restore.
+    """
+
+    streams = [{'endpoint': 'kline', 'symbol': 'BTC/USDT', 'interval': '1m'},\
+               {'endpoint': 'trades', 'symbol': 'BTC/USDT'}]
+
+    def setUp(self):
+        __exchange_info = {'symbols': [{'symbol': 'BTCUSDT', 'baseAsset': 'BTC',\
+                                        'quoteAsset': 'USDT', 'status': 'TRADING',\
+                                        'filters': [{'filterType': 'PRICE_FILTER',\
+                                                     'tickSize': '0.01'}]}]}
+
+        for __patcher in (mock.patch.object(BinanceCcxwAuxClass, 'get_exchange_info',\
+                                            lambda *_: __exchange_info),\
+                          mock.patch.object(ccxw.ccxw.websocket, 'WebSocketApp',\
+                                            FakeWebSocketApp)):
+            __patcher.start()
+            self.addCleanup(__patcher.stop)
+
+        __temp_dir = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+        self.addCleanup(__temp_dir.cleanup)
+        self.state_file = os.path.join(__temp_dir.name, 'binance.state')
+        self.open_time = (int(time.time()) // 60 - 2) * 60000
+
+    def get_ccxw(self, **kwargs):
+        """
+        get_ccxw
+        ========
+            This function create a Ccxw instance with the state file, load its state and
+            create its temporal database as start() does, without connecting.
+                :return Ccxw: Return the instance.
+        """
+        result = Ccxw('binance', self.streams, result_max_len=5, data_max_len=10,\
+                      state_file=self.state_file, **kwargs)
+        getattr(result, '_Ccxw__load_state')()
+        getattr(result, '_Ccxw__websocket_launcher')(None)
+        setattr(result, '_Ccxw__stop_launcher', True) # Not started, nothing to stop
+
+        return result
+
+    def send(self, wsm, open_time, close, trade_id):
+        """
+        send
+        ====
+            This function feed a kline and a trade message.
+        """
+        __kline = {'e': 'kline', 'E': open_time, 's': 'BTCUSDT',\
+                   'k': {'s': 'BTCUSDT', 'i': '1m', 't': open_time, 'T': open_time + 59999,\
+                         'o': '1', 'c': close, 'h': '1', 'l': '1', 'v': '1', 'x': False}}
+        __trade = {'e': 'trade', 'E': 1, 's': 'BTCUSDT', 't': trade_id, 'p': '1', 'q': '1',\
+                   'T': 1000, 'm': True}
+
+        for __message in (__kline, __trade):
+            getattr(wsm, '_Ccxw__manage_websocket_message')(None, json.dumps(__message))
+
+    def save(self):
+        """
+        save
+        ====
+            This function save the state of a fed instance.
+        """
+        __wsm = self.get_ccxw()
+
+        for __candle in range(3):
+            self.send(__wsm, self.open_time + __candle * 60000, str(__candle), __candle)
+
+        self.assertTrue(getattr(__wsm, '_Ccxw__save_state')())
+
+    def reconnect(self, wsm, age=0):
+        """
+        reconnect
+        =========
+            This function close and open again the websocket of an instance, age seconds
+            after it was closed.
+        """
+        getattr(wsm, '_Ccxw__reset_ws_temp_data')()
+        __timestamp, __buffers = getattr(wsm, '_Ccxw__reconnect_buffers')
+        setattr(wsm, '_Ccxw__reconnect_buffers', (__timestamp - age, __buffers))
+        getattr(wsm, '_Ccxw__manage_websocket_open')(None)
+
+    def set_state_age(self, age):
+        """
+        set_state_age
+        =============
+            This function move the saved state and its candles age seconds back.
+        """
+        with gzip.open(self.state_file, 'rt', encoding='utf-8') as __file:
+            __state = json.load(__file)
+
+        __state['timestamp'] -= age
+
+        for __stream_state in __state['streams'].values():
+            for __message in __stream_state['buffer']:
+                if 'open_time' in __message:
+                    __message['open_time'] -= age * 1000
+
+        with gzip.open(self.state_file, 'wt', encoding='utf-8') as __file:
+            json.dump(__state, __file)
+
+    def test_round_trip(self):
+        """
+        test_round_trip
+        ===============
+            The saved buffers and data are restored stale and resumed by new messages.
+        """
+        self.save()
+        __wsm = self.get_ccxw()
+
+        __klines = __wsm.get_current_data('kline', 'BTC/USDT', '1m')
+        self.assertTrue(__klines['stale'])
+        self.assertEqual([__kline['close'] for __kline in __klines['data']], ['0', '1', '2'])
+        self.assertTrue(__wsm.get_current_data('trades', 'BTC/USDT')['stale'])
+
+        self.send(__wsm, self.open_time + 2 * 60000, '9', 7)
+        __klines = __wsm.get_current_data('kline', 'BTC/USDT', '1m')
+        self.assertNotIn('stale', __klines)
+        self.assertEqual([__kline['close'] for __kline in __klines['data']], ['0', '1', '9'])
+        self.assertEqual([(__trade['trade_id'], __trade.get('stale', False)) for __trade in\
+                          __wsm.get_current_data('trades', 'BTC/USDT')['data']],\
+                         [('0', True), ('1', True), ('2', True), ('7', False)])
+
+    def test_kline_gap(self):
+        """
+        test_kline_gap
+        ==============
+            A kline buffer with missing candles before the current one is not restored.
+        """
+        self.save()
+        self.set_state_age(120)
+        __wsm = self.get_ccxw()
+
+        self.send(__wsm, self.open_time + 2 * 60000, '9', 7)
+        self.assertEqual([__kline['close'] for __kline in\
+                          __wsm.get_current_data('kline', 'BTC/USDT', '1m')['data']], ['9'])
+        self.assertEqual(len(__wsm.get_current_data('trades', 'BTC/USDT')['data']), 4)
+
+    def test_reconnect(self):
+        """
+        test_reconnect
+        ==============
+            The buffers are kept across a reconnection, the trades marked stale.
+        """
+        __wsm = self.get_ccxw()
+
+        for __candle in range(3):
+            self.send(__wsm, self.open_time + __candle * 60000, str(__candle), __candle)
+
+        self.reconnect(__wsm)
+        self.send(__wsm, self.open_time + 2 * 60000, '9', 7)
+
+        self.assertEqual([__kline['close'] for __kline in\
+                          __wsm.get_current_data('kline', 'BTC/USDT', '1m')['data']],\
+                         ['0', '1', '9'])
+        self.assertEqual([(__trade['trade_id'], __trade.get('stale', False)) for __trade in\
+                          __wsm.get_current_data('trades', 'BTC/USDT')['data']],\
+                         [('0', True), ('1', True), ('2', True), ('7', False)])
+
+    def test_reconnect_gap(self):
+        """
+        test_reconnect_gap
+        ==================
+            A kline buffer with missing candles or buffers older than state_max_age are
+            not kept across a reconnection.
+        """
+        __wsm = self.get_ccxw()
+        self.send(__wsm, self.open_time - 600000, '0', 0)
+        self.reconnect(__wsm)
+        self.send(__wsm, self.open_time + 2 * 60000, '9', 7)
+
+        self.assertEqual([__kline['close'] for __kline in\
+                          __wsm.get_current_data('kline', 'BTC/USDT', '1m')['data']], ['9'])
+        self.assertEqual(len(__wsm.get_current_data('trades', 'BTC/USDT')['data']), 2)
+
+        __wsm = self.get_ccxw(state_max_age=60)
+        self.send(__wsm, self.open_time + 2 * 60000, '0', 0)
+        self.reconnect(__wsm, 120)
+        self.send(__wsm, self.open_time + 2 * 60000, '9', 7)
+
+        self.assertEqual([__trade['trade_id'] for __trade in\
+                          __wsm.get_current_data('trades', 'BTC/USDT')['data']], ['7'])
+
+    def test_indicators(self):
+        """
+        test_indicators
+        ===============
+            The indicators are warmed up with the restored candles and each message
+            parses only the candles it can change, not the whole kline list.
+        """
+        self.streams = [dict(TestState.streams[0],\
+                             indicators={'sma_3': {'type': 'sma', 'period': 3}}),\
+                        TestState.streams[1]]
+        self.save()
+        __wsm = self.get_ccxw()
+        self.assertEqual(__wsm.get_kline_indicators('BTC/USDT', '1m')['open_time'],\
+                         self.open_time + 2 * 60000)
+
+        with mock.patch.object(KlineIndicators, 'get_candle',\
+                               wraps=KlineIndicators.get_candle) as __get_candle:
+            for __candle in range(2, 8):
+                __get_candle.reset_mock()
+                self.send(__wsm, self.open_time + __candle * 60000, str(__candle * 2), 7)
+                self.assertLessEqual(__get_candle.call_count, 2)
+
+        __klines = __wsm.get_current_data('kline', 'BTC/USDT', '1m')
+        self.assertEqual(len(__klines['data']), 5)
+        self.assertEqual(__klines['indicators']['sma_3'], (10 + 12 + 14) / 3)
+
+    def test_max_age(self):
+        """
+        test_max_age
+        ============
+            A state older than state_max_age is ignored.
+        """
+        self.save()
+        self.set_state_age(120)
+        __wsm = self.get_ccxw(state_max_age=60)
+
+        self.assertIsNone(__wsm.get_current_data('trades', 'BTC/USDT'))
+
+if __name__ == '__main__':
+    unittest.main()
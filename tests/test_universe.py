@@ -0,0 +1,127 @@
+"""
+CCXW - CryptoCurrency eXchange Websocket Library
+symbols universe tests cases, with stubbed exchange classes.
+
+Author: Ricardo Marcelo Alvarez
+Date: 2026-10-19
+poetry run python -m unittest tests/test_universe.py
+"""
+import unittest
+from unittest import mock
+
+from ccxw import Ccxw
+from ccxw.ccxw import CcxwExchangeConfig
+
+def get_aux_class(symbols_index, calls):
+    """
+    get_aux_class
+    =============
+        This function return an exchange class stub that serves symbols_index.
+            :param symbols_index: dict | None unified symbol -> symbol data, None to fail.
+            :param calls: list where the stub appends each fetch.
+            :return class: Return the stub class.
+    """
+
+    class AuxClass():
+        """
+        AuxClass - Exchange class stub
+        ==============================
+        """
+
+        def __init__(self, streams=None, **_):
+            self.streams = streams
+
+        def get_exchange_symbols_index(self):
+            """
+            get_exchange_symbols_index
+            ==========================
+                This function return the stubbed index.
+            """
+            calls.append(symbols_index)
+
+            if symbols_index is None:
+                raise ValueError('Exchange info not available')
+
+            return symbols_index
+
+    return AuxClass
+
+class TestSymbolsUniverse(unittest.TestCase):
+    """
+    TestSymbolsUniverse - Auxiliary class for testing the symbols universe index
+    ============================================================================
+        This class contains helper functions for testing Ccxw.get_symbols_universe and
+        Ccxw.get_symbol_exchanges.
+    """
+
+    def setUp(self):
+        self.calls = []
+        self.binance_index = {
+            'BTC/USDT': {'symbol': 'BTCUSDT', 'intervals': ['1m'], 'tick_size': '0.01'},
+            'ETH/USDT': {'symbol': 'ETHUSDT', 'intervals': ['1m'], 'tick_size': '0.01'}
+        }
+        self.okx_index = {
+            'BTC/USDT': {'symbol': 'BTC-USDT', 'intervals': ['1m'], 'tick_size': '0.1'}
+        }
+        __patcher = mock.patch.dict(CcxwExchangeConfig.exchange_classes, {
+            'binance': get_aux_class(self.binance_index, self.calls),
+            'okx': get_aux_class(self.okx_index, self.calls),
+            'kucoin': get_aux_class(None, self.calls)
+        })
+        __patcher.start()
+        self.addCleanup(__patcher.stop)
+
+    def test_universe(self):
+        """
+        test_universe
+        =============
+            The index is inverted by unified symbol and cached per exchanges set.
+        """
+        __universe = Ccxw.get_symbols_universe(exchanges=['binance', 'okx', 'binance',\
+                                                          'unknown'],\
+                                               force_update=True)
+        self.assertEqual(__universe, {
+            'BTC/USDT': {'binance': self.binance_index['BTC/USDT'],\
+                         'okx': self.okx_index['BTC/USDT']},
+            'ETH/USDT': {'binance': self.binance_index['ETH/USDT']}
+        })
+        self.assertEqual(len(self.calls), 2)
+
+        self.assertIs(Ccxw.get_symbols_universe(exchanges=['okx', 'binance']), __universe)
+        self.assertEqual(len(self.calls), 2)
+
+        Ccxw.get_symbols_universe(exchanges=['okx', 'binance'], force_update=True)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_failed_fetch(self):
+        """
+        test_failed_fetch
+        =================
+            An exchange that fails is left out and the partial index is not cached.
+        """
+        __universe = Ccxw.get_symbols_universe(exchanges=['okx', 'kucoin'], force_update=True)
+        self.assertEqual(__universe, {'BTC/USDT': {'okx': self.okx_index['BTC/USDT']}})
+
+        Ccxw.get_symbols_universe(exchanges=['okx', 'kucoin'])
+        self.assertEqual(len(self.calls), 4)
+
+    def test_symbol_exchanges(self):
+        """
+        test_symbol_exchanges
+        =====================
+            The exchanges that serve a symbol come from the index.
+        """
+        Ccxw.get_symbols_universe(exchanges=['binance', 'okx'], force_update=True)
+
+        self.assertEqual(sorted(Ccxw.get_symbol_exchanges('BTC/USDT',\
+                                                          exchanges=['binance', 'okx'])),\
+                         ['binance', 'okx'])
+        self.assertEqual(list(Ccxw.get_symbol_exchanges('ETH/USDT',\
+                                                        exchanges=['binance', 'okx'])),\
+                         ['binance'])
+        self.assertEqual(Ccxw.get_symbol_exchanges('XRP/USDT', exchanges=['binance', 'okx']),\
+                         {})
+        self.assertEqual(len(self.calls), 2)
+
+if __name__ == '__main__':
+    unittest.main()